@@ -1,9 +1,13 @@
 # analyze.py — Velog 분석 (한국어 날짜/상대시간 파싱 지원)
-import json, re
+import json, os, re
 from collections import Counter, defaultdict
-from datetime import datetime, timezone, timedelta
-from email.utils import parsedate_to_datetime
-from zoneinfo import ZoneInfo  # Py3.9+
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from archive import is_archive, iter_archive_posts
+from dates import reference_now, to_utc
+from jsonl_out import iter_json_posts, read_jsonl
+from store import handle_of
 
 IN_PATH = "out.json"
 SUMMARY_OUT = "summary.json"
@@ -16,131 +20,174 @@ STACK_RULES = {
     "Web/FE": {"kw": {"html","css","javascript","js","ts","react","vue","scss"}, "langs": {"javascript","typescript","tsx","jsx","css","scss"}},
 }
 
-KST = ZoneInfo("Asia/Seoul")
-
-def parse_korean_datetime(s: str, now: datetime) -> datetime | None:
-    # 한국어 날짜/상대시간 문자열을 UTC datetime으로 변환
-    if not s: 
-        return None
-    text = s.strip()
-
-    # 상대시간: 분/시간/일 전
-    m = re.search(r"(약\s*)?(\d+)\s*분\s*전", text)
-    if m:
-        mins = int(m.group(2))
-        return (now - timedelta(minutes=mins)).astimezone(timezone.utc)
-    m = re.search(r"(약\s*)?(\d+)\s*시간\s*전", text)
-    if m:
-        hours = int(m.group(2))
-        return (now - timedelta(hours=hours)).astimezone(timezone.utc)
-    m = re.search(r"(약\s*)?(\d+)\s*일\s*전", text)
-    if m:
-        days = int(m.group(2))
-        return (now - timedelta(days=days)).astimezone(timezone.utc)
-
-    # 절대시간: 2025. 8. 9 [오전/오후] 9:00(:ss)?
-    m = re.search(r"(\d{4})\.\s*(\d{1,2})\.\s*(\d{1,2})(?:\s*(오전|오후)?\s*(\d{1,2}):(\d{2})(?::(\d{2}))?)?", text)
-    if m:
-        y, mo, d = int(m.group(1)), int(m.group(2)), int(m.group(3))
-        ampm, hh, mm, ss = m.group(4), m.group(5), m.group(6), m.group(7)
-        h = int(hh) if hh else 0
-        m_ = int(mm) if mm else 0
-        s_ = int(ss) if ss else 0
-        if ampm == "오후" and h < 12: h += 12
-        if ampm == "오전" and h == 12: h = 0
-        kst_dt = datetime(y, mo, d, h, m_, s_, tzinfo=KST)
-        return kst_dt.astimezone(timezone.utc)
-
-    return None
-
-def to_utc(dt_str: str | None):
-    if not dt_str:
-        return None
-    # 1) RFC822 (RSS) 시도
-    try:
-        dt = parsedate_to_datetime(dt_str)
-        if dt.tzinfo is None: dt = dt.replace(tzinfo=timezone.utc)
-        return dt.astimezone(timezone.utc)
-    except Exception:
-        pass
-    # 2) ISO 시도
-    try:
-        return datetime.fromisoformat(dt_str.replace("Z","+00:00")).astimezone(timezone.utc)
-    except Exception:
-        pass
-    # 3) 한국어 날짜/상대시간 시도
-    try:
-        now = datetime.now(KST)
-        return parse_korean_datetime(dt_str, now)
-    except Exception:
-        return None
-
-def classify_post(title: str, text: str, tags: list[str], code_langs: list[str]):
+class KeywordMatcher:
+    # STACK_RULES 의 키워드 전체를 정규식 하나로 컴파일 -> 본문을 한 번만 훑어 주제별 적중 수 계산
+    # - 키워드는 트라이 모양으로 묶어 넣음 (java|javascript -> java(?:script)?) -> 주제/키워드가 수백 개여도
+    #   위치마다 공통 접두사 분기만 따라가므로 키워드 수에 비례해 느려지지 않음
+    # - 앞뒤가 영문/숫자가 아닐 때만 적중 ("el" 이 "hello" 에, "js" 가 "jsp" 에 걸리지 않음).
+    #   한글 조사는 경계로 봄 ("java에서" 는 java 적중)
+
+    def __init__(self, rules: dict):
+        self.kw_topics = defaultdict(list)   # 키워드 -> 주제들 (한 키워드가 여러 주제에 속할 수 있음)
+        self.lang_topics = defaultdict(list)
+        for topic, rule in rules.items():
+            for kw in rule.get("kw", ()):
+                self.kw_topics[kw.lower()].append(topic)
+            for lang in rule.get("langs", ()):
+                self.lang_topics[lang.lower()].append(topic)
+        self.pattern = re.compile(
+            r"(?<![0-9a-z])(" + _trie_pattern(self.kw_topics) + r")(?![0-9a-z])"
+        ) if self.kw_topics else None
+
+    def count(self, text: str) -> Counter:
+        # 주제별 키워드 적중 횟수 (text 는 소문자로 넘길 것)
+        hits = Counter()
+        if self.pattern is None or not text:
+            return hits
+        for m in self.pattern.finditer(text):
+            for topic in self.kw_topics[m.group(1)]:
+                hits[topic] += 1
+        return hits
+
+    def tag_topics(self, tags) -> set:
+        return {tp for x in tags for tp in self.kw_topics.get(x, ())}
+
+    def lang_topics_of(self, langs) -> set:
+        return {tp for x in langs for tp in self.lang_topics.get(x, ())}
+
+
+def _trie_pattern(words) -> str:
+    # 단어 목록 -> 접두사 트라이 모양의 정규식 (가장 긴 것부터 시도되도록 분기 정렬)
+    trie: dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        end = "" in node
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        if len(alts) == 1 and not end:
+            return alts[0]
+        if len(alts) == 1 and len(alts[0]) == 1:
+            return alts[0] + "?"
+        return "(?:" + "|".join(alts) + ")" + ("?" if end else "")
+
+    return build(trie)
+
+
+MATCHER = KeywordMatcher(STACK_RULES)
+STUDY_RE = re.compile("정리|개념|설명|예제|코드|실습|에러|해결")
+
+
+def classify_post(title: str, text: str, tags: list[str], code_langs: list[str], matcher: KeywordMatcher = MATCHER):
     t = (title or "").lower()
     body = (text or "").lower()
     tagset = set(str(x).lower() for x in (tags or []))
     langset = set(str(x).lower() for x in (code_langs or []))
 
+    # 점수: 제목/본문 키워드 적중 2, 태그 1, 코드 언어 2 (적중 횟수가 아니라 여부 기준 - 기존 점수 체계 유지)
     scores = Counter()
-    for topic, rule in STACK_RULES.items():
-        s = 0
-        if any(kw in t for kw in rule["kw"]) or any(kw in body for kw in rule["kw"]):
-            s += 2
-        if tagset & rule["kw"]:
-            s += 1
-        if langset & rule["langs"]:
-            s += 2
-        if s > 0:
-            scores[topic] += s
-
-    is_study = bool(scores) or any(x in body for x in ["정리","개념","설명","예제","코드","실습","에러","해결"])
+    for topic in matcher.count(t + "\n" + body):
+        scores[topic] += 2
+    for topic in matcher.tag_topics(tagset):
+        scores[topic] += 1
+    for topic in matcher.lang_topics_of(langset):
+        scores[topic] += 2
+
+    is_study = bool(scores) or STUDY_RE.search(body) is not None
     major = scores.most_common(1)[0][0] if scores else None
     topics = [k for k,_ in scores.most_common()]
     return is_study, major, topics
 
-def main():
-    with open(IN_PATH, encoding="utf-8") as f:
-        doc = json.load(f)
+class PostRow:
+    # 분석에 쓰는 값만 담은 행 (본문/제목은 분류가 끝나면 버림 -> 메모리는 글 수에 비례, 본문 길이와 무관)
+    __slots__ = ("url", "ts", "is_study", "major", "topics")
+
+    def __init__(self, url: str, ts: datetime, is_study: bool, major: str | None, topics: tuple):
+        self.url = url
+        self.ts = ts
+        self.is_study = is_study
+        self.major = major
+        self.topics = topics
+
+    @property
+    def date(self):
+        return self.ts.date()
+
+    @property
+    def ym(self) -> str:
+        return self.ts.strftime("%Y-%m")
 
-    rows = []
-    for p in doc.get("posts", []):
-        dt = to_utc(p.get("published_at") or "")
-        # published_at을 못 구한 경우, 최신 글 기준 상대값이 있었다면 위에서 보정됨.
+
+def build_rows(posts) -> list[PostRow]:
+    # 글(이터레이터 가능) -> 날짜/분류가 붙은 행 (시간순). 날짜를 못 구한 글은 제외
+    # 글은 하나씩 분류하고 바로 버림. 같은 URL 이 다시 나오면 나중 것이 이김 (JSONL 이어쓰기)
+    # 상대 날짜("3일 전")는 이번 실행의 기준 시각 하나로 (크롤러가 저장한 값은 이미 절대 시각)
+    now = reference_now()
+    by_url: dict[str, PostRow] = {}
+    shared: dict[tuple, tuple] = {}  # 같은 주제 조합은 튜플 하나를 같이 씀
+    for i, p in enumerate(posts):
+        dt = to_utc(p.get("published_at"), now)
+        # 날짜가 완전 없는 글은 품질을 위해 스킵 (분류도 하지 않음)
+        url = p.get("url") or f"#{i}"
         if not dt:
-            # 날짜가 완전 없더라도 분석에 포함하고 싶다면, 여기서 임시 날짜 부여 가능
-            # (예: 오늘 날짜로). 지금은 품질을 위해 스킵 유지.
-            pass
+            by_url.pop(url, None)
+            continue
 
         is_study, major, topics = classify_post(
             p.get("title",""), p.get("text",""), p.get("tags",[]), p.get("code_langs",[])
         )
+        topics = tuple(topics)
+        by_url[url] = PostRow(url, dt, is_study, major, shared.setdefault(topics, topics))
+
+    rows = list(by_url.values())
+    rows.sort(key=lambda x: x.ts)
+    return rows
+
+
+def collapse_duplicates(rows: list[PostRow], clusters: dict) -> tuple[list[PostRow], int]:
+    # 유사 중복 묶음(near_dup 색인의 url -> 묶음 id)마다 가장 먼저 게시된 글 하나만 남김 (rows 는 시간순)
+    seen = set()
+    kept = []
+    for r in rows:
+        c = clusters.get(r.url, r.url)
+        if c not in seen:
+            seen.add(c)
+            kept.append(r)
+    return kept, len(rows) - len(kept)
+
+
+def load_posts(path: str, meta: dict) -> Iterator[dict]:
+    # 글을 하나씩: .jsonl(.gz/.zst) 은 줄 단위, out.json 은 "posts" 배열을 점진 파싱 (meta 에 author 등)
+    # 컬럼형 아카이브(.vca)는 mmap 으로 열고 본문은 블록 단위로 풂
+    if ".jsonl" in os.path.basename(path):
+        return read_jsonl(path)
+    if is_archive(path):
+        return iter_archive_posts(path, meta)
+    return iter_json_posts(path, meta)
 
-        if dt:
-            rows.append({
-                "url": p["url"],
-                "date": dt.date(),
-                "ym": dt.strftime("%Y-%m"),
-                "ts": dt,
-                "title": p.get("title",""),
-                "is_study": is_study,
-                "major": major,
-                "topics": topics
-            })
-
-    rows.sort(key=lambda x: x["ts"])
-    if not rows:
-        print("no rows")
-        with open(SUMMARY_OUT,"w",encoding="utf-8") as f: json.dump({"note":"no data (check published_at format)"}, f, ensure_ascii=False, indent=2)
-        with open(TOPIC_TREND_OUT,"w",encoding="utf-8") as f: json.dump({}, f, ensure_ascii=False, indent=2)
-        return
 
+def clamp(x,a,b): return max(a, min(b, x))
+
+
+def cadence_score(cv: float, max_gap: int, last_90_posts: int) -> float:
+    consistency = 100 - clamp((cv*25) + (max_gap*0.5), 0, 100)
+    return clamp(consistency*0.7 + min(last_90_posts*3,30)*0.3, 0, 100)
+
+
+def summarize(rows: list[PostRow], author: dict) -> tuple[dict, dict]:
+    # 시간순 행(비어 있지 않음) -> (summary, topic_trend)
     # 활동 구간/간격
-    study = [r for r in rows if r["is_study"]] or rows
-    start, end = study[0]["date"], study[-1]["date"]
+    study = [r for r in rows if r.is_study] or rows
+    start, end = study[0].date, study[-1].date
 
     gaps = []
     for prev, cur in zip(study, study[1:]):
-        gaps.append((cur["ts"] - prev["ts"]).days)
+        gaps.append((cur.ts - prev.ts).days)
     max_gap = max(gaps) if gaps else 0
     cv = 0.0
     if gaps:
@@ -151,7 +198,7 @@ def main():
             cv = std/mean
 
     # streak
-    day_set = set(r["date"] for r in study)
+    day_set = set(r.date for r in study)
     longest_streak = 0
     cur = 0
     d = start
@@ -164,33 +211,31 @@ def main():
         d += timedelta(days=1)
 
     # 최근 90일
-    last_ts = study[-1]["ts"]
+    last_ts = study[-1].ts
     win_start = (last_ts - timedelta(days=89)).date()
-    last_90 = [r for r in study if win_start <= r["date"] <= last_ts.date()]
-    weeks = set(r["ts"].strftime("%G-%V") for r in last_90)
+    last_90 = [r for r in study if win_start <= r.date <= last_ts.date()]
+    weeks = set(r.ts.strftime("%G-%V") for r in last_90)
     last_90_weeks_active = len(weeks)
     last_90_posts = len(last_90)
 
     # 월별
     per_month = defaultdict(int)
     for r in study:
-        per_month[r["ym"]] += 1
+        per_month[r.ym] += 1
 
     # 주제별 월별
     topic_month = defaultdict(lambda: defaultdict(int))
     for r in study:
-        buckets = r["topics"] or ([r["major"]] if r["major"] else [])
+        buckets = r.topics or ([r.major] if r.major else [])
         for tpc in buckets:
-            topic_month[tpc][r["ym"]] += 1
+            topic_month[tpc][r.ym] += 1
     topic_trend = {t: dict(m) for t,m in topic_month.items()}
 
     # 점수
-    def clamp(x,a,b): return max(a, min(b, x))
-    consistency = 100 - clamp((cv*25) + (max_gap*0.5), 0, 100)
-    cadence = clamp(consistency*0.7 + min(last_90_posts*3,30)*0.3, 0, 100)
+    cadence = cadence_score(cv, max_gap, last_90_posts)
 
     summary = {
-        "author": doc.get("author",{}),
+        "author": author,
         "active_start": str(start),
         "active_end": str(end),
         "active_days": (end-start).days + 1,
@@ -203,8 +248,38 @@ def main():
         "last_90d_posts": int(last_90_posts),
         "last_90d_weeks_active": int(last_90_weeks_active),
         "cadence_score": round(cadence,1),
-        "top_topics": Counter([r["major"] for r in study if r["major"]]).most_common(5)
+        "top_topics": Counter([r.major for r in study if r.major]).most_common(5)
     }
+    return summary, topic_trend
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Velog author analytics")
+    parser.add_argument("input", nargs="?", default=IN_PATH, help="out.json, columnar archive (.vca) or crawl JSONL (.jsonl/.jsonl.gz/.jsonl.zst)")
+    parser.add_argument("--dedupe", default="", help="near-duplicate index (near_dup.db): count each duplicate cluster once")
+    args = parser.parse_args()
+
+    meta: dict = {}
+    collapsed = None
+    if args.dedupe:
+        # 글을 흘려보내면서 색인에 반영하고(새 글만 서명 계산), 끝난 뒤 묶음 정보로 중복을 접음
+        from near_dup import NearDupIndex
+        with NearDupIndex(args.dedupe) as index:
+            rows = build_rows(index.tap(load_posts(args.input, meta)))
+            rows, collapsed = collapse_duplicates(rows, index.clusters(r.url for r in rows))
+    else:
+        rows = build_rows(load_posts(args.input, meta))
+    if not rows:
+        print("no rows")
+        with open(SUMMARY_OUT,"w",encoding="utf-8") as f: json.dump({"note":"no data (check published_at format)"}, f, ensure_ascii=False, indent=2)
+        with open(TOPIC_TREND_OUT,"w",encoding="utf-8") as f: json.dump({}, f, ensure_ascii=False, indent=2)
+        return
+
+    summary, topic_trend = summarize(rows, meta.get("author") or {"handle": handle_of(rows[0].url)})
+    if collapsed is not None:
+        summary["duplicates_collapsed"] = collapsed
 
     with open(SUMMARY_OUT,"w",encoding="utf-8") as f:
         json.dump(summary, f, ensure_ascii=False, indent=2)
@@ -1,42 +1,222 @@
 # API 제공
-from fastapi import FastAPI, Query, HTTPException
+from fastapi import FastAPI, Query, HTTPException, Header, Request
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
-import re
-
-# 목록: render_list_with_playwright(handle, max_scrolls, pause_sec, timeout_ms) -> List[str]
-# 상세: render_post_with_playwright(url) -> (title, text, code_langs, tags, published)
-from crawl_velog import render_list_with_playwright, render_post_with_playwright
-
-app = FastAPI(title="Velog Crawling API")
-
-def normalize_created_at(src: Optional[str]) -> Optional[str]:
-    if not src:
-        return None
-    s = src.strip()
-    # 절대 한국어 날짜: 2025. 8. 9 ...
-    m = re.search(r"(\d{4})\.\s*(\d{1,2})\.\s*(\d{1,2})", s)
-    if m:
-        y, mo, d = int(m.group(1)), int(m.group(2)), int(m.group(3))
-        return f"{y:04d}-{mo:02d}-{d:02d}"
-    # 상대시간은 오늘 기준으로 단순 보정(날짜 정보만 필요)
-    today = datetime.now().date()
-    m = re.search(r"(\d+)\s*일\s*전", s)
-    if m:
-        d = int(m.group(1))
-        day = today.fromordinal(today.toordinal() - d)
-        return day.strftime("%Y-%m-%d")
-    # 시간/분 전은 오늘 날짜
-    if "시간 전" in s or "분 전" in s:
-        return today.strftime("%Y-%m-%d")
-    # RSS/ISO 케이스
+from typing import Iterator, List, Optional, Tuple
+from contextlib import asynccontextmanager, contextmanager
+import asyncio, base64, json, os, threading, time
+from urllib.parse import urlsplit
+
+# 목록: PostListHarvest(http_backend, handle).ensure(n) -> 앞에서부터 n개 (제목/날짜/태그 포함)
+#       실패 시 backend.list_links(handle, max_scrolls, pause_sec, deadline) -> List[str]
+# 상세: backend.fetch_post(url) -> (title, text, code_langs, tags, published)
+# 기본은 HTTP fast path, 실패 시에만 Playwright(render_*_with_playwright) 폴백
+from crawl_velog import PlaywrightBackend, make_backend
+from http_fetch import HttpBackend, FallbackBackend, PostListHarvest, VELOG_URL, graphql_url_for
+from browser_pool import BrowserPool
+from resource_policy import ResourcePolicy, DEFAULT_ALLOW_DOMAINS
+from cache import ResponseCache, MemoryBackend, RedisBackend, MISS
+from render_queue import RenderQueue, QueueFull, DeadlineExceeded
+from ratelimit import HostRateLimiter
+from jobs import JobStore, JobManager, FINISHED
+from metrics import REGISTRY, observe
+from dates import reference_now, to_date_str, to_utc
+from archive import ARCHIVE_EXT, ArchiveReader
+from store import handle_of
+
+# 설정 (환경변수)
+# VELOG_BROWSER_WORKERS: Chromium 수, VELOG_RENDER_CONCURRENCY: 동시 렌더 수,
+# VELOG_RENDER_QUEUE: 렌더 대기 상한(넘으면 503), VELOG_REQUEST_TIMEOUT: 요청별 deadline(초)
+BROWSER_WORKERS = int(os.environ.get("VELOG_BROWSER_WORKERS", "1"))
+RENDER_CONCURRENCY = int(os.environ.get("VELOG_RENDER_CONCURRENCY", "4"))
+RENDER_QUEUE_MAX = int(os.environ.get("VELOG_RENDER_QUEUE", "16"))
+REQUEST_TIMEOUT = float(os.environ.get("VELOG_REQUEST_TIMEOUT", "30"))
+# VELOG_BASE_URL / VELOG_GRAPHQL_URL: 로컬 대역 서버(벤치마크 fixture 등)로 돌릴 때
+BASE_URL = os.environ.get("VELOG_BASE_URL", VELOG_URL).rstrip("/")
+GRAPHQL = os.environ.get("VELOG_GRAPHQL_URL", graphql_url_for(BASE_URL))
+# 백그라운드 작업: VELOG_JOBS_DB(작업 저장 파일), VELOG_JOB_WORKERS(동시 작업 수),
+# VELOG_JOB_CONCURRENCY(작업 하나의 동시 렌더 수), VELOG_JOB_RATE(작업 전체 초당 요청 수)
+JOBS_DB = os.environ.get("VELOG_JOBS_DB", "jobs.db")
+JOB_WORKERS = int(os.environ.get("VELOG_JOB_WORKERS", "1"))
+JOB_CONCURRENCY = int(os.environ.get("VELOG_JOB_CONCURRENCY", "2"))
+JOB_RATE = float(os.environ.get("VELOG_JOB_RATE", "1.0"))
+# 컬럼형 아카이브 디렉터리: <username>.vca 가 있으면 목록/상세를 크롤 대신 여기서 (목록은 본문 압축을 풀지 않음)
+ARCHIVE_DIR = os.environ.get("VELOG_ARCHIVE_DIR", "")
+
+# 브라우저 풀/백엔드/렌더 대기열은 앱 lifespan 이 소유 (요청마다 Chromium 기동 X)
+pool: Optional[BrowserPool] = None
+http_backend: Optional[HttpBackend] = None
+backend: Optional[FallbackBackend] = None
+render_queue: Optional[RenderQueue] = None
+job_store: Optional[JobStore] = None
+jobs: Optional[JobManager] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global pool, http_backend, backend, render_queue, job_store, jobs
+    base_host = urlsplit(BASE_URL).hostname
+    pool = BrowserPool(workers=BROWSER_WORKERS, policy=ResourcePolicy(allow_domains=DEFAULT_ALLOW_DOMAINS + (base_host,)))
+    http_backend = HttpBackend(base_url=BASE_URL, graphql_url=GRAPHQL, workers=RENDER_CONCURRENCY)
+    backend = FallbackBackend(http_backend, PlaywrightBackend(pool, base_url=BASE_URL))
+    render_queue = RenderQueue(max_active=RENDER_CONCURRENCY, max_waiting=RENDER_QUEUE_MAX)
+    # 작업은 요청 처리와 별도 백엔드/매너 딜레이를 씀 (브라우저 풀만 공유)
+    job_store = JobStore(JOBS_DB)
+    job_limiter = HostRateLimiter(rate=JOB_RATE, burst=1)
+    jobs = JobManager(
+        job_store,
+        lambda: make_backend("auto", pool, job_limiter, workers=JOB_CONCURRENCY, base_url=BASE_URL),
+        workers=JOB_WORKERS,
+    )
+    jobs.start()
+    # /metrics 수집 시점에 읽는 게이지
+    REGISTRY.register_gauges("velog_cache", "response cache state", cache.stats)
+    REGISTRY.register_gauges("velog_render_queue", "render queue state", render_queue.stats)
+    REGISTRY.register_gauges("velog_browser_requests", "browser requests allowed/blocked", pool.policy.stats.snapshot)
+    REGISTRY.register_gauges("velog_harvests", "per-author list harvests kept in memory", harvests.stats)
     try:
-        dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
-        return dt.date().strftime("%Y-%m-%d")
+        yield
+    finally:
+        await asyncio.to_thread(jobs.stop)
+        job_store.close()
+        backend.close()
+        await asyncio.to_thread(pool.close)
+
+app = FastAPI(title="Velog Crawling API", lifespan=lifespan)
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    # 엔드포인트별 응답 시간 (경로 템플릿 기준이라 /jobs/{job_id} 도 하나로 묶임)
+    t0 = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    if route is not None:
+        observe(f"api {request.method} {route.path}", time.perf_counter() - t0, status=response.status_code)
+    return response
+
+# 응답 캐시: 작성자 링크 목록 / 글 상세
+# VELOG_CACHE_TTL(초), VELOG_CACHE_MAX_MB, VELOG_CACHE_REDIS_URL(공유 캐시) 로 설정
+cache = ResponseCache(
+    backend=RedisBackend(os.environ["VELOG_CACHE_REDIS_URL"]) if os.environ.get("VELOG_CACHE_REDIS_URL")
+    else MemoryBackend(max_bytes=int(float(os.environ.get("VELOG_CACHE_MAX_MB", "64")) * 1024 * 1024)),
+    ttl=float(os.environ.get("VELOG_CACHE_TTL", "300")),
+)
+
+# 모든 크롤 작업은 렌더 대기열을 거침: 대기열이 차면 QueueFull, deadline 넘기면 DeadlineExceeded
+async def cached_links(username: str) -> List[str]:
+    return await cache.aget_or_load(
+        f"links:{username}",
+        lambda: render_queue.run(
+            lambda deadline: asyncio.to_thread(
+                backend.list_links, username, max_scrolls=220, pause_sec=1.0, deadline=deadline
+            ),
+            REQUEST_TIMEOUT,
+        ),
+    )
+
+async def cached_post(url: str):
+    return await cache.aget_or_load(
+        f"post:{url}",
+        lambda: render_queue.run(lambda deadline: backend.submit_post(url, deadline), REQUEST_TIMEOUT),
+    )
+
+# 열린 아카이브: 경로 -> {"mtime", "reader", "order", "users", "stale"}. 파일이 바뀌면 다시 엶
+# 이전 reader 는 그걸 읽고 있는 요청(users)이 모두 끝나면 닫음 (mmap/파일 핸들이 쌓이지 않게)
+archives = {}
+archives_lock = threading.Lock()
+
+def _release_archive(entry: dict) -> None:
+    # archives_lock 을 잡은 채로 호출
+    if entry["stale"] and entry["users"] == 0:
+        entry["reader"].close()
+
+@contextmanager
+def open_archive(username: str) -> Iterator[Optional[dict]]:
+    # 스레드에서 with 로 사용. 아카이브가 없으면 None
+    if not ARCHIVE_DIR or not username or not username.replace("-", "").replace("_", "").isalnum():
+        yield None
+        return
+    path = os.path.join(ARCHIVE_DIR, username + ARCHIVE_EXT)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        yield None
+        return
+    with archives_lock:
+        entry = archives.get(path)
+        if entry is None or entry["mtime"] != mtime:
+            if entry is not None:
+                entry["stale"] = True
+                _release_archive(entry)
+            entry = archives[path] = {
+                "mtime": mtime, "reader": ArchiveReader(path), "order": None, "users": 0, "stale": False,
+            }
+        entry["users"] += 1
+    try:
+        yield entry
+    finally:
+        with archives_lock:
+            entry["users"] -= 1
+            _release_archive(entry)
+
+def archive_order(entry: dict) -> List[int]:
+    # 글 번호를 published_at 최신순으로 (라이브 목록과 같은 순서). reader 마다 한 번 계산
+    order = entry["order"]
+    if order is None:
+        reader = entry["reader"]
+        dates = [to_utc(reader.field("published_at", i)) for i in range(len(reader))]
+        # 날짜를 못 읽은 글은 맨 뒤로
+        order = entry["order"] = sorted(
+            range(len(reader)), key=lambda i: (dates[i] is not None, dates[i] or 0), reverse=True
+        )
+    return order
+
+def archive_page(username: str, start: int, stop: int) -> Optional[Tuple[List[dict], int]]:
+    # 아카이브 목록 한 페이지 (메타데이터 열만 읽음) + 전체 글 수. 아카이브가 없거나 비었으면 None
+    with open_archive(username) as entry:
+        if entry is None or not len(entry["reader"]):
+            return None
+        reader = entry["reader"]
+        return [reader.meta_row(i) for i in archive_order(entry)[start:stop]], len(reader)
+
+def archive_post(url: str) -> Optional[dict]:
+    with open_archive(handle_of(url)) as entry:
+        return entry["reader"].get(url) if entry is not None else None
+
+# 작성자별 부분 수집 목록(서버 보관). 다음 페이지 요청은 이어서 가져옴
+# 살아 있는 PostListHarvest 객체라 직렬화 크기가 의미 없음 -> 바이트 집계 없이 작성자 수로만 제한
+harvests = MemoryBackend(max_bytes=None, max_items=256)
+
+def get_harvest(username: str) -> PostListHarvest:
+    h = harvests.get(username)
+    if h is MISS:
+        h = PostListHarvest(http_backend, username)
+        harvests.set(username, h, cache.ttl)
+    return h
+
+async def harvest_until(username: str, n: int) -> List[dict]:
+    h = get_harvest(username)
+    return await render_queue.run(lambda deadline: asyncio.to_thread(h.ensure, n, deadline), REQUEST_TIMEOUT)
+
+def overload_error(ex: Exception) -> HTTPException:
+    # 대기열 포화 -> 503 (바로 거절), deadline 초과 -> 504
+    if isinstance(ex, QueueFull):
+        return HTTPException(status_code=503, detail="BUSY", headers={"Retry-After": "1"})
+    return HTTPException(status_code=504, detail="TIMEOUT")
+
+# 커서: 목록 위치를 담은 불투명 토큰
+def encode_cursor(username: str, offset: int) -> str:
+    raw = json.dumps({"u": username, "o": offset}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, username: str) -> int:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        offset = int(data["o"])
     except Exception:
-        pass
-    return None
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if data.get("u") != username or offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return offset
 
 class PostItem(BaseModel):
     title: str
@@ -47,6 +227,10 @@ class PostItem(BaseModel):
 class PostDetailReq(BaseModel):
     url: str
 
+class JobReq(BaseModel):
+    username: str
+    concurrency: Optional[int] = None
+
 class PostDetailRes(BaseModel):
     status: str
     title: str
@@ -56,45 +240,85 @@ class PostDetailRes(BaseModel):
 # 엔드포인트 구현
 
 # 목록: GET /api/v1/velog/posts
-# - query: username (필수), page (기본 1), limit (기본 10)
+# - query: username (필수), page (기본 1), limit (기본 10), cursor (선택, 이전 응답의 nextCursor)
 @app.get("/api/v1/velog/posts")
-def get_posts(
+async def get_posts(
     username: str = Query(..., description="Velog 사용자명"),   # required
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="이전 응답의 nextCursor"),
 ):
     # 명세: username 없으면 400 (Missing username)  【명세 근거】.
     # 실제 FastAPI가 위의 required(...)로 422를 내지만, 여기선 400으로 맞춰줌.
     if not username:
         raise HTTPException(status_code=400, detail="Missing username")  # :contentReference[oaicite:8]{index=8}
 
+    # 페이지네이션 계산 (cursor 가 있으면 page 대신 cursor 위치부터)
+    start = decode_cursor(cursor, username) if cursor else (page - 1) * limit
+    stop = start + limit
+    now = reference_now()  # 상대 날짜는 이 요청 시각 하나로
+
+    page_rows = await asyncio.to_thread(archive_page, username, start, stop)
+    if page_rows is not None:
+        rows, total = page_rows
+        items = [
+            PostItem(title=r["title"], url=r["url"], date=to_date_str(r["published_at"], now), tags=r["tags"])
+            for r in rows
+        ]
+        return {
+            "status": "success",
+            "data": [i.dict() for i in items],
+            "nextCursor": encode_cursor(username, stop) if total > stop else None,
+        }
+
     try:
-        # 전체 링크 수집(Playwright) 후 페이지네이션
-        links = render_list_with_playwright(handle=username, max_scrolls=220, pause_sec=1.0)
-        if not links:
+        try:
+            # 필요한 만큼(stop + 1: 다음 페이지 존재 확인용)만 목록 API 로 가져옴.
+            # 제목/날짜/태그는 목록 데이터 그대로 사용 (글마다 렌더 X)
+            known = await harvest_until(username, stop + 1)
+            items = [
+                PostItem(
+                    title=it["title"],
+                    url=it["url"],
+                    date=to_date_str(it["released_at"], now),  # YYYY-MM-DD
+                    tags=it["tags"],
+                )
+                for it in known[start:stop]
+            ]
+            has_more = len(known) > stop
+        except (QueueFull, DeadlineExceeded):
+            raise
+        except Exception:
+            # fast path 실패 -> 전체 링크 수집(폴백) 후 페이지 구간만 상세 렌더
+            harvests.delete(username)
+            known = await cached_links(username)
+            # 제목/날짜/태그만 가볍게 (상세 전체 렌더는 비용 큼), 구간 안에서는 동시에
+            details = await asyncio.gather(*(cached_post(url) for url in known[start:stop]))
+            items = [
+                PostItem(
+                    title=title or "",
+                    url=url,
+                    date=to_date_str(published, now),  # YYYY-MM-DD
+                    tags=tags or []
+                )
+                for url, (title, _, _, tags, published) in zip(known[start:stop], details)
+            ]
+            has_more = len(known) > stop
+
+        if not known:
             # 사용자 없음으로 볼 수 있는 상황 → 404
             raise HTTPException(status_code=404, detail="User not found")  # :contentReference[oaicite:9]{index=9}
 
-        # 페이지네이션 계산
-        start = (page - 1) * limit
-        stop = start + limit
-        page_links = links[start:stop]
-
-        items: List[PostItem] = []
-        for url in page_links:
-            # 제목/날짜/태그만 가볍게 (상세 전체 렌더는 비용 큼)
-            title, _, _, tags, published = render_post_with_playwright(url)
-            items.append(PostItem(
-                title=title or "",
-                url=url,
-                date=normalize_created_at(published),  # YYYY-MM-DD
-                tags=tags or []
-            ))
-
-        return {"status": "success", "data": [i.dict() for i in items]}  # :contentReference[oaicite:10]{index=10}
+        return {
+            "status": "success",
+            "data": [i.dict() for i in items],
+            "nextCursor": encode_cursor(username, stop) if has_more else None,
+        }  # :contentReference[oaicite:10]{index=10}
 
     except HTTPException:
         raise
+    except (QueueFull, DeadlineExceeded) as ex:
+        raise overload_error(ex)
     except Exception:
         # 구조 변경 등 크롤 실패 → 500
         raise HTTPException(status_code=500, detail="CRAWLING_FAILED")  # :contentReference[oaicite:11]{index=11}
@@ -102,16 +326,20 @@ def get_posts(
 
 # 상세: POST /api/v1/velog/post-detail
 @app.post("/api/v1/velog/post-detail", response_model=PostDetailRes)
-def post_detail(req: PostDetailReq):
+async def post_detail(req: PostDetailReq):
     if not req.url:
         raise HTTPException(status_code=400, detail="Missing URL")  # :contentReference[oaicite:12]{index=12}
     try:
-        title, text, _, _, published = render_post_with_playwright(req.url)
+        post = await asyncio.to_thread(archive_post, req.url)
+        if post is not None:
+            title, text, published = post["title"], post["text"], post["published_at"]
+        else:
+            title, text, _, _, published = await cached_post(req.url)
 
         # 본문을 HTML로 요구하므로, article의 inner_text 대신 inner_html을 원하면
-        # crawl_velog.render_post_with_playwright()를 약간 수정(HTML도 반환)해도 됨.
+        # crawl_velog 백엔드를 약간 수정(HTML도 반환)해도 됨.
         # 우선은 text를 그대로 content에 넣고, 필요시 HTML 확장.
-        created = normalize_created_at(published)
+        created = to_date_str(published)
 
         if not (title or text):
             # 존재하지 않는 글 처리
@@ -125,5 +353,96 @@ def post_detail(req: PostDetailReq):
         )
     except HTTPException:
         raise
+    except (QueueFull, DeadlineExceeded) as ex:
+        raise overload_error(ex)
     except Exception:
         raise HTTPException(status_code=500, detail="CRAWLING_FAILED")  # :contentReference[oaicite:16]{index=16}
+
+
+# 캐시 통계: GET /api/v1/cache/stats
+@app.get("/api/v1/cache/stats")
+async def cache_stats():
+    return {"status": "success", "data": cache.stats()}
+
+# 렌더 대기열 상태: GET /api/v1/render-queue/stats
+@app.get("/api/v1/render-queue/stats")
+async def render_queue_stats():
+    data = render_queue.stats() if render_queue else {}
+    if pool is not None:
+        data["browser_requests"] = pool.policy.stats.snapshot()  # 요청 차단 규칙별 허용/차단 수, 바이트
+    return {"status": "success", "data": data}
+
+
+# 백그라운드 크롤 작업
+# - POST /api/v1/jobs {username} -> 작업 id (바로 반환, 수집은 뒤에서)
+# - GET /api/v1/jobs/{id} -> 상태/진행 상황
+# - GET /api/v1/jobs/{id}/posts?format=ndjson|sse&after=seq -> 수집되는 글을 끝날 때까지 흘려보냄
+def job_view(job: dict) -> dict:
+    return {
+        "id": job["id"],
+        "username": job["handle"],
+        "status": job["status"],
+        "linksFound": job["links_found"],
+        "postsDone": job["posts_done"],
+        "errors": job["errors"],
+        "error": job["error"],
+    }
+
+def get_job_or_404(job_id: str) -> dict:
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/api/v1/jobs", status_code=202)
+async def create_job(req: JobReq):
+    if not req.username:
+        raise HTTPException(status_code=400, detail="Missing username")
+    opts = {"concurrency": req.concurrency or JOB_CONCURRENCY}
+    job = await asyncio.to_thread(jobs.submit, req.username, opts)
+    return {"status": "success", "data": job_view(job)}
+
+@app.get("/api/v1/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await asyncio.to_thread(get_job_or_404, job_id)
+    return {"status": "success", "data": job_view(job)}
+
+@app.get("/api/v1/jobs/{job_id}/posts")
+async def stream_job_posts(
+    job_id: str,
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+    after: int = Query(0, ge=0, description="이 seq 다음 글부터 (끊긴 뒤 이어받기)"),
+    last_event_id: Optional[str] = Header(None),
+):
+    await asyncio.to_thread(get_job_or_404, job_id)
+    sse = format == "sse"
+    if sse and last_event_id and last_event_id.isdigit():
+        after = max(after, int(last_event_id))  # EventSource 자동 재연결
+
+    async def events():
+        seq = after
+        while True:
+            # 상태를 먼저 읽어야 끝난 뒤에 추가된 글을 놓치지 않음
+            job = await asyncio.to_thread(job_store.get, job_id)
+            rows = await asyncio.to_thread(job_store.posts_after, job_id, seq)
+            for seq, post in rows:
+                yield f"id: {seq}\nevent: post\ndata: {post}\n\n" if sse else post + "\n"
+            if rows:
+                continue
+            if job["status"] in FINISHED:
+                break
+            await asyncio.sleep(0.5)
+        if sse:
+            yield f"event: end\ndata: {json.dumps(job_view(job), ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+# Prometheus: GET /metrics (단계별 히스토그램 + 캐시/대기열/브라우저 게이지)
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,399 @@
+# 컬럼형 아카이브 (.vca): out.json 과 같은 문서({"source", "author", "posts", ...})를 작고 빨리 읽히게
+# - 메타데이터(url/title/tags/날짜/code_langs/likes/comments/series/content_hash)는 필드별 열(column)로
+#   문자열 열 = 끝 오프셋 배열(uint64) + UTF-8 바이트, 목록 열 = 글별 항목 범위 + 항목 문자열 열, 숫자 열 = int64 배열
+# - 본문은 따로 blob 구간: 글 순서대로 이어 붙여 BLOCK_SIZE 단위로 zlib 압축, 글별 오프셋/블록 색인으로 찾아감
+# - 읽기는 mmap: 열은 파일을 그대로 memoryview 로 보므로 메타데이터만 쓰는 쪽(API 목록 등)은 본문 압축을 풀지 않음
+# - 파일 배치: MAGIC | 헤더 위치(u64, u64) | 본문 블록들 | 열 구간들 | 헤더(JSON: 문서 메타, 글 수, 구간 위치)
+#   구간은 8바이트 정렬, 정수는 리틀엔디언
+import array, bisect, json, mmap, os, re, struct, sys, zlib
+from typing import Dict, Iterator, Optional
+
+from store import POST_FIELDS
+
+MAGIC = b"VELOGCA\x00"
+ARCHIVE_EXT = ".vca"
+# 문서 schema_version: 1 = out.json (JSON), 2 = 컬럼형 아카이브. 글 필드는 같음
+# 버전은 문서 형식(JSON / 컬럼형)을 가리킴 -> 글 필드가 바뀌지 않는 한 JSON 쪽(crawl_velog, store.export,
+# jsonl_out.compact_to_json, unpack)은 계속 1. 기존 out.json 소비자가 그대로 읽음
+SCHEMA_VERSION = 2
+JSON_SCHEMA_VERSION = 1
+BLOCK_SIZE = 256 * 1024  # 본문 압축 블록 크기(압축 전). 글 하나를 읽으면 블록 하나만 풂
+
+STR_FIELDS = ("url", "title", "published_at", "updated_at", "content_hash")
+LIST_FIELDS = ("tags", "code_langs")
+INT_FIELDS = ("likes", "comments")
+NULLABLE_FIELDS = ("series",)
+META_FIELDS = [k for k in POST_FIELDS if k != "text"]
+_KNOWN = set(POST_FIELDS)
+_PREFIX = struct.Struct("<8sQQ")
+
+
+class _StrColumn:
+    def __init__(self):
+        self.data = bytearray()
+        self.ends = array.array("Q")
+
+    def add(self, s: str) -> None:
+        self.data += s.encode("utf-8")
+        self.ends.append(len(self.data))
+
+    def segments(self, name: str) -> Dict[str, bytes]:
+        return {f"{name}.ends": _le(self.ends), f"{name}.data": bytes(self.data)}
+
+
+def _le(arr: array.array) -> bytes:
+    if sys.byteorder == "big":
+        arr = array.array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+class ArchiveWriter:
+    # 글을 하나씩 add -> close 에서 열/헤더를 씀. 본문은 블록이 찰 때마다 바로 파일로 (메모리 = 메타데이터 + 블록 1개)
+    # meta 는 close 때 읽으므로 iter_json_posts 처럼 글을 읽으면서 채워지는 dict 를 넘겨도 됨
+    def __init__(self, path: str, meta: Optional[dict] = None, block_size: int = BLOCK_SIZE, level: int = 6):
+        self.path = path
+        self.meta = meta if meta is not None else {}
+        self.block_size = block_size
+        self.level = level
+        self.count = 0
+        self._tmp = path + ".tmp"
+        self._f = open(self._tmp, "wb")
+        self._f.write(_PREFIX.pack(MAGIC, 0, 0))
+        self._str = {k: _StrColumn() for k in STR_FIELDS}
+        self._lists = {k: (array.array("Q"), _StrColumn()) for k in LIST_FIELDS}
+        self._ints = {k: array.array("q") for k in INT_FIELDS}
+        self._nullable = {k: (bytearray(), _StrColumn()) for k in NULLABLE_FIELDS}
+        self._extra = _StrColumn()  # 위에 없는 키가 있으면 JSON 으로 (없으면 빈 문자열)
+        self._text_ends = array.array("Q")
+        self._block_first = array.array("Q")
+        self._block_pos = array.array("Q")
+        self._block = bytearray()
+        self._block_open = False  # 빈 본문만 든 블록도 블록 하나로 셈 (len(_block) 로 판단하면 안 됨)
+        self._text_len = 0
+
+    def add(self, post: dict) -> None:
+        for k, col in self._str.items():
+            col.add(post.get(k) or "")
+        for k, (spans, items) in self._lists.items():
+            for x in post.get(k) or ():
+                items.add(str(x))
+            spans.append(len(items.ends))
+        for k, col in self._ints.items():
+            col.append(int(post.get(k) or 0))
+        for k, (nulls, col) in self._nullable.items():
+            v = post.get(k)
+            nulls.append(v is None)
+            col.add("" if v is None else str(v))
+        extra = {k: v for k, v in post.items() if k not in _KNOWN}
+        self._extra.add(json.dumps(extra, ensure_ascii=False) if extra else "")
+
+        if not self._block_open:
+            self._block_first.append(self.count)
+            self._block_open = True
+        text = (post.get("text") or "").encode("utf-8")
+        self._block += text
+        self._text_len += len(text)
+        self._text_ends.append(self._text_len)
+        self.count += 1
+        if len(self._block) >= self.block_size:
+            self._flush_block()
+
+    def _flush_block(self) -> None:
+        self._block_pos.append(self._f.tell())
+        self._f.write(zlib.compress(bytes(self._block), self.level))
+        self._block.clear()
+        self._block_open = False
+
+    def close(self) -> str:
+        if self._f is None:
+            return self.path
+        if self._block_open:
+            self._flush_block()
+        self._block_pos.append(self._f.tell())  # 마지막 블록의 끝
+        self._block_first.append(self.count)
+
+        segs: Dict[str, bytes] = {}
+        for k, col in self._str.items():
+            segs.update(col.segments(k))
+        for k, (spans, items) in self._lists.items():
+            segs[f"{k}.spans"] = _le(spans)
+            segs.update(items.segments(f"{k}.items"))
+        for k, col in self._ints.items():
+            segs[k] = _le(col)
+        for k, (nulls, col) in self._nullable.items():
+            segs[f"{k}.null"] = bytes(nulls)
+            segs.update(col.segments(k))
+        segs.update(self._extra.segments("extra"))
+        segs["text.ends"] = _le(self._text_ends)
+        segs["text.block_first"] = _le(self._block_first)
+        segs["text.block_pos"] = _le(self._block_pos)
+
+        where = {}
+        for name, raw in segs.items():
+            self._f.write(b"\0" * (-self._f.tell() % 8))
+            where[name] = [self._f.tell(), len(raw)]
+            self._f.write(raw)
+        doc = {k: v for k, v in self.meta.items() if k not in ("posts", "schema_version")}
+        header = json.dumps({
+            "schema_version": SCHEMA_VERSION, "doc": doc, "count": self.count,
+            "codec": "zlib", "segments": where,
+        }, ensure_ascii=False).encode("utf-8")
+        pos = self._f.tell()
+        self._f.write(header)
+        self._f.seek(0)
+        self._f.write(_PREFIX.pack(MAGIC, pos, len(header)))
+        self._f.close()
+        self._f = None
+        os.replace(self._tmp, self.path)
+        return self.path
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.close()
+        elif self._f is not None:
+            self._f.close()
+            self._f = None
+            os.remove(self._tmp)
+
+
+class ArchiveReader:
+    def __init__(self, path: str):
+        if sys.byteorder != "little":
+            raise RuntimeError("컬럼형 아카이브는 리틀엔디언 환경에서만 읽을 수 있습니다")
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # 빈 파일
+            self._file.close()
+            raise ValueError(f"{path}: not a Velog archive")
+        magic, pos, size = _PREFIX.unpack_from(self._mm, 0) if len(self._mm) >= _PREFIX.size else (b"", 0, 0)
+        if magic != MAGIC or not pos:
+            self.close()
+            raise ValueError(f"{path}: not a Velog archive (or unfinished write)")
+        header = json.loads(self._mm[pos:pos + size])
+        self.schema_version = header["schema_version"]
+        self.meta = dict(header["doc"], schema_version=self.schema_version)
+        self.count = header["count"]
+        self._where = header["segments"]
+        self._buf = memoryview(self._mm)
+        self._views: Dict[str, memoryview] = {}
+        self._block = (-1, b"")  # (블록 번호, 푼 본문) - 튜플 하나로 바꿔 끼워 여러 스레드가 읽어도 안전
+        self._url_index: Optional[Dict[str, int]] = None
+
+    def close(self) -> None:
+        # memoryview 를 모두 놓아야 mmap 을 닫을 수 있음
+        for v in getattr(self, "_views", {}).values():
+            v.release()
+        self._views = {}
+        if getattr(self, "_buf", None) is not None:
+            self._buf.release()
+            self._buf = None
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    # --- 열 접근 (복사 없이 mmap 위의 view) ---
+
+    def _seg(self, name: str, fmt: str = "B") -> memoryview:
+        v = self._views.get(name)
+        if v is None:
+            off, size = self._where[name]
+            v = self._buf[off:off + size]
+            if fmt != "B":
+                v = v.cast(fmt)
+            self._views[name] = v
+        return v
+
+    def _str(self, name: str, i: int) -> str:
+        ends = self._seg(f"{name}.ends", "Q")
+        start = ends[i - 1] if i else 0
+        return str(self._seg(f"{name}.data")[start:ends[i]], "utf-8")
+
+    def field(self, name: str, i: int):
+        if name in STR_FIELDS:
+            return self._str(name, i)
+        if name in LIST_FIELDS:
+            spans = self._seg(f"{name}.spans", "Q")
+            return [self._str(f"{name}.items", j) for j in range(spans[i - 1] if i else 0, spans[i])]
+        if name in INT_FIELDS:
+            return self._seg(name, "q")[i]
+        if name in NULLABLE_FIELDS:
+            return None if self._seg(f"{name}.null")[i] else self._str(name, i)
+        if name == "text":
+            return self.text(i)
+        raise KeyError(name)
+
+    def url(self, i: int) -> str:
+        return self._str("url", i)
+
+    def meta_row(self, i: int) -> dict:
+        # 본문을 뺀 글 레코드 (압축을 풀지 않음)
+        row = {k: self.field(k, i) for k in META_FIELDS}
+        extra = self._str("extra", i)
+        if extra:
+            row.update(json.loads(extra))
+        return row
+
+    def iter_meta(self, start: int = 0, stop: Optional[int] = None) -> Iterator[dict]:
+        for i in range(start, min(self.count, self.count if stop is None else stop)):
+            yield self.meta_row(i)
+
+    def text(self, i: int) -> str:
+        # 글이 든 블록 하나만 풂 (직전 블록은 기억 -> 순서대로 읽으면 블록마다 한 번)
+        first = self._seg("text.block_first", "Q")
+        b = bisect.bisect_right(first, i) - 1
+        block = self._block
+        if block[0] != b:
+            pos = self._seg("text.block_pos", "Q")
+            block = self._block = (b, zlib.decompress(self._buf[pos[b]:pos[b + 1]]))
+        ends = self._seg("text.ends", "Q")
+        base = ends[first[b] - 1] if first[b] else 0
+        start = ends[i - 1] if i else 0
+        return block[1][start - base:ends[i] - base].decode("utf-8")
+
+    def post(self, i: int) -> dict:
+        row = {k: self.field(k, i) for k in POST_FIELDS}
+        extra = self._str("extra", i)
+        if extra:
+            row.update(json.loads(extra))
+        return row
+
+    def iter_posts(self) -> Iterator[dict]:
+        for i in range(self.count):
+            yield self.post(i)
+
+    def index_of(self, url: str) -> Optional[int]:
+        if self._url_index is None:
+            self._url_index = {self.url(i): i for i in range(self.count)}
+        return self._url_index.get(url)
+
+    def get(self, url: str) -> Optional[dict]:
+        i = self.index_of(url)
+        return None if i is None else self.post(i)
+
+    def stats(self) -> dict:
+        pos = self._seg("text.block_pos", "Q")
+        return {
+            "meta": self.meta,
+            "posts": self.count,
+            "file_bytes": len(self._mm),
+            "text_bytes": self._seg("text.ends", "Q")[-1] if self.count else 0,
+            "text_blocks": len(pos) - 1,
+            "text_compressed_bytes": pos[-1] - pos[0],
+            "segments": {name: size for name, (_, size) in self._where.items()},
+        }
+
+
+def is_archive(path: str) -> bool:
+    if path.endswith(ARCHIVE_EXT):
+        return True
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def iter_archive_posts(path: str, meta: Optional[dict] = None) -> Iterator[dict]:
+    # load_posts 용: 글을 하나씩 (본문은 블록 단위로 풀림), meta 에 문서 메타 채움
+    with ArchiveReader(path) as reader:
+        if meta is not None:
+            meta.update(reader.meta)
+        yield from reader.iter_posts()
+
+
+def pack(json_path: str, out_path: str, block_size: int = BLOCK_SIZE, level: int = 6) -> int:
+    # out.json(또는 JSONL) -> 아카이브. 입력은 글 단위로 읽음
+    from analyze import load_posts
+
+    meta: dict = {}
+    with ArchiveWriter(out_path, meta, block_size=block_size, level=level) as w:
+        for p in load_posts(json_path, meta):
+            w.add(p)
+    return w.count
+
+
+def unpack(archive_path: str, out_path: str) -> int:
+    # 아카이브 -> 기존 out.json(pretty, schema_version 1). 글 단위로 써서 본문을 한꺼번에 올리지 않음
+    tmp = out_path + ".tmp"
+    with ArchiveReader(archive_path) as r, open(tmp, "w", encoding="utf-8") as f:
+        doc = {k: v for k, v in r.meta.items() if k != "schema_version"}
+        head = json.dumps(doc, ensure_ascii=False, indent=2)
+        f.write((head[:-2] + ",\n" if doc else "{\n") + '  "posts": [')
+        for i, p in enumerate(r.iter_posts()):
+            body = json.dumps(p, ensure_ascii=False, indent=2).replace("\n", "\n    ")
+            f.write(("," if i else "") + "\n    " + body)
+        f.write(("\n  " if r.count else "") + f'],\n  "schema_version": {JSON_SCHEMA_VERSION}\n}}')
+        n = r.count
+    os.replace(tmp, out_path)
+    return n
+
+
+def write_doc(doc: dict, path: str) -> None:
+    # 크롤러 --out 용: 확장자가 .vca 면 아카이브, 아니면 기존 pretty JSON
+    if path.endswith(ARCHIVE_EXT):
+        with ArchiveWriter(path, doc) as w:
+            for p in doc.get("posts", []):
+                w.add(p)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(doc, f, ensure_ascii=False, indent=2)
+
+
+def read_doc(path: str) -> dict:
+    if is_archive(path):
+        with ArchiveReader(path) as r:
+            return dict(r.meta, posts=list(r.iter_posts()))
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    import argparse, time
+
+    parser = argparse.ArgumentParser(description="Convert between out.json and the columnar archive (.vca)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("pack", help="out.json / JSONL -> .vca")
+    p.add_argument("src")
+    p.add_argument("dst", nargs="?", help="default: <src without extension>.vca")
+    p.add_argument("--block-kb", type=int, default=BLOCK_SIZE // 1024, help="body compression block size")
+    p.add_argument("--level", type=int, default=6, help="zlib level for bodies (1: fastest, 9: smallest)")
+    p = sub.add_parser("unpack", help=".vca -> out.json")
+    p.add_argument("src")
+    p.add_argument("dst", nargs="?", help="default: <src without extension>.json")
+    p = sub.add_parser("info", help="print archive header and sizes")
+    p.add_argument("src")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    if args.cmd == "pack":
+        dst = args.dst or re.sub(r"\.jsonl?(\.gz|\.zst)?$", "", args.src) + ARCHIVE_EXT
+        n = pack(args.src, dst, args.block_kb * 1024, args.level)
+    elif args.cmd == "unpack":
+        dst = args.dst or os.path.splitext(args.src)[0] + ".json"
+        n = unpack(args.src, dst)
+    else:
+        with ArchiveReader(args.src) as r:
+            print(json.dumps(r.stats(), ensure_ascii=False, indent=2))
+        return
+    print(f"[DONE] {n}개 글 {args.src} ({os.path.getsize(args.src) / 1e6:.1f}MB) → {dst}"
+          f" ({os.path.getsize(dst) / 1e6:.1f}MB, {time.perf_counter() - t0:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# 여러 작성자 일괄 분석 (analyze.py 의 summary 를 작성자마다 계산해 표 하나로)
+# - 입력: 작성자별 out.json 파일들(scheduler --out-dir 결과 등) 또는 크롤 저장소(crawl.db)
+# - 작성자 단위로 프로세스 풀에 분배 (각 프로세스가 자기 파일/DB 연결에서 직접 읽음 -> 본문을 부모로 옮기지 않음)
+# - 날짜 파싱/분류만 글마다 Python, 간격/CV/연속 일수/최근 90일/월별 집계는 정렬된 타임스탬프 배열에 NumPy 연산
+# - 결과: 작성자 1명 = 1행 (JSON 또는 CSV)
+import csv, glob, json, multiprocessing, os, time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from analyze import PostRow, build_rows, cadence_score, load_posts
+from store import handle_of
+
+try:
+    import numpy as np
+except ImportError:  # 선택 의존성
+    np = None
+
+US_PER_DAY = 86_400_000_000
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_US = timedelta(microseconds=1)
+
+# CSV 로 쓸 열 (중첩 값은 JSON 문자열)
+TABLE_FIELDS = [
+    "handle", "source", "active_start", "active_end", "active_days", "total_posts", "total_study_posts",
+    "longest_streak_days", "max_gap_days", "interval_cv", "last_90d_posts", "last_90d_weeks_active",
+    "cadence_score", "top_topics", "posts_per_month", "error",
+]
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("일괄 분석에는 numpy 패키지가 필요합니다: pip install numpy")
+
+
+def rows_to_arrays(rows: List[PostRow]) -> Dict[str, object]:
+    # build_rows 결과(시간순) -> 열 배열. 타임스탬프는 epoch 기준 마이크로초(int64, timedelta.days 와 같은 내림 계산용)
+    topics: Dict[str, int] = {}
+    pair_row, pair_topic, majors = [], [], []
+    for i, r in enumerate(rows):
+        majors.append(topics.setdefault(r.major, len(topics)) if r.major else -1)
+        for t in r.topics or ([r.major] if r.major else []):
+            pair_row.append(i)
+            pair_topic.append(topics.setdefault(t, len(topics)))
+    return {
+        "ts": np.array([(r.ts - EPOCH) // _ONE_US for r in rows], dtype=np.int64),
+        "is_study": np.array([r.is_study for r in rows], dtype=bool),
+        "major": np.array(majors, dtype=np.int64),
+        "pair_row": np.array(pair_row, dtype=np.int64),
+        "pair_topic": np.array(pair_topic, dtype=np.int64),
+        "topic_names": list(topics),
+    }
+
+
+def vector_summary(arr: Dict[str, object], author: dict) -> Tuple[dict, dict]:
+    # analyze.summarize 와 같은 값을 배열 연산으로 (rows 가 비어 있지 않아야 함)
+    ts, names = arr["ts"], arr["topic_names"]
+    study_idx = np.flatnonzero(arr["is_study"])
+    if not study_idx.size:
+        study_idx = np.arange(ts.size)
+    s = ts[study_idx]
+    day = s // US_PER_DAY
+
+    # 간격(일, 내림)/CV: 모집단 표준편차 / 평균
+    gaps = np.diff(s) // US_PER_DAY
+    max_gap = int(gaps.max()) if gaps.size else 0
+    cv = 0.0
+    if gaps.size:
+        mean = gaps.mean()
+        if mean > 0:
+            cv = float(gaps.std() / mean)
+
+    # 최장 연속 일수: 고유 날짜에서 1일 차이가 끊기는 지점 사이의 길이
+    days = np.unique(day)
+    breaks = np.flatnonzero(np.diff(days) != 1)
+    longest_streak = int(np.diff(np.concatenate(([-1], breaks, [days.size - 1]))).max())
+
+    # 최근 90일 (마지막 글 날짜 포함 90일), ISO 주: 1970-01-01 이 목요일이므로 (day + 3) // 7 이 같은 주
+    recent = day[day >= day[-1] - 89]
+    last_90_posts = int(recent.size)
+    last_90_weeks_active = int(np.unique((recent + 3) // 7).size)
+
+    # 월별
+    month = day.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    months, month_idx, month_counts = np.unique(month, return_inverse=True, return_counts=True)
+    labels = [str(m) for m in months.astype("datetime64[M]")]
+    per_month = {labels[i]: int(c) for i, c in enumerate(month_counts)}
+
+    # 주제별 월별: (주제, 월) 쌍을 정수 키 하나로 묶어 한 번에 셈
+    pos = np.full(ts.size, -1, dtype=np.int64)
+    pos[study_idx] = np.arange(study_idx.size)
+    keep = pos[arr["pair_row"]] >= 0
+    p_topic = arr["pair_topic"][keep]
+    p_month = month_idx[pos[arr["pair_row"][keep]]]
+    keys, counts = np.unique(p_topic * months.size + p_month, return_counts=True)
+    topic_trend: Dict[str, Dict[str, int]] = {}
+    for t in _by_first_seen(p_topic):
+        topic_trend[names[t]] = {}
+    for k, c in zip(keys.tolist(), counts.tolist()):
+        topic_trend[names[k // months.size]][labels[k % months.size]] = c
+
+    # 대표 주제: 횟수 내림차순, 같으면 먼저 나온 주제 (Counter.most_common 과 같은 순서)
+    majors = arr["major"][study_idx]
+    majors = majors[majors >= 0]
+    top_topics = []
+    if majors.size:
+        cnt = np.bincount(majors)
+        order = sorted(_by_first_seen(majors), key=lambda t: -cnt[t])
+        top_topics = [(names[t], int(cnt[t])) for t in order[:5]]
+
+    start, end = (np.datetime64(int(x), "D") for x in (day[0], day[-1]))
+    summary = {
+        "author": author,
+        "active_start": str(start),
+        "active_end": str(end),
+        "active_days": int((end - start).astype(np.int64)) + 1,
+        "total_posts": int(ts.size),
+        "total_study_posts": int(study_idx.size),
+        "posts_per_month": per_month,
+        "longest_streak_days": longest_streak,
+        "max_gap_days": max_gap,
+        "interval_cv": round(cv, 3),
+        "last_90d_posts": last_90_posts,
+        "last_90d_weeks_active": last_90_weeks_active,
+        "cadence_score": round(cadence_score(cv, max_gap, last_90_posts), 1),
+        "top_topics": top_topics,
+    }
+    return summary, topic_trend
+
+
+def _by_first_seen(codes) -> List[int]:
+    uniq, first = np.unique(codes, return_index=True)
+    return uniq[np.argsort(first, kind="stable")].tolist()
+
+
+# --- 작업 단위: ("file", 경로) / ("store", DB 경로, handle) ---
+
+_stores: Dict[str, object] = {}
+
+
+def _load(task: Tuple[str, ...]) -> Tuple[dict, Iterable[dict]]:
+    # (meta, 글 이터레이터). 파일은 글 단위로 읽어 본문을 한꺼번에 올리지 않음 (meta 는 다 읽은 뒤 채워짐)
+    if task[0] == "file":
+        meta: dict = {}
+        return meta, load_posts(task[1], meta)
+    _, path, handle = task
+    store = _stores.get(path)
+    if store is None:
+        from store import CrawlStore
+        store = _stores[path] = CrawlStore(path)
+    return {"author": {"handle": handle}}, store.iter_posts(handle)
+
+
+def analyze_task(task: Tuple[str, ...]) -> dict:
+    # 프로세스 풀에서 실행: 작성자 1명 -> 표 1행 (실패해도 행은 남김)
+    source = task[1] if task[0] == "file" else f"{task[1]}#{task[2]}"
+    row = {"source": source}
+    try:
+        meta, posts = _load(task)
+        rows = build_rows(posts)
+        author = meta.get("author") or ({"handle": handle_of(rows[0].url)} if rows else {})
+        row["handle"] = author.get("handle", "")
+        if not rows:
+            row["error"] = "no dated posts"
+            return row
+        summary, topic_trend = vector_summary(rows_to_arrays(rows), author)
+    except Exception as ex:
+        row["error"] = f"{type(ex).__name__}: {ex}"
+        return row
+    summary.pop("author")
+    row.update(summary)
+    row["topic_trend"] = topic_trend
+    return row
+
+
+def run_batch_analysis(tasks: List[Tuple[str, ...]], workers: int = 0, chunksize: int = 0) -> List[dict]:
+    # 작성자별 결과를 cadence_score 내림차순으로
+    _require_numpy()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        results = [analyze_task(t) for t in tasks]
+    else:
+        # 작업 수가 많으면 묶어서 보내 프로세스 간 왕복을 줄임
+        chunksize = chunksize or max(1, len(tasks) // (workers * 4))
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            results = list(pool.map(analyze_task, tasks, chunksize=chunksize))
+    results.sort(key=lambda r: (-r.get("cadence_score", -1), r.get("handle", "")))
+    return results
+
+
+def write_table(results: List[dict], path: str) -> None:
+    if path.endswith(".csv"):
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=TABLE_FIELDS, extrasaction="ignore")
+            w.writeheader()
+            for r in results:
+                w.writerow({k: json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else v
+                            for k, v in r.items()})
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"generated_at": datetime.now(timezone.utc).isoformat(), "authors": results},
+                  f, ensure_ascii=False, indent=2)
+
+
+def collect_tasks(files: List[str], store_path: str = "", handles: Optional[List[str]] = None) -> List[Tuple[str, ...]]:
+    tasks: List[Tuple[str, ...]] = []
+    for pattern in files:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            if os.path.isdir(path):
+                tasks += [("file", p) for ext in ("*.json", "*.vca") for p in sorted(glob.glob(os.path.join(path, ext)))]
+            else:
+                tasks.append(("file", path))
+    if store_path:
+        from store import CrawlStore
+        with CrawlStore(store_path) as store:
+            for h in handles or store.handles():
+                tasks.append(("store", store_path, h))
+    return tasks
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Batch Velog author analytics")
+    parser.add_argument("files", nargs="*", help="author out.json / .vca files, globs or directories")
+    parser.add_argument("--store", default="", help="analyze authors from this SQLite crawl store")
+    parser.add_argument("--handles", default="", help="comma separated handles (with --store; default: all)")
+    parser.add_argument("--workers", type=int, default=0, help="analysis processes (default: CPU count)")
+    parser.add_argument("--out", default="batch_summary.json", help="combined table (.json or .csv)")
+    args = parser.parse_args()
+
+    handles = [h.strip().lstrip("@") for h in args.handles.split(",") if h.strip()]
+    tasks = collect_tasks(args.files, args.store, handles)
+    if not tasks:
+        parser.error("분석할 파일 또는 --store 가 필요합니다")
+
+    t0 = time.perf_counter()
+    results = run_batch_analysis(tasks, args.workers)
+    elapsed = time.perf_counter() - t0
+    write_table(results, args.out)
+
+    failed = [r for r in results if r.get("error")]
+    print(f"[DONE] 작성자 {len(results)}명 분석 ({elapsed:.2f}s, 실패 {len(failed)}) → {args.out}")
+    for r in failed[:20]:
+        print(f"[WARN] {r['source']}: {r['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+# 오프라인 벤치마크: fixture_server 의 로컬 velog 대역 서버로 크롤러/API 성능 측정
+# 시나리오
+# - list      : render_list_with_playwright (프로필 무한 스크롤)
+# - post      : render_post_with_playwright 순차 렌더
+# - crawl     : crawl_all_posts (playwright 백엔드, --concurrency)
+# - crawl-http: crawl_all_posts (http 백엔드)
+# - api       : app.py 의 목록/상세 엔드포인트 (in-process TestClient, 동시 요청)
+# 결과: 시나리오별 posts/sec, 글당 지연 p50/p95/p99, 최대 RSS(자식 프로세스 포함), 최대 브라우저 프로세스 수 -> JSON
+# --baseline 으로 이전 결과와 비교해 tolerance 이상 나빠지면 종료 코드 1
+import contextlib, json, os, platform, subprocess, sys, threading, time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from fixture_server import start_fixture_server
+
+SCENARIOS = ["list", "post", "crawl", "crawl-http", "api"]
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = (len(s) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+def latency_summary(latencies_s: List[float]) -> Dict[str, float]:
+    ms = [x * 1000 for x in latencies_s]
+    return {
+        "p50": round(percentile(ms, 0.50), 2),
+        "p95": round(percentile(ms, 0.95), 2),
+        "p99": round(percentile(ms, 0.99), 2),
+        "max": round(max(ms), 2) if ms else 0.0,
+    }
+
+
+class ProcSampler:
+    # 이 프로세스 + 자손 프로세스(Chromium 등)의 RSS 합과 브라우저 프로세스 수를 주기적으로 샘플링
+    # psutil 이 있으면 사용, 없으면 Linux /proc 직접 읽기
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.peak_rss = 0
+        self.peak_browsers = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        try:
+            import psutil
+            self._psutil = psutil
+        except ImportError:
+            self._psutil = None
+
+    def _sample(self):
+        # -> (rss_bytes, browser_count)
+        if self._psutil is not None:
+            me = self._psutil.Process()
+            procs = [me] + me.children(recursive=True)
+            rss, browsers = 0, 0
+            for p in procs:
+                try:
+                    rss += p.memory_info().rss
+                    if p.name().startswith(("chrom", "headless_shell")) and "--type=" not in " ".join(p.cmdline()):
+                        browsers += 1
+                except self._psutil.Error:
+                    pass
+            return rss, browsers
+        return _proc_tree_sample(os.getpid())
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                rss, browsers = self._sample()
+            except OSError:
+                rss, browsers = 0, 0
+            self.peak_rss = max(self.peak_rss, rss)
+            self.peak_browsers = max(self.peak_browsers, browsers)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "ProcSampler":
+        self._thread = threading.Thread(target=self._run, name="bench-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _proc_tree_sample(root: int):
+    # /proc 에서 root 의 자손 트리를 찾아 RSS 합계와 브라우저(메인) 프로세스 수
+    parent, info = {}, {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as f:
+                stat = f.read()
+            with open(f"/proc/{name}/cmdline", "rb") as f:
+                cmd = f.read().replace(b"\0", b" ").decode("utf-8", "replace")
+        except OSError:
+            continue
+        pid = int(name)
+        comm = stat[stat.index("(") + 1:stat.rindex(")")]
+        fields = stat[stat.rindex(")") + 2:].split()
+        parent[pid] = int(fields[1])
+        info[pid] = (int(fields[21]) * os.sysconf("SC_PAGE_SIZE"), comm, cmd)
+    tree = {root}
+    changed = True
+    while changed:
+        changed = False
+        for pid, ppid in parent.items():
+            if ppid in tree and pid not in tree:
+                tree.add(pid)
+                changed = True
+    rss = sum(info[p][0] for p in tree if p in info)
+    browsers = sum(
+        1 for p in tree if p in info
+        and info[p][1].startswith(("chrom", "headless_shell")) and "--type=" not in info[p][2]
+    )
+    return rss, browsers
+
+
+class TimedBackend:
+    # 백엔드 래퍼: submit_post 제출 -> 완료까지 시간을 기록 (ordered window 라 대기는 최대 한 글 분량)
+    def __init__(self, backend):
+        self.backend = backend
+        self.name = backend.name
+        self.latencies: List[float] = []
+        self._lock = threading.Lock()
+
+    def __getattr__(self, item):
+        return getattr(self.backend, item)
+
+    def submit_post(self, url: str, deadline: Optional[float] = None) -> Future:
+        t0 = time.perf_counter()
+        fut = self.backend.submit_post(url, deadline)
+
+        def done(_):
+            with self._lock:
+                self.latencies.append(time.perf_counter() - t0)
+
+        fut.add_done_callback(done)
+        return fut
+
+
+def measure(fn: Callable[[], Dict[str, object]]) -> Dict[str, object]:
+    # fn() -> {"posts": n, "latencies": [초...], ...추가 필드}
+    with ProcSampler() as sampler:
+        t0 = time.perf_counter()
+        out = fn()
+        seconds = time.perf_counter() - t0
+    latencies = out.pop("latencies", [])
+    posts = out.pop("posts")
+    return {
+        "posts": posts,
+        "seconds": round(seconds, 3),
+        "posts_per_sec": round(posts / seconds, 3) if seconds > 0 else 0.0,
+        "latency_ms": latency_summary(latencies),
+        "peak_rss_mb": round(sampler.peak_rss / 1024 / 1024, 1),
+        "peak_browsers": sampler.peak_browsers,
+        **out,
+    }
+
+
+def _pool(workers: int):
+    from browser_pool import BrowserPool
+    from resource_policy import ResourcePolicy
+    return BrowserPool(workers=workers, policy=ResourcePolicy(allow_domains=("127.0.0.1",)))
+
+
+def bench_list(base: str, handle: str, args) -> Dict[str, object]:
+    from crawl_velog import render_list_with_playwright
+
+    def run():
+        with _pool(1) as pool:
+            t0 = time.perf_counter()
+            links = render_list_with_playwright(handle, max_scrolls=500, pause_sec=0.2, pool=pool, base_url=base)
+            return {"posts": len(links), "latencies": [time.perf_counter() - t0],
+                    "browser_requests": pool.policy.stats.snapshot()}
+    return measure(run)
+
+
+def bench_post(base: str, handle: str, args, urls: List[str]) -> Dict[str, object]:
+    from crawl_velog import render_post_with_playwright
+
+    def run():
+        latencies, empty = [], 0
+        with _pool(1) as pool:
+            for url in urls[:args.sample]:
+                t0 = time.perf_counter()
+                title, text, _, _, _ = render_post_with_playwright(url, pool=pool)
+                latencies.append(time.perf_counter() - t0)
+                empty += not (title and text)
+            return {"posts": len(latencies), "latencies": latencies, "empty": empty,
+                    "browser_requests": pool.policy.stats.snapshot()}
+    return measure(run)
+
+
+def bench_crawl(base: str, handle: str, args, kind: str) -> Dict[str, object]:
+    from crawl_velog import crawl_all_posts, make_backend
+
+    def run():
+        with _pool(args.concurrency) as pool:
+            backend = TimedBackend(make_backend(kind, pool, None, workers=args.concurrency, base_url=base))
+            try:
+                data = crawl_all_posts(
+                    handle, pause_sec=0.2, per_post_delay=0, pool=pool, concurrency=args.concurrency,
+                    backend=backend,
+                )
+            finally:
+                backend.close()
+            return {"posts": len(data["posts"]), "latencies": backend.latencies,
+                    "browser_requests": pool.policy.stats.snapshot()}
+    return measure(run)
+
+
+def bench_api(base: str, handle: str, args, urls: List[str]) -> Dict[str, object]:
+    os.environ["VELOG_BASE_URL"] = base
+    os.environ.setdefault("VELOG_JOBS_DB", os.path.join(args.workdir, "bench_jobs.db"))
+    from fastapi.testclient import TestClient
+    import app as app_module
+
+    def run():
+        latencies: List[float] = []
+        errors = 0
+        with TestClient(app_module.app) as client:
+            def call(method: str, path: str, **kw) -> None:
+                nonlocal errors
+                t0 = time.perf_counter()
+                r = client.request(method, path, **kw)
+                latencies.append(time.perf_counter() - t0)
+                errors += r.status_code != 200
+
+            with ThreadPoolExecutor(max_workers=args.concurrency) as ex:
+                pages = max(1, args.sample // 10)
+                list(ex.map(lambda p: call("GET", "/api/v1/velog/posts",
+                                           params={"username": handle, "page": p, "limit": 10}),
+                            range(1, pages + 1)))
+                list(ex.map(lambda u: call("POST", "/api/v1/velog/post-detail", json={"url": u}),
+                            urls[:args.sample]))
+        return {"posts": len(latencies), "latencies": latencies, "errors": errors}
+    return measure(run)
+
+
+def run_scenario(name: str, base: str, handle: str, args, urls: List[str]) -> Dict[str, object]:
+    if name == "list":
+        return bench_list(base, handle, args)
+    if name == "post":
+        return bench_post(base, handle, args, urls)
+    if name == "crawl":
+        return bench_crawl(base, handle, args, "playwright")
+    if name == "crawl-http":
+        return bench_crawl(base, handle, args, "http")
+    return bench_api(base, handle, args, urls)
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> List[str]:
+    # posts/sec 감소 또는 p95 증가가 tolerance(비율)를 넘으면 회귀
+    regressions = []
+    for name, cur in result["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if not old or "error" in cur or "error" in old:
+            continue
+        if old["posts_per_sec"] and cur["posts_per_sec"] < old["posts_per_sec"] * (1 - tolerance):
+            regressions.append(f"{name}: posts/sec {old['posts_per_sec']} -> {cur['posts_per_sec']}")
+        if old["latency_ms"]["p95"] and cur["latency_ms"]["p95"] > old["latency_ms"]["p95"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {old['latency_ms']['p95']}ms -> {cur['latency_ms']['p95']}ms")
+    return regressions
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    import argparse, tempfile
+
+    parser = argparse.ArgumentParser(description="Offline crawler benchmark against a local velog fixture")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"comma separated: {', '.join(SCENARIOS)}")
+    parser.add_argument("--posts", type=int, default=200, help="posts on the fixture profile")
+    parser.add_argument("--sample", type=int, default=30, help="posts rendered in the post/api scenarios")
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="fixture server delay per response")
+    parser.add_argument("--out", default="", help="write JSON result here (default: stdout)")
+    parser.add_argument("--baseline", default="", help="previous result JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown ratio vs baseline")
+    args = parser.parse_args()
+    args.workdir = tempfile.mkdtemp(prefix="velog-bench-")
+
+    handle = "bench"
+    server, base = start_fixture_server(posts=args.posts, handle=handle, latency_ms=args.latency_ms)
+    from fixture_server import Fixture
+    urls = [f"{base}/@{handle}/{p['url_slug']}" for p in Fixture(handle, args.posts).posts]
+
+    results: Dict[str, Dict[str, object]] = {}
+    try:
+        for name in [s.strip() for s in args.scenarios.split(",") if s.strip()]:
+            print(f"[INFO] bench {name} ...", file=sys.stderr)
+            if name not in SCENARIOS:
+                parser.error(f"unknown scenario: {name}")
+            try:
+                with contextlib.redirect_stdout(sys.stderr):  # 크롤러 로그가 JSON 출력에 섞이지 않도록
+                    results[name] = run_scenario(name, base, handle, args, urls)
+            except Exception as ex:
+                # 한 시나리오 실패(브라우저 미설치 등)가 나머지 측정을 막지 않도록
+                results[name] = {"error": f"{type(ex).__name__}: {ex}"}
+    finally:
+        server.shutdown()
+
+    report = {
+        "meta": {
+            "git": _git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "posts": args.posts,
+            "sample": args.sample,
+            "concurrency": args.concurrency,
+            "latency_ms": args.latency_ms,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"[WARN] regression: {r}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
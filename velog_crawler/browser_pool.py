@@ -0,0 +1,162 @@
+# 브라우저 풀 (Chromium 1회 기동 후 재사용)
+import atexit, threading, queue, time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+from playwright.sync_api import sync_playwright
+
+from metrics import stage
+from resource_policy import ResourcePolicy
+
+UA = "SpecGuardBot/1.0 (+https://example.com)"
+VIEWPORT = {"width": 1280, "height": 900}
+
+
+class BrowserPool:
+    # sync Playwright 객체는 만든 스레드에서만 쓸 수 있으므로
+    # 브라우저를 소유한 전용 스레드(owner thread)에 작업을 넘겨 실행한다.
+    # - 브라우저는 스레드당 1회만 launch
+    # - context/route/UA 설정은 context 생성 시 1회
+    # - page 는 재사용(warm), context 는 max_pages_per_context 마다 교체해 메모리 상한 유지
+    # - workers > 1 이면 owner thread 를 여러 개 띄워 동시에 렌더 (스레드마다 Chromium 1개)
+    # - 요청 차단은 policy(ResourcePolicy) 하나를 모든 context 가 공유, 집계는 policy.stats
+
+    def __init__(
+        self,
+        workers: int = 1,
+        headless: bool = True,
+        max_pages_per_context: int = 50,
+        timeout_ms: int = 20000,
+        policy: Optional[ResourcePolicy] = None,
+    ):
+        self.workers = max(1, int(workers))
+        self.policy = policy or ResourcePolicy()
+        self.headless = headless
+        self.max_pages_per_context = max_pages_per_context
+        self.timeout_ms = timeout_ms
+        self._tasks: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    # 작업 제출: fn(page, *args, **kwargs) 를 owner thread 에서 실행
+    # 실제로 시작하면 Future.started_at(time.monotonic) 기록 -> 대기열에 있던 시간은 워치독에서 빼도록
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        fut: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BrowserPool is closed")
+            if not self._threads:
+                for i in range(self.workers):
+                    t = threading.Thread(target=self._run, name=f"browser-pool-{i}", daemon=True)
+                    t.start()
+                    self._threads.append(t)
+        self._tasks.put((fut, fn, args, kwargs))
+        return fut
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        return self.submit(fn, *args, **kwargs).result()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            threads = list(self._threads)
+        # 대기 중인 작업은 취소하고 워커 수만큼 종료 신호
+        while True:
+            try:
+                item = self._tasks.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[0].cancel()
+        for _ in threads:
+            self._tasks.put(None)
+        for t in threads:
+            t.join(timeout=30)
+
+    def __enter__(self) -> "BrowserPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # owner thread 본체
+    def _run(self) -> None:
+        with sync_playwright() as p:
+            browser = None
+            ctx = None
+            page = None
+            pages_used = 0
+
+            def new_context():
+                with stage("context_create"):
+                    c = browser.new_context(user_agent=UA, viewport=VIEWPORT)
+                try:
+                    c.route("**/*", self.policy.handle_route)
+                    c.on("response", self.policy.on_response)
+                except Exception:
+                    pass
+                return c
+
+            while True:
+                item = self._tasks.get()
+                if item is None:
+                    break
+                fut, fn, args, kwargs = item
+                if not fut.set_running_or_notify_cancel():
+                    continue
+                fut.started_at = time.monotonic()
+                try:
+                    if browser is None or not browser.is_connected():
+                        # 디버깅 시 headless=False, slow_mo=200 으로 바꿔 화면 보면서 확인 가능
+                        with stage("browser_launch"):
+                            browser = p.chromium.launch(headless=self.headless)
+                        ctx, page, pages_used = None, None, 0
+                    # N 페이지마다 context 재활용
+                    if ctx is None or pages_used >= self.max_pages_per_context:
+                        if ctx is not None:
+                            try:
+                                ctx.close()
+                            except Exception:
+                                pass
+                        ctx = new_context()
+                        page, pages_used = None, 0
+                    if page is None or page.is_closed():
+                        page = ctx.new_page()
+                    page.set_default_timeout(self.timeout_ms)
+                    page.set_default_navigation_timeout(self.timeout_ms)
+                    pages_used += 1
+                    result = fn(page, *args, **kwargs)
+                except BaseException as ex:
+                    # 실패한 page 는 상태를 믿을 수 없으니 버림
+                    if page is not None:
+                        try:
+                            page.close()
+                        except Exception:
+                            pass
+                    page = None
+                    fut.set_exception(ex)
+                else:
+                    fut.set_result(result)
+
+            if browser is not None:
+                try:
+                    browser.close()
+                except Exception:
+                    pass
+
+
+# CLI 파이프라인과 FastAPI 앱이 함께 쓰는 기본 풀
+_default_pool: Optional[BrowserPool] = None
+_default_lock = threading.Lock()
+
+
+def get_default_pool() -> BrowserPool:
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = BrowserPool()
+            atexit.register(_default_pool.close)
+        return _default_pool
@@ -0,0 +1,212 @@
+# API 응답 캐시: TTL + 메모리 상한 LRU + single-flight(같은 키 동시 요청은 1번만 로드)
+# - 백엔드 교체 가능: 기본은 프로세스 내 메모리, 여러 워커가 공유하려면 RedisBackend
+import asyncio, json, threading, time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+MISS = object()
+
+
+def _approx_size(value: Any) -> int:
+    # 정확한 객체 크기 대신 직렬화 길이로 근사
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8")) + 64
+    except (TypeError, ValueError):
+        return 1024
+
+
+class MemoryBackend:
+    # max_bytes=None 이면 바이트 집계 없이 max_items 로만 제한 (직렬화로 크기를 잴 수 없는 살아 있는 객체용)
+    def __init__(self, max_bytes: Optional[int] = 64 * 1024 * 1024, max_items: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self._data: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return MISS
+            expires, size, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                self._bytes -= size
+                return MISS
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        size = 0 if self.max_bytes is None else _approx_size(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # 한 항목이 상한보다 크면 캐시하지 않음
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (time.monotonic() + ttl, size, value)
+            self._bytes += size
+            while self._data and (
+                (self.max_bytes is not None and self._bytes > self.max_bytes)
+                or (self.max_items and len(self._data) > self.max_items)
+            ):
+                _, (_, s, _) = self._data.popitem(last=False)
+                self._bytes -= s
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"items": len(self._data), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                    "evictions": self.evictions}
+
+
+class RedisBackend:
+    # 여러 프로세스/서버가 공유하는 캐시. 값은 JSON 으로 저장 (redis 패키지 필요)
+    def __init__(self, url: str = "redis://localhost:6379/0", prefix: str = "velog:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RedisBackend 에는 redis 패키지가 필요합니다: pip install redis")
+        self._r = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Any:
+        raw = self._r.get(self.prefix + key)
+        return MISS if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._r.set(self.prefix + key, json.dumps(value, ensure_ascii=False), px=max(1, int(ttl * 1000)))
+
+    def delete(self, key: str) -> None:
+        self._r.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        for k in self._r.scan_iter(self.prefix + "*"):
+            self._r.delete(k)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis"}
+
+
+class _Flight:
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class ResponseCache:
+    def __init__(self, backend=None, ttl: float = 300.0):
+        self.backend = backend or MemoryBackend()
+        self.ttl = ttl
+        self._flights: Dict[str, _Flight] = {}
+        self._aflights: Dict[str, "asyncio.Future"] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key: str) -> Any:
+        return self.backend.get(key)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.backend.set(key, value, self.ttl if ttl is None else ttl)
+
+    def invalidate(self, key: str) -> None:
+        self.backend.delete(key)
+
+    def get_or_load(self, key: str, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        # 캐시에 있으면 바로, 없으면 같은 키의 첫 요청만 loader 실행하고 나머지는 그 결과를 기다림
+        value = self.backend.get(key)
+        if value is not MISS:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            self.set(key, flight.value, ttl)  # 실패(예외)는 캐시하지 않음
+            return flight.value
+        except BaseException as ex:
+            flight.error = ex
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.event.set()
+
+    async def aget_or_load(
+        self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[float] = None
+    ) -> Any:
+        # get_or_load 의 asyncio 버전 (같은 이벤트 루프 안에서 single-flight)
+        # 로드는 캐시가 소유한 task 로 실행 -> 첫 요청(리더)이 취소돼도(클라이언트 끊김 등) 다른 대기자는 결과를 받음
+        value = self.backend.get(key)
+        if value is not MISS:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        flight = self._aflights.get(key)
+        with self._lock:
+            if flight is None:
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if flight is None:
+            flight = self._aflights[key] = asyncio.ensure_future(self._aload(key, loader, ttl))
+            # 기다리는 요청이 모두 떠난 뒤 실패해도 'never retrieved' 경고가 나지 않도록
+            flight.add_done_callback(lambda f: f.cancelled() or f.exception())
+        # 대기자 하나가 취소돼도 공유 작업은 계속되도록 shield
+        return await asyncio.shield(flight)
+
+    async def _aload(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[float]) -> Any:
+        try:
+            value = await loader()
+            self.set(key, value, ttl)  # 실패(예외)는 캐시하지 않음
+            return value
+        finally:
+            self._aflights.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            out = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+                "in_flight": len(self._flights) + len(self._aflights),
+                "ttl": self.ttl,
+            }
+        out.update(self.backend.stats())
+        return out
@@ -1,11 +1,23 @@
 # 벨로그 크롤링
-import json, time, re, hashlib
-from urllib.parse import urljoin
-from typing import List, Set, Tuple, Optional
-
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
-
-UA = "SpecGuardBot/1.0 (+https://example.com)"
+import json, time, re
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from datetime import datetime
+from urllib.parse import quote, unquote, urljoin, urlsplit
+from typing import Callable, Deque, List, Set, Tuple, Optional
+
+from playwright.sync_api import TimeoutError as PWTimeout
+
+from browser_pool import BrowserPool, get_default_pool
+from ratelimit import HostRateLimiter
+from http_fetch import HttpBackend, FallbackBackend, VELOG_URL, graphql_url_for, task_started_at, map_future
+from store import CrawlStore, content_hash
+from resource_policy import diff_stats, parse_policy_args
+from metrics import REGISTRY, observe, stage, profile_report, enable_stage_log
+from retry import PostTimeout, ParseError, HttpStatusError, RetryPolicy, CircuitBreaker, classify_error
+from jsonl_out import JsonlWriter, compact_to_json, jsonl_urls
+from archive import ARCHIVE_EXT, pack, read_doc, write_doc
+from dates import reference_now, resolve_published
 
 # 리스트(프로필) 스크롤 수집 
 def render_list_with_playwright(
@@ -13,191 +25,477 @@ def render_list_with_playwright(
     max_scrolls: int = 200,
     pause_sec: float = 1.0,
     timeout_ms: int = 25000,
+    pool: Optional[BrowserPool] = None,
+    limiter: Optional[HostRateLimiter] = None,
+    known: Optional[Set[str]] = None,
+    stop_after_known: int = 0,
+    base_url: str = VELOG_URL,
+    deadline: Optional[float] = None,
 ) -> List[str]:
 
 # 프로필 페이지를 열고 아래로 여러 번 스크롤하면서 해당 유저의 모든 글 링크를 수집.
+# 브라우저는 풀(pool)에서 재사용한다. 지정하지 않으면 기본 풀 사용.
+# known 을 주면 이미 아는 글이 stop_after_known 개 연속 나올 때 스크롤 중단(증분 수집).
+# base_url 을 바꾸면 로컬 대역 서버(벤치마크 fixture)로도 돌릴 수 있음.
+# deadline(time.monotonic 기준)을 주면 넘는 순간 스크롤을 멈추고 PostTimeout (API 요청이 끝난 뒤에도 계속 돌지 않도록)
+
+    pool = pool or get_default_pool()
+    hrefs = pool.call(
+        _collect_list_links, handle, max_scrolls, pause_sec, timeout_ms, limiter, known, stop_after_known, base_url,
+        deadline,
+    )
+    hrefs = {h for h in hrefs if f"/@{handle}/" in h}
+    return sorted(hrefs)
 
-    base = f"https://velog.io/@{handle}"
+# 프로필 페이지에 심는 MutationObserver: 새로 붙은 <a> 의 href 만 큐에 쌓음
+# (매 스크롤마다 모든 <a> 를 다시 읽지 않도록)
+LINK_OBSERVER_JS = r"""
+(handle) => {
+  if (window.__velogLinks) return;
+  const q = [];
+  const seen = new Set();
+  const want = '/@' + handle + '/';
+  const push = (a) => {
+    const h = a.getAttribute && a.getAttribute('href');
+    if (!h || seen.has(h) || h.indexOf(want) < 0) return;
+    seen.add(h);
+    q.push(h);
+  };
+  const scan = (root) => {
+    if (root.tagName === 'A') push(root);
+    if (root.querySelectorAll) root.querySelectorAll('a[href]').forEach(push);
+  };
+  scan(document.body);
+  new MutationObserver(muts => {
+    for (const m of muts) m.addedNodes.forEach(n => { if (n.nodeType === 1) scan(n); });
+  }).observe(document.body, { childList: true, subtree: true });
+  window.__velogLinks = q;
+}
+"""
+
+LINK_JUNK = ["/series/", "/tag/", "/followers", "/following"]
+
+def _normalize_post_href(h: str, base_url: str = VELOG_URL) -> str:
+    # DOM href / API url_slug 를 같은 형태(퍼센트 인코딩된 절대 URL)로 맞춤
+    parts = urlsplit(urljoin(base_url, h))
+    return f"{parts.scheme}://{parts.netloc}{quote(unquote(parts.path), safe='/@')}"
+
+def _collect_list_links(
+    page,
+    handle: str,
+    max_scrolls: int,
+    pause_sec: float,
+    timeout_ms: int,
+    limiter: Optional[HostRateLimiter] = None,
+    known: Optional[Set[str]] = None,
+    stop_after_known: int = 0,
+    base_url: str = VELOG_URL,
+    deadline: Optional[float] = None,
+) -> Set[str]:
+    # 목록 수집은 페이지 자체 데이터로 구동
+    # - 글 목록 GraphQL 응답을 가로채 링크를 바로 얻고, 마지막 페이지(limit 미만)면 즉시 종료
+    # - API 를 못 잡는 경우엔 MutationObserver 가 새로 추가된 링크만 넘겨줌
+    # - 고정 sleep 대신 새 항목이 도착하는 즉시 다음 스크롤
+    base = f"{base_url.rstrip('/')}/@{handle}"
     hrefs: Set[str] = set()
+    if limiter is not None:
+        limiter.acquire(base)
 
-    with sync_playwright() as p:
-        # 디버깅 시 headless=False, slow_mo=200 으로 바꿔 화면 보면서 확인 가능
-        browser = p.chromium.launch(headless=True)
-        
-        ctx = browser.new_context(user_agent=UA, viewport={"width": 1280, "height": 900})
+    def left_ms() -> int:
+        # 호출측 deadline 까지 남은 시간(없으면 timeout_ms). 이미 넘었으면 더 스크롤하지 않음
+        if deadline is None:
+            return timeout_ms
+        left = int((deadline - time.monotonic()) * 1000)
+        if left <= 0:
+            raise PostTimeout(f"list deadline exceeded: @{handle}")
+        return min(timeout_ms, left)
 
-        # 이미지/폰트 차단
-        try:
-            ctx.route(
-                "**/*",
-                lambda route: route.abort()
-                if route.request.resource_type in {"image", "font"}
-                else route.continue_(),
-            )
-        except Exception:
-            pass
+    page.set_default_timeout(timeout_ms)
+    page.set_default_navigation_timeout(timeout_ms)
 
-        page = ctx.new_page()
-        page.set_default_timeout(timeout_ms)
-        page.set_default_navigation_timeout(timeout_ms)
+    responses = []
 
-        page.goto(base, wait_until="domcontentloaded")
+    def on_response(resp) -> None:
+        # 핸들러 안에서는 보관만 하고 파싱은 루프에서
         try:
-            page.wait_for_load_state("networkidle", timeout=6000)
-        except PWTimeout:
+            req = resp.request
+            if req.method == "POST" and "graphql" in resp.url and "posts(" in (req.post_data or ""):
+                responses.append(resp)
+        except Exception:
             pass
 
-        def collect_links() -> Set[str]:
-            anchors = page.locator("a").evaluate_all(
-                "els => els.map(e => e.getAttribute('href') || '')"
-            )
-            out = set()
-            for h in anchors:
-                if not h:
-                    continue
-                if f"/@{handle}/" in h:
-                    # 시리즈/팔로워/태그 등 잡링크 제외
-                    if any(x in h for x in ["/series/", "/tag/", "/followers", "/following"]):
-                        continue
-                    out.add(urljoin("https://velog.io", h))
-            return out
-
-        last_count = -1
+    page.on("response", on_response)
+    try:
+        with stage("list_goto"):
+            page.goto(base, wait_until="domcontentloaded", timeout=left_ms())
+        page.evaluate(LINK_OBSERVER_JS, handle)
+
+        api_ended = False
+        reached_known = False
+        known_run = 0
         stagnant = 0
-        for _ in range(max_scrolls):
-            cur = collect_links()
-            hrefs |= cur
+        wait_ms = max(500, int(pause_sec * 3000))
+
+        def add(h: str) -> None:
+            # 발견 순서(최신 -> 과거)대로 known 연속 구간을 센다
+            nonlocal known_run, reached_known
+            if h in hrefs:
+                return
+            hrefs.add(h)
+            known_run = known_run + 1 if known and h in known else 0
+            if stop_after_known and known_run >= stop_after_known:
+                reached_known = True
+
+        def drain() -> int:
+            nonlocal api_ended
+            before = len(hrefs)
+            while responses:
+                resp = responses.pop(0)
+                try:
+                    body = resp.json()
+                    req = json.loads(resp.request.post_data or "{}")
+                except Exception:
+                    continue
+                items = ((body or {}).get("data") or {}).get("posts") or []
+                limit = (req.get("variables") or {}).get("limit")
+                for it in items:
+                    user = (it.get("user") or {}).get("username") or handle
+                    if user == handle and it.get("url_slug"):
+                        add(_normalize_post_href(f"/@{user}/{it['url_slug']}", base_url))
+                if limit and len(items) < limit:
+                    api_ended = True
+            for h in page.evaluate("() => window.__velogLinks.splice(0)"):
+                if any(x in h for x in LINK_JUNK):
+                    continue
+                add(_normalize_post_href(h, base_url))
+            return len(hrefs) - before
 
-            if len(hrefs) == last_count:
-                stagnant += 1
-            else:
-                stagnant = 0
-            last_count = len(hrefs)
-            if stagnant >= 3:  # 3번 연속 증가 없음 -> 종료
+        drain()
+        for _ in range(max_scrolls):
+            if api_ended or reached_known:
                 break
-
             page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            time.sleep(pause_sec)
-            try:
-                page.wait_for_load_state("networkidle", timeout=3000)
-            except PWTimeout:
-                pass
-
-        browser.close()
+            # 새 링크가 DOM 에 붙거나 목록 응답이 오면 바로 진행
+            waited = time.perf_counter()
+            until = waited + min(wait_ms, left_ms()) / 1000
+            while not responses and time.perf_counter() < until:
+                try:
+                    page.wait_for_function("() => window.__velogLinks.length > 0", timeout=150, polling=50)
+                    break
+                except PWTimeout:
+                    pass
+            observe("list_scroll_wait", time.perf_counter() - waited)
+            if drain() > 0:
+                stagnant = 0
+            else:
+                stagnant += 1
+                if stagnant >= 3:  # 3번 연속 새 항목 없음 -> 종료
+                    break
+    finally:
+        page.remove_listener("response", on_response)
+
+    return hrefs
+
+# 글 상세 추출 스크립트: 한 번의 evaluate 로 모든 필드를 구조화해서 돌려받음
+# - 게시 시각은 <time datetime> 속성을 우선 사용(ISO), 없으면 짧은 텍스트 노드만 훑음
+# - timings: 필드별 소요(ms), 진단용
+EXTRACT_POST_JS = r"""
+() => {
+  const timings = {};
+  const t0 = performance.now();
+  let s = t0;
+  const lap = (k) => { const n = performance.now(); timings[k] = +(n - s).toFixed(2); s = n; };
+
+  const h1 = document.querySelector('h1');
+  const title = h1 ? (h1.innerText || '').trim() : '';
+  lap('title');
+
+  const tags = Array.from(document.querySelectorAll("a[href*='/tag/']"))
+    .map(a => (a.innerText || '').trim());
+  lap('tags');
+
+  const langs = new Set();
+  document.querySelectorAll('pre code').forEach(e => {
+    const cls = (e.className || '').toString();
+    let lang = null;
+    const m = cls.match(/language-([\w+-]+)/);
+    if (m) lang = m[1].toLowerCase();
+    const dl = e.getAttribute('data-language');
+    if (dl) lang = dl.toLowerCase();
+    if (lang && lang !== 'null') langs.add(lang);
+  });
+  lap('code_langs');
+
+  // 본문: article -> main -> #root -> body
+  let text = '';
+  for (const sel of ['article', 'main', 'div#root', 'body']) {
+    const el = document.querySelector(sel);
+    if (!el) continue;
+    text = (el.innerText || '').trim();
+    if (text) break;
+  }
+  lap('text');
+
+  let published = null;
+  let publishedAt = null;
+  const tm = document.querySelector('time[datetime]');
+  if (tm) {
+    publishedAt = tm.getAttribute('datetime');
+    published = (tm.innerText || '').trim() || publishedAt;
+  } else {
+    const re = /\d{4}\.\s*\d{1,2}\.\s*\d{1,2}|(시간|분|일)\s*전/;
+    const w = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+    let n;
+    while ((n = w.nextNode())) {
+      const v = n.nodeValue;
+      if (v && v.length < 60 && re.test(v)) {
+        const p = n.parentElement;
+        const pt = p ? (p.innerText || '').trim() : '';
+        published = (pt && pt.length < 60) ? pt : v.trim();
+        break;
+      }
+    }
+  }
+  lap('published');
 
-    hrefs = {h for h in hrefs if f"/@{handle}/" in h}
-    return sorted(hrefs)
+  timings.total = +(performance.now() - t0).toFixed(2);
+  return { title, tags, code_langs: Array.from(langs).sort(), text, published, published_at: publishedAt, timings };
+}
+"""
 
 # 글 상세 렌더링 & 파싱
 def render_post_with_playwright(
     url: str,
     timeout_ms: int = 20000,
+    pool: Optional[BrowserPool] = None,
+    limiter: Optional[HostRateLimiter] = None,
+    timings: Optional[dict] = None,
 ) -> Tuple[str, str, List[str], List[str], Optional[str]]:
    
     # 글 페이지를 렌더링해서 제목/본문/태그/코드 언어/게시 시각(가능하면) 추출.
-    # - visible 대기 없이 짧게 시도 -> 폴백 셀렉터 -> 1회 스크롤 재시도
-    # - 전체 per-post 워치독 느낌의 제한으로 무한대기 방지
-   
-    start = time.perf_counter()
-    HARD_LIMIT = max(8, timeout_ms / 1000 + 4)  # 포스트당 최대 N초
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        ctx = browser.new_context(user_agent=UA, viewport={"width": 1280, "height": 900})
+    # - 추출은 EXTRACT_POST_JS 1회 평가(남은 시간 안에서, 결과 받기까지 CDP 왕복 2번) -> 본문 없으면 1회 스크롤 재시도
+    # - 글마다 hard deadline(timeout_ms): goto/대기 단계 모두 남은 시간 안에서만 기다림
+    # - 브라우저/컨텍스트는 풀에서 재사용 (포스트마다 Chromium 기동 X)
+    # - timings 에 dict 를 넘기면 단계/필드별 소요(ms)를 채워줌
 
-        # 이미지/폰트 차단
-        try:
-            ctx.route(
-                "**/*",
-                lambda route: route.abort()
-                if route.request.resource_type in {"image", "font"}
-                else route.continue_(),
-            )
-        except Exception:
-            pass
+    pool = pool or get_default_pool()
+    return pool.call(_extract_post, url, timeout_ms, limiter, timings)
 
-        page = ctx.new_page()
-        page.set_default_timeout(timeout_ms)
-        page.set_default_navigation_timeout(timeout_ms)
+def _extract_post(
+    page,
+    url: str,
+    timeout_ms: int,
+    limiter: Optional[HostRateLimiter] = None,
+    timings: Optional[dict] = None,
+    deadline: Optional[float] = None,
+) -> Tuple[str, str, List[str], List[str], Optional[str]]:
+    # 토큰은 실제 요청 직전(워커 스레드)에서 얻는다
+    if limiter is not None:
+        limiter.acquire(url)
 
-        page.goto(url, wait_until="domcontentloaded")
+    # 글 하나의 hard deadline = 시작 + timeout_ms (호출측 deadline 이 더 이르면 그쪽, time.monotonic 기준)
+    # goto / networkidle 대기마다 남은 시간만 주므로 단계가 여러 개여도 합이 deadline 을 넘지 않음
+    start = time.perf_counter()
+    hard = time.monotonic() + timeout_ms / 1000
+    if deadline is not None:
+        hard = min(hard, deadline)
+
+    def left_ms(cap: Optional[int] = None) -> int:
+        left = int((hard - time.monotonic()) * 1000)
+        if left <= 0:
+            raise PostTimeout(f"post deadline exceeded: {url}")
+        return left if cap is None else min(cap, left)
+
+    page.set_default_timeout(left_ms())
+    page.set_default_navigation_timeout(left_ms())
+
+    with stage("goto"):
+        resp = page.goto(url, wait_until="domcontentloaded", timeout=left_ms())
+    # 429/404 같은 오류 페이지를 글로 추출하지 않도록 (분류: throttle/gone/error)
+    if resp is not None and resp.status >= 400:
+        raise HttpStatusError(resp.status, url)
+    try:
+        with stage("networkidle"):
+            page.wait_for_load_state("networkidle", timeout=left_ms(5000))
+    except PWTimeout:
+        pass
+    loaded = time.perf_counter()
+
+    def extract() -> dict:
+        # page.evaluate 는 타임아웃이 없어 멈춘 페이지에서 영원히 기다릴 수 있음 -> wait_for_function 으로
+        # 남은 시간 안에서만 (추출 결과 객체는 항상 truthy 라 첫 평가에서 바로 반환)
+        handle = page.wait_for_function(EXTRACT_POST_JS, timeout=left_ms())
         try:
-            page.wait_for_load_state("networkidle", timeout=5000)
-        except PWTimeout:
-            pass
+            return handle.json_value()
+        finally:
+            handle.dispose()
 
-        # 제목
-        title = ""
-        try:
-            title = page.locator("h1").first.inner_text().strip()
-        except Exception:
-            pass
+    with stage("extract_eval"):
+        rec = extract()
 
-        # 태그
-        tags: List[str] = []
+    # 본문 없으면 남은 시간이 있을 때만 1회 스크롤 후 재시도
+    if not rec.get("text") and hard - time.monotonic() > 1.0:
         try:
-            tags = [t.strip() for t in page.locator("a[href*='/tag/']").all_inner_texts()]
+            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            page.wait_for_load_state("networkidle", timeout=left_ms(2000))
         except Exception:
             pass
-
-        # 코드 언어(language-xxx 또는 data-language)
-        code_langs: List[str] = []
         try:
-            langs = page.eval_on_selector_all(
-                "pre code",
-                """els => els.map(e => {
-                    const cls = (e.className||"").toString();
-                    let lang = null;
-                    const m = cls.match(/language-([\\w+-]+)/);
-                    if (m) lang = m[1].toLowerCase();
-                    const dl = e.getAttribute('data-language');
-                    if (dl) lang = dl.toLowerCase();
-                    return lang;
-                })""",
-            ) or []
-            code_langs = [l for l in langs if l and l != "null"]
+            rec = extract()
         except Exception:
             pass
 
-        # 본문: article -> main -> #root -> body
-        text = ""
-        try:
-            if page.locator("article").count() > 0:
-                text = page.locator("article").first.inner_text().strip()
-        except Exception:
-            pass
-        if not text:
-            for sel in ["main", "div#root", "body"]:
-                try:
-                    if page.locator(sel).count() > 0:
-                        text = page.locator(sel).first.inner_text().strip()
-                        if text:
-                            break
-                except Exception:
-                    continue
-        # 그래도 없으면 1회 스크롤 후 재시도
-        if not text and (time.perf_counter() - start) < HARD_LIMIT:
-            try:
-                page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                page.wait_for_load_state("networkidle", timeout=2000)
-                if page.locator("article").count() > 0:
-                    text = page.locator("article").first.inner_text().strip()
-            except Exception:
-                pass
-
-        # 게시 시각(형태 다양 -> 그대로 저장)
-        published = None
-        try:
-            for s in page.locator("time, span, div").all_inner_texts():
-                s2 = s.strip()
-                if re.search(r"\d{4}\.\s*\d{1,2}\.\s*\d{1,2}", s2) or ("시간 전" in s2) or ("분 전" in s2) or ("일 전" in s2):
-                    published = s2
-                    break
-        except Exception:
-            pass
+    # 페이지 안에서 잰 필드별 추출 시간(ms)
+    for k, v in (rec.get("timings") or {}).items():
+        if k != "total":
+            observe(f"extract_{k}", v / 1000)
+    observe("post_render", time.perf_counter() - start)
+
+    if timings is not None:
+        timings["load_ms"] = round((loaded - start) * 1000, 2)
+        timings["extract_ms"] = round((time.perf_counter() - loaded) * 1000, 2)
+        timings["fields_ms"] = rec.get("timings") or {}
+
+    # 기계가 읽을 수 있는 datetime 속성이 있으면 그걸 우선 저장
+    published = rec.get("published_at") or rec.get("published")
+    return (
+        rec.get("title") or "",
+        rec.get("text") or "",
+        list(rec.get("code_langs") or []),
+        list(rec.get("tags") or []),
+        published,
+    )
+
+# 렌더 결과 -> 저장용 레코드
+def build_post_record(
+    url: str,
+    rendered: Tuple[str, str, List[str], List[str], Optional[str]],
+    now: Optional[datetime] = None,
+) -> dict:
+    # now: 상대 날짜("3일 전")를 절대 시각으로 바꿀 기준 (크롤 한 번에 하나). 없으면 지금
+    title, text, code_langs, tags, published = rendered
 
-        browser.close()
-        return title, text, sorted(set(code_langs)), tags, published
+    # 상단 boilerplate 제거
+    if text:
+        with stage("text_cleanup"):
+            text = re.sub(r"(로그인|팔로우|목록 보기)\s*", " ", text)
+            text = re.sub(r"\s{2,}", " ", text).strip()
+
+    return {
+        "url": url,
+        "title": title or "",
+        "tags": tags,
+        "published_at": resolve_published(published, now),  # 절대 시각 (못 읽은 표기는 원문)
+        "updated_at": "",
+        "text": text or "",
+        "code_langs": code_langs,
+        "likes": 0,
+        "comments": 0,
+        "series": None,
+        "content_hash": content_hash(text or ""),  # 정규화 본문 해시 (변경 감지용)
+    }
+
+# 수집 백엔드
+# - PlaywrightBackend: 브라우저 렌더 (기존 경로)
+# - http_fetch.HttpBackend: 브라우저 없는 fast path
+# - http_fetch.FallbackBackend: fast path 실패 시에만 Playwright
+class PlaywrightBackend:
+    name = "playwright"
+
+    def __init__(
+        self,
+        pool: Optional[BrowserPool] = None,
+        limiter: Optional[HostRateLimiter] = None,
+        timeout_ms: int = 20000,
+        base_url: str = VELOG_URL,
+    ):
+        self.pool = pool or get_default_pool()
+        self.limiter = limiter
+        self.timeout_ms = timeout_ms
+        self.base_url = base_url
+
+    def close(self) -> None:
+        pass  # 풀 수명은 만든 쪽이 관리
+
+    def list_links(
+        self,
+        handle: str,
+        max_scrolls: int = 200,
+        pause_sec: float = 1.0,
+        known: Optional[Set[str]] = None,
+        stop_after_known: int = 0,
+        deadline: Optional[float] = None,
+    ) -> List[str]:
+        return render_list_with_playwright(
+            handle, max_scrolls=max_scrolls, pause_sec=pause_sec, pool=self.pool, limiter=self.limiter,
+            known=known, stop_after_known=stop_after_known, base_url=self.base_url, deadline=deadline,
+        )
+
+    def fetch_post(self, url: str, deadline: Optional[float] = None) -> Tuple[str, str, List[str], List[str], Optional[str]]:
+        return self.submit_post(url, deadline).result()
+
+    def submit_post(self, url: str, deadline: Optional[float] = None) -> Future:
+        return self.pool.submit(_extract_post, url, self.timeout_ms, self.limiter, None, deadline)
+
+def make_backend(
+    kind: str = "auto",
+    pool: Optional[BrowserPool] = None,
+    limiter: Optional[HostRateLimiter] = None,
+    workers: int = 1,
+    timeout_ms: int = 20000,
+    base_url: str = VELOG_URL,
+):
+    # kind: "auto"(http -> playwright 폴백) | "http" | "playwright"
+    # timeout_ms: 글 하나 렌더의 hard deadline (HTTP 는 요청 하나의 타임아웃)
+    if kind == "playwright":
+        return PlaywrightBackend(pool, limiter, timeout_ms, base_url)
+    http = HttpBackend(
+        base_url=base_url, graphql_url=graphql_url_for(base_url), limiter=limiter, workers=workers,
+        timeout=timeout_ms / 1000,
+    )
+    if kind == "http":
+        return http
+    return FallbackBackend(http, PlaywrightBackend(pool, limiter, timeout_ms, base_url))
+
+def backend_pool(backend) -> Optional[BrowserPool]:
+    # 백엔드가 실제로 렌더에 쓰는 브라우저 풀 (HTTP 전용이면 None, 폴백 조합이면 안쪽에서 찾음)
+    pool = getattr(backend, "pool", None)
+    if getattr(pool, "policy", None) is not None:
+        return pool
+    for inner in (getattr(backend, "primary", None), getattr(backend, "fallback", None)):
+        if inner is not None:
+            pool = backend_pool(inner)
+            if pool is not None:
+                return pool
+    return None
+
+def submit_validated(backend, url: str, validators: Tuple[Optional[str], Optional[str]] = (None, None)) -> Future:
+    # 결과는 항상 (rendered | None, etag, last_modified). None 은 304/수정 시각 같음(변경 없음)
+    # 조건부 재확인을 지원하는 백엔드는 처음 받는 글도 이 경로로 -> 다음 재확인에 쓸 검증자를 같이 저장
+    if hasattr(backend, "submit_refresh"):
+        return backend.submit_refresh(url, *validators)
+    return map_future(backend.submit_post(url), lambda r: (r, None, None))
+
+def wait_post_result(fut: Future, post_timeout: float):
+    # 워치독: 백엔드 워커가 렌더를 시작한 시각(task_started_at)부터 잼 -> 대기열에서 기다린 시간은 세지 않음
+    # (재시도는 앞서 제출된 글들 뒤에 다시 줄 섬). deadline 을 못 지키면(HTTP -> 브라우저 폴백 두 단계 + 여유)
+    # 결과를 버리고 다음으로. 렌더 자체는 백엔드의 글별 deadline 이 끊음
+    budget = post_timeout * 2 + 5
+    while True:
+        started = task_started_at(fut)
+        left = budget if started is None else started + budget - time.monotonic()
+        try:
+            return fut.result(timeout=min(1.0, max(0.01, left)))
+        except FutureTimeout:
+            if started is not None and time.monotonic() >= started + budget:
+                fut.cancel()
+                raise PostTimeout(f"watchdog: no result {budget:.0f}s after render started")
+
+def check_rendered(rendered):
+    # 페이지는 받았는데 제목/본문이 모두 비었으면 parse 실패로 (재시도 정책이 종류별로 처리)
+    if not (rendered[0] or rendered[1]):
+        raise ParseError("empty title and text")
+    return rendered
 
 # 전체 파이프라인
 def crawl_all_posts(
@@ -205,46 +503,204 @@ def crawl_all_posts(
     max_scrolls: int = 200,
     pause_sec: float = 1.0,
     per_post_delay: float = 1.0,
+    pool: Optional[BrowserPool] = None,
+    concurrency: int = 1,
+    rate: Optional[float] = None,
+    burst: int = 1,
+    backend=None,
+    known: Optional[Set[str]] = None,
+    stop_after_known: int = 5,
+    refresh_known: bool = False,
+    store: Optional[CrawlStore] = None,
+    on_post: Optional[Callable[[dict], None]] = None,
+    keep_posts: bool = True,
+    on_links: Optional[Callable[[List[str]], None]] = None,
+    on_error: Optional[Callable[[str, Exception], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    post_timeout: float = 20.0,
+    retry: Optional[RetryPolicy] = None,
+    breaker: Optional[CircuitBreaker] = None,
 ) -> dict:
  
     # 1) 프로필 전체 스크롤 -> 모든 포스트 링크 수집
     # 2) 각 포스트 렌더 -> 메타데이터/본문 추출
-
-    links = render_list_with_playwright(handle, max_scrolls=max_scrolls, pause_sec=pause_sec)
-    print(f"[INFO] 링크 수집 완료: {len(links)}개")
+    # 목록/상세 모두 같은 백엔드(기본: HTTP fast path + 같은 브라우저 풀 폴백)를 공유한다.
+    # - concurrency 개 워커가 동시에 렌더, 결과는 링크 순서 유지
+    # - 매너 딜레이는 호스트별 토큰 버킷(rate 초당 요청, burst)으로 전체 워커가 공유
+    #   rate 미지정 시 per_post_delay 를 요청 간격으로 환산
+    # - backend 에 "auto" | "http" | "playwright" 또는 백엔드 객체를 넘길 수 있음
+    # - known(이미 저장된 URL)을 주면 증분 수집:
+    #   아는 글은 렌더하지 않고, 아는 글이 stop_after_known 개 연속이면 목록 스크롤 중단.
+    #   refresh_known=True 면 목록에서 다시 만난 아는 글도 다시 렌더(수정 반영)
+    # - store(CrawlStore)를 주면 결과를 글마다 바로 저장(known 은 store.known_urls 로 구해서 넘김).
+    #   아는 글 재확인은 ETag/Last-Modified 조건부 요청(지원 백엔드), 본문 해시가 같으면 변경 없음 처리
+    # - on_post: 글 하나가 끝날 때마다 호출(스트리밍 출력). keep_posts=False 면 결과를 메모리에 모으지 않음
+    # - on_links(렌더 대상 목록), on_error(url, 예외): 진행 상황 보고용
+    # - should_stop() 이 True 가 되면 사용자 중단처럼 여기까지만 정리하고 반환
+    # - post_timeout: 글 하나의 렌더 deadline(초). 백엔드가 못 지키면 워치독이 결과를 버리고 다음 글로
+    # - 실패는 retry(RetryPolicy) 로 종류별(timeout/throttle/parse/error) 재시도,
+    #   실패/속도 제한이 몰리면 breaker(CircuitBreaker)가 잠시 멈췄다가 1건씩 재개
+
+    # 풀/리미터는 백엔드를 여기서 만들 때만 사용 (백엔드 객체를 받으면 그 백엔드의 풀이 실제로 렌더)
+    own_pool = own_backend = None
+    if backend is None or isinstance(backend, str):
+        if pool is None:
+            if concurrency > 1:
+                pool = own_pool = BrowserPool(workers=concurrency)
+            else:
+                pool = get_default_pool()
+        if rate is None and per_post_delay > 0:
+            rate = 1.0 / per_post_delay
+        limiter = HostRateLimiter(rate, burst) if rate else None
+        backend = own_backend = make_backend(
+            backend or "auto", pool, limiter, workers=max(1, concurrency), timeout_ms=int(post_timeout * 1000)
+        )
+
+    # 브라우저 요청 차단 집계는 풀 전체 누적이므로 이번 크롤 분만 차이로 계산 (브라우저를 안 쓰는 백엔드면 생략)
+    route_pool = backend_pool(backend)
+    route_before = route_pool.policy.stats.snapshot() if route_pool is not None else None
+
+    try:
+        return _crawl_with_backend(
+            handle, max_scrolls, pause_sec, backend, max(1, concurrency),
+            known=known, stop_after_known=stop_after_known, refresh_known=refresh_known, store=store,
+            on_post=on_post, keep_posts=keep_posts, on_links=on_links, on_error=on_error, should_stop=should_stop,
+            post_timeout=post_timeout, retry=retry, breaker=breaker,
+        )
+    finally:
+        route = diff_stats(route_pool.policy.stats.snapshot(), route_before) if route_pool is not None else {}
+        if route.get("requests_allowed") or route.get("requests_blocked"):
+            print(f"[INFO] 브라우저 요청: 허용 {route['requests_allowed']}개 ({route['bytes_allowed'] / 1024:.0f}KB),"
+                  f" 차단 {route['requests_blocked']}개 {route['blocked_by_rule']}")
+        if own_backend is not None:
+            own_backend.close()
+        if own_pool is not None:
+            own_pool.close()
+
+def _crawl_with_backend(
+    handle: str,
+    max_scrolls: int,
+    pause_sec: float,
+    backend,
+    concurrency: int,
+    known: Optional[Set[str]] = None,
+    stop_after_known: int = 0,
+    refresh_known: bool = False,
+    store: Optional[CrawlStore] = None,
+    on_post: Optional[Callable[[dict], None]] = None,
+    keep_posts: bool = True,
+    on_links: Optional[Callable[[List[str]], None]] = None,
+    on_error: Optional[Callable[[str, Exception], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    post_timeout: float = 20.0,
+    retry: Optional[RetryPolicy] = None,
+    breaker: Optional[CircuitBreaker] = None,
+) -> dict:
+    known = {_normalize_post_href(u) for u in (known or ())}
+    crawl_now = reference_now()
+    retry = retry or RetryPolicy()
+    breaker = breaker or CircuitBreaker()
+    with stage("list_links"):
+        links = backend.list_links(
+            handle, max_scrolls=max_scrolls, pause_sec=pause_sec,
+            known=known, stop_after_known=stop_after_known if known else 0,
+        )
+    print(f"[INFO] 링크 수집 완료: {len(links)}개 ({backend.name})")
+
+    targets = links if refresh_known else [u for u in links if u not in known]
+    if known:
+        print(f"[INFO] 증분 수집: 새 글 {len([u for u in links if u not in known])}개, 렌더 대상 {len(targets)}개")
+    if on_links is not None:
+        on_links(targets)
 
     posts = []
-    for i, url in enumerate(links, 1):
-        try:
-            title, text, code_langs, tags, published = render_post_with_playwright(url)
-
-            # 상단 boilerplate 제거
-            if text:
-                text = re.sub(r"(로그인|팔로우|목록 보기)\s*", " ", text)
-                text = re.sub(r"\s{2,}", " ", text).strip()
-
-            posts.append({
-                "url": url,
-                "title": title or "",
-                "tags": tags,
-                "published_at": published or "",  # 상대표현일 수 있음
-                "updated_at": "",
-                "text": text or "",
-                "code_langs": code_langs,
-                "likes": 0,
-                "comments": 0,
-                "series": None,
-                "content_hash": hashlib.md5(url.encode()).hexdigest(),
-            })
-
-            if i % 10 == 0:
-                print(f"[INFO] {i}/{len(links)} 수집 중...")
-            time.sleep(per_post_delay)  # 매너 딜레이
-        except KeyboardInterrupt:
-            print("\n[WARN] 사용자 중단 감지. 여기까지 저장합니다.")
-            break
-        except Exception as ex:
-            print("skip:", url, ex)
+    # (url, future, 지금까지 실패 횟수)
+    pending: Deque[Tuple[str, Future, int]] = deque()
+    todo = deque(targets)
+    window = concurrency * 2  # 큐에 너무 많이 쌓지 않도록 앞서 제출하는 개수 제한
+    done = 0
+    unchanged = 0
+    failures = {"timeout": 0, "throttle": 0, "parse": 0, "gone": 0, "error": 0}
+
+    def submit(url: str) -> Future:
+        validators = store.validators(url) if store is not None and url in known else (None, None)
+        return submit_validated(backend, url, validators)
+
+    def fill() -> None:
+        # 브레이커가 open 이면 새로 보내지 않고, half-open 이면 1건씩
+        while todo and len(pending) < breaker.allowed_in_flight(window):
+            url = todo.popleft()
+            pending.append((url, submit(url), 0))
+
+    def finish(url: str, result) -> None:
+        nonlocal unchanged
+        rendered, etag, last_modified = result
+        if rendered is None:
+            if store is not None:
+                store.touch(url)
+            unchanged += 1
+            return
+        rec = build_post_record(url, check_rendered(rendered), crawl_now)
+        if store is not None:
+            with stage("store_write"):
+                if not store.upsert(rec, etag, last_modified):
+                    unchanged += 1
+        if on_post is not None:
+            on_post(rec)
+        if keep_posts:
+            posts.append(rec)
+
+    try:
+        fill()
+        while pending or todo:
+            if should_stop is not None and should_stop():
+                raise KeyboardInterrupt
+            if not pending:
+                breaker.wait(should_stop)
+                fill()
+                continue
+            url, fut, attempt = pending[0]
+            try:
+                finish(url, wait_post_result(fut, post_timeout))
+                breaker.record(None)
+                REGISTRY.inc("velog_posts_total", result="ok")
+            except Exception as ex:
+                kind = classify_error(ex)
+                breaker.record(kind)
+                REGISTRY.inc("velog_post_failures_total", kind=kind)
+                attempt += 1
+                if retry.should_retry(kind, attempt):
+                    delay = retry.delay(kind, attempt)
+                    print(f"[WARN] {kind} {url} ({ex}) -> {delay:.1f}초 뒤 재시도 {attempt}")
+                    time.sleep(delay)
+                    breaker.wait(should_stop)
+                    pending[0] = (url, submit(url), attempt)
+                    continue
+                failures[kind] += 1
+                print(f"skip ({kind}):", url, ex)
+                if on_error is not None:
+                    on_error(url, ex)
+            pending.popleft()
+            done += 1
+            if done % 10 == 0:
+                print(f"[INFO] {done}/{len(targets)} 수집 중...")
+            fill()
+    except KeyboardInterrupt:
+        print("\n[WARN] 사용자 중단 감지. 여기까지 저장합니다.")
+        for _, fut, _ in pending:
+            fut.cancel()
+        # 이미 끝난 것은 순서대로 살림
+        for url, fut, _ in pending:
+            if fut.done() and not fut.cancelled() and fut.exception() is None:
+                try:
+                    finish(url, fut.result())
+                except Exception:
+                    pass
+
+    if any(failures.values()):
+        print(f"[INFO] 실패: {failures}, 브레이커: {breaker.stats()}")
+    if unchanged:
+        print(f"[INFO] 변경 없음: {unchanged}개")
 
     return {
         "source": "velog",
@@ -253,45 +709,159 @@ def crawl_all_posts(
         "schema_version": 1,
     }
 
-if __name__ == "__main__":
-    import argparse, os, json
+def main():
+    import argparse, os
 
     parser = argparse.ArgumentParser(description="Velog full crawler")
     parser.add_argument("--handle", required=True, help="Velog handle (without @)")
     parser.add_argument("--max-scrolls", type=int, default=220)
     parser.add_argument("--pause", type=float, default=1.0)
     parser.add_argument("--per-post-delay", type=float, default=1.0)
-    parser.add_argument("--out", default="out.json", help="output json path")
+    parser.add_argument("--out", default="out.json", help="output path (export of the store); .vca writes the columnar archive")
+    parser.add_argument("--store", default="crawl.db", help="SQLite crawl store path ('' to disable)")
+    parser.add_argument("--jsonl", default="", help="stream each post to this JSONL file (.gz/.zst for compression)")
+    parser.add_argument("--fsync-every", type=int, default=20, help="with --jsonl, fsync after N posts")
+    parser.add_argument("--near-dup", default="",
+                        help="check each crawled post against this near-duplicate index (near_dup.db) and add it")
+    parser.add_argument("--compact", action="store_true", help="with --jsonl, also write the pretty --out JSON at the end")
+    parser.add_argument("--concurrency", type=int, default=1, help="number of posts rendered in parallel")
+    parser.add_argument("--rate", type=float, default=None, help="requests/sec per host (default: 1/per-post-delay)")
+    parser.add_argument("--burst", type=int, default=1, help="token bucket burst size")
+    parser.add_argument("--backend", choices=["auto", "http", "playwright"], default="auto",
+                        help="auto: HTTP fast path, Playwright only as fallback")
+    parser.add_argument("--pages-per-context", type=int, default=50, help="recycle browser context after N pages")
     parser.add_argument("--resume", action="store_true", help="skip already-scraped URLs from existing out.json")
+    parser.add_argument("--stop-after-known", type=int, default=5,
+                        help="with --resume, stop listing after N consecutive already-known posts (0: list all)")
+    parser.add_argument("--refresh-known", action="store_true",
+                        help="with --resume, re-render known posts met while listing to pick up edits")
+    parser.add_argument("--post-timeout", type=float, default=20.0, help="hard deadline per post render (sec)")
+    parser.add_argument("--max-retries", type=int, default=2,
+                        help="retries per post for timeouts/errors (throttling gets one more, parse failures at most 1)")
+    parser.add_argument("--breaker-cooldown", type=float, default=30.0,
+                        help="pause (sec) when failures/throttling pile up; doubles while velog keeps failing")
+    parser.add_argument("--block-types", default="image,font,media",
+                        help="browser resource types to abort, comma separated ('' to allow all)")
+    parser.add_argument("--block-url", action="append", default=[],
+                        help="extra URL regex to abort (repeatable; analytics/ads are blocked by default)")
+    parser.add_argument("--allow-domains", default="velog.io,velcdn.com",
+                        help="only these domains (and subdomains) may load in the browser ('' to allow any)")
+    parser.add_argument("--profile", action="store_true", help="print per-stage timing report at the end")
+    parser.add_argument("--stage-log", default="", help="write one JSON line per timed stage here ('-' for stderr)")
     args = parser.parse_args()
+    started = time.perf_counter()
+    if args.stage_log:
+        enable_stage_log(None if args.stage_log == "-" else args.stage_log)
+
+    def report() -> None:
+        if args.profile:
+            print(f"\n[PROFILE] 단계별 소요 (전체 {time.perf_counter() - started:.1f}초)")
+            print(profile_report(wall_seconds=time.perf_counter() - started))
+
+    # 저장소가 기본 상태. out.json 은 끝에 저장소에서 내보냄
+    store = CrawlStore(args.store) if args.store else None
 
     # 기존 out.json 로드(증분)
     existing = {"source":"velog","author":{"handle": args.handle},"posts": [], "schema_version":1}
     seen = set()
-    if args.resume and os.path.exists(args.out):
-        with open(args.out, encoding="utf-8") as f:
-            try:
-                prev = json.load(f)
-                if prev.get("author",{}).get("handle") == args.handle:
-                    existing = prev
-                    seen = {p["url"] for p in prev.get("posts", [])}
-            except Exception:
-                pass
-
-    data = crawl_all_posts(
-        args.handle, max_scrolls=args.max_scrolls, pause_sec=args.pause, per_post_delay=args.per_post_delay
-    )
-
-    # 증분 병합 & 중복 제거
-    merged = existing.get("posts", []) + [p for p in data["posts"] if p["url"] not in seen]
-    # URL 기준 중복 제거(혹시 두 번 들어온 경우)
-    dedup = {}
-    for p in merged:
-        dedup[p["url"]] = p
-    posts = list(dedup.values())
-
-    out = {"source":"velog","author":{"handle": args.handle}, "posts": posts, "schema_version":1}
-    with open(args.out, "w", encoding="utf-8") as f:
-        json.dump(out, f, ensure_ascii=False, indent=2)
+    if args.resume and os.path.exists(args.out) and (store is None or store.count(args.handle) == 0):
+        try:
+            prev = read_doc(args.out)
+            if prev.get("author",{}).get("handle") == args.handle:
+                existing = prev
+                seen = {p["url"] for p in prev.get("posts", [])}
+        except Exception:
+            pass
+        # 저장소가 비어 있으면 예전 out.json 을 한 번 옮겨 담음
+        if store is not None and existing["posts"]:
+            print(f"[INFO] out.json -> {args.store} 가져오기: {store.import_doc(existing)}개")
+    if store is not None and args.resume:
+        seen = store.known_urls(args.handle)
+    # 스트리밍 모드: 이전 JSONL 에 있는 글부터 이어서
+    if args.jsonl and args.resume:
+        seen |= jsonl_urls(args.jsonl, args.handle)
+    writer = JsonlWriter(args.jsonl, fsync_every=args.fsync_every) if args.jsonl else None
+    # 유사 중복 색인: 새로 받은/바뀐 글만 서명을 만들어 이전 크롤까지의 글과 비교
+    near_dup = None
+    dup_hits: List[Tuple[str, str]] = []
+    if args.near_dup:
+        from near_dup import NearDupIndex
+        near_dup = NearDupIndex(args.near_dup)
+
+    def on_post(rec: dict) -> None:
+        if near_dup is not None:
+            with stage("near_dup"):
+                cluster = near_dup.add(rec)
+            if cluster and cluster != rec["url"]:
+                dup_hits.append((rec["url"], cluster))
+        if writer is not None:
+            writer.write(rec)
+
+    try:
+        policy = parse_policy_args(args.block_types, tuple(args.block_url), args.allow_domains)
+        with BrowserPool(workers=args.concurrency, max_pages_per_context=args.pages_per_context, policy=policy) as pool:
+            data = crawl_all_posts(
+                args.handle, max_scrolls=args.max_scrolls, pause_sec=args.pause, per_post_delay=args.per_post_delay,
+                pool=pool, concurrency=args.concurrency, rate=args.rate, burst=args.burst, backend=args.backend,
+                known=seen, stop_after_known=args.stop_after_known, refresh_known=args.refresh_known,
+                store=store, on_post=on_post if writer or near_dup else None, keep_posts=writer is None,
+                post_timeout=args.post_timeout,
+                retry=RetryPolicy({
+                    "timeout": args.max_retries, "error": args.max_retries,
+                    "throttle": args.max_retries + 1, "parse": min(1, args.max_retries),
+                }),
+                breaker=CircuitBreaker(cooldown=args.breaker_cooldown),
+            )
+    finally:
+        if writer is not None:
+            writer.close()
+        if near_dup is not None:
+            near_dup.close()
+
+    if dup_hits:
+        print(f"[INFO] 유사 중복 {len(dup_hits)}개 (분석 시 analyze.py --dedupe {args.near_dup})")
+        for url, cluster in dup_hits[:10]:
+            print(f"  {url} ≈ {cluster}")
+
+    if writer is not None:
+        print(f"[INFO] 스트리밍 저장: {writer.written}개 → {args.jsonl}")
+        if not args.compact:
+            if store is not None:
+                store.close()
+            report()
+            return
+        # 최종 압축 단계(선택): 저장소가 있으면 저장소에서, 없으면 JSONL 에서 pretty JSON 생성
+        if store is None:
+            if args.out.endswith(ARCHIVE_EXT):
+                # JSONL -> (URL 중복 정리된) JSON -> 아카이브
+                n = compact_to_json(args.jsonl, args.out + ".json", args.handle)
+                pack(args.out + ".json", args.out)
+                os.remove(args.out + ".json")
+            else:
+                n = compact_to_json(args.jsonl, args.out, args.handle)
+            print(f"[DONE] 총 {n}개 포스트 저장 → {args.out}")
+            report()
+            return
+
+    if store is not None:
+        out = store.export(args.handle)
+        posts = out["posts"]
+        store.close()
+    else:
+        # 증분 병합 & 중복 제거
+        # 새로 렌더한 글(재방문 포함)이 기존 레코드를 덮어씀. 기존 글 순서는 유지
+        merged = existing.get("posts", []) + data["posts"]
+        # URL 기준 중복 제거(혹시 두 번 들어온 경우)
+        dedup = {}
+        for p in merged:
+            dedup[_normalize_post_href(p["url"])] = p
+        posts = list(dedup.values())
+        out = {"source":"velog","author":{"handle": args.handle}, "posts": posts, "schema_version":1}
+
+    with stage("json_export"):
+        write_doc(out, args.out)  # .vca 면 컬럼형 아카이브
     print(f"[DONE] 총 {len(posts)}개 포스트 저장 → {args.out}")
+    report()
 
+if __name__ == "__main__":
+    main()
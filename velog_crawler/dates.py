@@ -0,0 +1,132 @@
+# 날짜 문자열 정규화 (크롤러/분석/API 공용)
+# - 형식을 먼저 보고(ISO / RFC822 / "2025. 8. 9 오후 3:00" / "3일 전") 맞는 파서 하나만 실행
+# - 절대 날짜는 결과를 메모 (같은 문자열이 반복되는 목록/분석에서 재파싱 안 함)
+# - 상대 날짜("약 3시간 전", "어제")는 호출자가 준 기준 시각 now 로 계산
+#   크롤 한 번 = now 하나 -> 같은 실행에서 같은 문자열은 같은 시각. 크롤러는 저장 전에 절대 시각으로 바꿔 둠
+import re
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Optional
+from zoneinfo import ZoneInfo  # Py3.9+
+
+KST = ZoneInfo("Asia/Seoul")
+
+_ISO_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+# 2025. 8. 9 [오전/오후] 9:00(:ss)?
+_KOREAN_RE = re.compile(
+    r"(\d{4})\.\s*(\d{1,2})\.\s*(\d{1,2})\.?(?:\s*(오전|오후)?\s*(\d{1,2}):(\d{2})(?::(\d{2}))?)?"
+)
+_RELATIVE_RE = re.compile(r"(?:약\s*)?(\d+)\s*(초|분|시간|일|주|개월|달|년)\s*전")
+_RELATIVE_WORDS = {"방금": timedelta(0), "방금 전": timedelta(0), "어제": timedelta(days=1), "그제": timedelta(days=2)}
+_UNIT = {"초": timedelta(seconds=1), "분": timedelta(minutes=1), "시간": timedelta(hours=1), "일": timedelta(days=1),
+         "주": timedelta(days=7), "개월": timedelta(days=30), "달": timedelta(days=30), "년": timedelta(days=365)}
+
+
+def reference_now() -> datetime:
+    # 실행(크롤/분석/요청) 시작 시 한 번 구해서 넘길 기준 시각
+    return datetime.now(KST)
+
+
+def to_utc(s: Optional[str], now: Optional[datetime] = None) -> Optional[datetime]:
+    # 날짜 문자열 -> UTC datetime (모르면 None). now 는 상대 날짜에만 쓰임
+    if not s:
+        return None
+    text = s.strip()
+    if not text:
+        return None
+    head = text[0]
+    if head.isdigit() and len(text) >= 5 and text[4] == "-" and _ISO_RE.match(text):
+        return _parse_iso(text)
+    if head.isdigit() and len(text) >= 5 and text[4] == ".":
+        return _parse_korean(text)
+    if head.isalpha() and head.isascii():
+        return _parse_rfc822(text)
+    # 상대 표기, 아니면 앞뒤에 다른 글자가 붙은 한국어 날짜("· 2025. 8. 9")
+    return _parse_relative(text, now) or _search_korean(text)
+
+
+def to_date_str(s: Optional[str], now: Optional[datetime] = None) -> Optional[str]:
+    # 화면/API 용 날짜(YYYY-MM-DD). ISO 는 적힌 오프셋 그대로의 날짜("2025-08-09T20:00Z" -> 2025-08-09),
+    # 한국어/상대 표기는 한국 시간 기준
+    text = s.strip() if s else ""
+    if _ISO_RE.match(text):
+        dt = _iso_as_written(text)
+        return dt.strftime("%Y-%m-%d") if dt else None
+    dt = to_utc(text, now)
+    return dt.astimezone(KST).strftime("%Y-%m-%d") if dt else None
+
+
+def resolve_published(s: Optional[str], now: Optional[datetime] = None) -> str:
+    # 크롤 시점에 저장할 게시 시각: 상대/한국어 표기는 절대 ISO(KST)로, ISO 는 그대로, 못 읽으면 원문
+    if not s:
+        return ""
+    text = s.strip()
+    if _ISO_RE.match(text):
+        return text
+    dt = to_utc(text, now)
+    return dt.astimezone(KST).isoformat() if dt else text
+
+
+@lru_cache(maxsize=65536)
+def _iso_as_written(text: str) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=65536)
+def _parse_iso(text: str) -> Optional[datetime]:
+    dt = _iso_as_written(text)
+    # 오프셋 없는 시각은 이 기계의 현지 시각으로 읽음 (astimezone 기본 동작)
+    return dt.astimezone(timezone.utc) if dt else None
+
+
+@lru_cache(maxsize=65536)
+def _parse_korean(text: str) -> Optional[datetime]:
+    return _korean_match(_KOREAN_RE.match(text))
+
+
+@lru_cache(maxsize=4096)
+def _search_korean(text: str) -> Optional[datetime]:
+    return _korean_match(_KOREAN_RE.search(text))
+
+
+def _korean_match(m) -> Optional[datetime]:
+    if not m:
+        return None
+    y, mo, d = int(m.group(1)), int(m.group(2)), int(m.group(3))
+    ampm, hh, mm, ss = m.group(4), m.group(5), m.group(6), m.group(7)
+    h = int(hh) if hh else 0
+    if ampm == "오후" and h < 12:
+        h += 12
+    if ampm == "오전" and h == 12:
+        h = 0
+    try:
+        kst_dt = datetime(y, mo, d, h, int(mm) if mm else 0, int(ss) if ss else 0, tzinfo=KST)
+    except ValueError:
+        return None
+    return kst_dt.astimezone(timezone.utc)
+
+
+@lru_cache(maxsize=4096)
+def _parse_rfc822(text: str) -> Optional[datetime]:
+    try:
+        dt = parsedate_to_datetime(text)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _parse_relative(text: str, now: Optional[datetime]) -> Optional[datetime]:
+    m = _RELATIVE_RE.search(text)
+    if m:
+        delta = int(m.group(1)) * _UNIT[m.group(2)]
+    else:
+        delta = _RELATIVE_WORDS.get(text)
+        if delta is None:
+            return None
+    return ((now or reference_now()) - delta).astimezone(timezone.utc)
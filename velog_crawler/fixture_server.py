@@ -0,0 +1,247 @@
+# 벤치마크용 로컬 velog 대역 서버 (네트워크 없이 같은 입력으로 반복 측정)
+# - GET  /@{handle}        : 프로필. 첫 20개 카드 + 스크롤하면 /graphql 로 다음 페이지를 불러와 붙이는 무한 스크롤
+# - GET  /@{handle}/{slug} : 글 페이지 (h1, 태그, 본문 문단/코드블록/이미지, 게시일)
+# - POST /graphql          : posts(cursor, username, limit) / post(username, url_slug) — velog API 와 같은 모양
+# - GET  /img/*, /static/* : 이미지/스타일시트 (차단 정책 효과 측정용 바이트)
+# 글 내용은 seed 로 고정 생성 -> 버전 간 비교 가능
+# - fixture.status["<url_slug>" 또는 "@<handle>"] = 429 처럼 넣으면 해당 글/목록 요청(HTML, GraphQL 모두)이 그 상태로 응답
+import hashlib, json, random, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+PAGE_SIZE = 20
+WORDS = (
+    "스프링 자바 파이썬 리액트 쿠버네티스 도커 데이터베이스 인덱스 트랜잭션 캐시 비동기 스레드 "
+    "테스트 배포 성능 메모리 네트워크 브라우저 컴포넌트 상태 쿼리 서버 클라이언트 알고리즘"
+).split()
+TAGS = ["java", "spring", "python", "react", "docker", "kubernetes", "database", "algorithm", "network", "cs"]
+LANGS = ["java", "python", "javascript", "sql", "bash", "kotlin"]
+
+PROFILE_JS = r"""
+(() => {
+  const handle = document.body.dataset.handle;
+  let cursor = document.body.dataset.cursor || null;
+  let loading = false, ended = !cursor;
+  const list = document.getElementById('posts');
+  const query = `query Posts($cursor: ID, $username: String, $limit: Int) {
+    posts(cursor: $cursor, username: $username, limit: $limit) { id title url_slug released_at tags user { username } } }`;
+  async function more() {
+    if (loading || ended) return;
+    loading = true;
+    const res = await fetch('/graphql', {method: 'POST', headers: {'Content-Type': 'application/json'},
+      body: JSON.stringify({query, variables: {cursor, username: handle, limit: 20}})});
+    const items = (await res.json()).data.posts;
+    for (const p of items) {
+      const div = document.createElement('div');
+      div.className = 'card';
+      div.innerHTML = `<a href="/@${handle}/${encodeURIComponent(p.url_slug)}"><img src="/img/${p.id}.png">` +
+        `<h2>${p.title}</h2></a><span>${p.released_at.slice(0, 10)}</span>`;
+      list.appendChild(div);
+    }
+    if (items.length < 20) ended = true; else cursor = items[items.length - 1].id;
+    loading = false;
+  }
+  window.addEventListener('scroll', () => {
+    if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 200) more();
+  });
+})();
+"""
+
+
+class Fixture:
+    # 고정 seed 로 만든 가짜 작성자/글 데이터
+
+    def __init__(self, handle: str = "bench", posts: int = 200, paragraphs: int = 12, seed: int = 7):
+        self.handle = handle
+        rnd = random.Random(seed)
+        self.posts: List[dict] = []
+        for i in range(posts):
+            # 최신 글이 앞 (velog 목록 순서)
+            day = posts - i
+            slug = f"post-{i}-{'한글' if i % 7 == 0 else 'slug'}"
+            paras = [" ".join(rnd.choice(WORDS) for _ in range(rnd.randint(25, 60))) for _ in range(paragraphs)]
+            langs = rnd.sample(LANGS, 2)
+            self.posts.append({
+                "id": str(i),
+                "title": f"{rnd.choice(WORDS)} {rnd.choice(WORDS)} 정리 #{i}",
+                "url_slug": slug,
+                "released_at": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(1.7e9 + day * 86400)),
+                "updated_at": None,
+                "tags": rnd.sample(TAGS, rnd.randint(1, 3)),
+                "likes": rnd.randint(0, 50),
+                "comments_count": rnd.randint(0, 10),
+                "user": {"username": handle},
+                "paragraphs": paras,
+                "code": [(lang, f"print('{rnd.choice(WORDS)}')\n" * rnd.randint(3, 12)) for lang in langs],
+            })
+        self.by_slug = {p["url_slug"]: p for p in self.posts}
+        self.status: Dict[str, int] = {}  # 오류 응답 주입 (테스트용)
+
+    def page(self, cursor: Optional[str], limit: int) -> List[dict]:
+        start = 0 if cursor is None else int(cursor) + 1
+        return [{k: v for k, v in p.items() if k not in ("paragraphs", "code")}
+                for p in self.posts[start:start + limit]]
+
+    def markdown(self, p: dict) -> str:
+        parts = []
+        for i, para in enumerate(p["paragraphs"]):
+            parts.append(para)
+            if i < len(p["code"]):
+                lang, code = p["code"][i]
+                parts.append(f"```{lang}\n{code}```")
+            if i % 4 == 0:
+                parts.append(f"![그림](/img/{p['id']}-{i}.png)")
+        return "\n\n".join(parts)
+
+    def post_html(self, p: dict) -> str:
+        body = []
+        for i, para in enumerate(p["paragraphs"]):
+            body.append(f"<p>{para}</p>")
+            if i < len(p["code"]):
+                lang, code = p["code"][i]
+                body.append(f'<pre><code class="language-{lang}">{code}</code></pre>')
+            if i % 4 == 0:
+                body.append(f'<img src="/img/{p["id"]}-{i}.png">')
+        tags = "".join(f'<a href="/tag/{t}">{t}</a>' for t in p["tags"])
+        date = p["released_at"][:10].replace("-", ". ")
+        return (
+            '<!doctype html><html><head><meta charset="utf-8">'
+            '<link rel="stylesheet" href="/static/app.css"></head><body>'
+            '<div id="root"><header><a href="/">velog</a> 로그인</header>'
+            f'<h1>{p["title"]}</h1><div class="info"><span>{p["user"]["username"]}</span>'
+            f'<span>{date}</span></div><div class="tags">{tags}</div>'
+            f'<article>{"".join(body)}</article></div></body></html>'
+        )
+
+    def profile_html(self) -> str:
+        first = self.page(None, PAGE_SIZE)
+        cards = "".join(
+            f'<div class="card"><a href="/@{self.handle}/{p["url_slug"]}"><img src="/img/{p["id"]}.png">'
+            f'<h2>{p["title"]}</h2></a><span>{p["released_at"][:10]}</span></div>'
+            for p in first
+        )
+        cursor = first[-1]["id"] if len(first) == PAGE_SIZE else ""
+        # 스크롤이 생기도록 카드 높이를 줌
+        return (
+            '<!doctype html><html><head><meta charset="utf-8"><link rel="stylesheet" href="/static/app.css">'
+            '<style>.card{height:300px}</style></head>'
+            f'<body data-handle="{self.handle}" data-cursor="{cursor}"><div id="posts">{cards}</div>'
+            f'<script>{PROFILE_JS}</script></body></html>'
+        )
+
+
+def make_handler(fx: Fixture, latency_ms: float = 0.0, image_bytes: int = 20000):
+    image = b"\x89PNG\r\n\x1a\n" + b"\0" * image_bytes
+    css = b"body{font-family:sans-serif}" + b" " * 4000
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True  # keep-alive 에서 헤더/본문 분할 전송 시 40ms 지연 방지
+
+        def log_message(self, *args) -> None:
+            pass
+
+        def _send(self, status: int, body: bytes, ctype: str, headers: Optional[dict] = None) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _delay(self) -> None:
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+
+        def _injected(self, key: str) -> bool:
+            status = fx.status.get(key)
+            if status is None:
+                return False
+            self._send(status, b"error", "text/plain", {"Retry-After": "1"} if status in (429, 503) else None)
+            return True
+
+        def do_GET(self) -> None:
+            path = unquote(urlsplit(self.path).path)
+            if path.startswith("/img/"):
+                return self._send(200, image, "image/png")
+            if path.startswith("/static/"):
+                return self._send(200, css, "text/css")
+            self._delay()
+            parts = [x for x in path.split("/") if x]
+            if parts and self._injected(parts[-1]):
+                return
+            if len(parts) == 1 and parts[0] == f"@{fx.handle}":
+                return self._send(200, fx.profile_html().encode(), "text/html; charset=utf-8")
+            if len(parts) == 2 and parts[0] == f"@{fx.handle}" and parts[1] in fx.by_slug:
+                body = fx.post_html(fx.by_slug[parts[1]]).encode()
+                etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    return self._send(304, b"", "text/html", {"ETag": etag})
+                return self._send(200, body, "text/html; charset=utf-8", {"ETag": etag})
+            self._send(404, b"not found", "text/plain")
+
+        def do_POST(self) -> None:
+            self._delay()
+            n = int(self.headers.get("Content-Length") or 0)
+            try:
+                req = json.loads(self.rfile.read(n))
+            except ValueError:
+                return self._send(400, b"{}", "application/json")
+            query, v = req.get("query") or "", req.get("variables") or {}
+            if self._injected(f"@{v.get('username')}" if "posts(" in query else str(v.get("url_slug"))):
+                return
+            if "posts(" in query:
+                data = {"posts": fx.page(v.get("cursor"), int(v.get("limit") or PAGE_SIZE))
+                        if v.get("username") == fx.handle else []}
+            else:
+                p = fx.by_slug.get(v.get("url_slug")) if v.get("username") == fx.handle else None
+                data = {"post": None if p is None else {
+                    "id": p["id"], "title": p["title"], "released_at": p["released_at"],
+                    "updated_at": p["updated_at"], "tags": p["tags"], "body": fx.markdown(p),
+                    "likes": p["likes"], "comments_count": p["comments_count"], "series": None,
+                }}
+            self._send(200, json.dumps({"data": data}, ensure_ascii=False).encode(), "application/json")
+
+    return Handler
+
+
+def start_fixture_server(
+    posts: int = 200,
+    handle: str = "bench",
+    paragraphs: int = 12,
+    latency_ms: float = 0.0,
+    port: int = 0,
+) -> Tuple[ThreadingHTTPServer, str]:
+    # 백그라운드 스레드로 띄우고 (server, base_url) 반환. 끝나면 server.shutdown()
+    fx = Fixture(handle, posts, paragraphs)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(fx, latency_ms))
+    server.daemon_threads = True
+    server.fixture = fx
+    threading.Thread(target=server.serve_forever, name="fixture-server", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local velog-like fixture server for benchmarks")
+    parser.add_argument("--posts", type=int, default=200)
+    parser.add_argument("--handle", default="bench")
+    parser.add_argument("--paragraphs", type=int, default=12, help="paragraphs per post")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added delay per page/API response")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server, base = start_fixture_server(args.posts, args.handle, args.paragraphs, args.latency_ms, args.port)
+    print(f"[INFO] fixture: {base}/@{args.handle} (글 {args.posts}개)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
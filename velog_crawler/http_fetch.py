@@ -0,0 +1,552 @@
+# 브라우저 없이 HTTP 로 목록/상세 수집 (fast path)
+# - velog GraphQL API 우선, 실패하면 서버 렌더 HTML 을 BeautifulSoup 으로 파싱
+# - requests.Session 커넥션 풀 + keep-alive 재사용
+# - base_url / graphql_url 을 바꾸면 로컬 대역 서버(녹화 응답)로도 돌릴 수 있음
+import re, threading, time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator, List, Optional, Set, Tuple
+from urllib.parse import quote, unquote, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+from browser_pool import UA
+from ratelimit import HostRateLimiter
+from retry import ParseError, classify_error
+from metrics import stage
+
+VELOG_URL = "https://velog.io"
+GRAPHQL_URL = "https://v3.velog.io/graphql"
+
+POSTS_QUERY = """
+query Posts($cursor: ID, $username: String, $limit: Int) {
+  posts(cursor: $cursor, username: $username, limit: $limit) {
+    id
+    title
+    url_slug
+    released_at
+    updated_at
+    tags
+    likes
+    comments_count
+    user { username }
+  }
+}
+"""
+
+READ_POST_QUERY = """
+query ReadPost($username: String, $url_slug: String) {
+  post(username: $username, url_slug: $url_slug) {
+    id
+    title
+    released_at
+    updated_at
+    tags
+    body
+    likes
+    comments_count
+    series { name }
+  }
+}
+"""
+
+# 조건부 재확인용: 본문 없이 수정 시각만
+POST_STAMP_QUERY = """
+query PostStamp($username: String, $url_slug: String) {
+  post(username: $username, url_slug: $url_slug) {
+    released_at
+    updated_at
+  }
+}
+"""
+
+# GraphQL 은 HTTP 조건부 요청이 안 되므로 글의 updated_at 을 검증자로 씀 (저장소 etag 칸에 "gql:<updated_at>")
+GQL_VALIDATOR = "gql:"
+
+# render_post_with_playwright 와 같은 형태
+PostTuple = Tuple[str, str, List[str], List[str], Optional[str]]
+
+FENCE_LANG_RE = re.compile(r"^\s*(?:```|~~~)\s*([\w+#.-]+)", re.M)
+MD_IMAGE_RE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+MD_LINK_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+MD_FENCE_RE = re.compile(r"^\s*(?:```|~~~).*$", re.M)
+MD_PREFIX_RE = re.compile(r"^\s{0,3}(?:#{1,6}\s+|>\s?|[-*+]\s+)", re.M)
+MD_EMPH_RE = re.compile(r"(\*\*|__|\*|`)")
+HTML_TAG_RE = re.compile(r"<[^>]+>")
+DATE_TEXT_RE = re.compile(r"\d{4}\.\s*\d{1,2}\.\s*\d{1,2}|\d+\s*(?:분|시간|일)\s*전")
+
+
+class FetchError(Exception):
+    pass
+
+
+def graphql_url_for(base_url: str) -> str:
+    # 실제 velog 는 API 도메인이 따로, 로컬 대역 서버는 같은 서버의 /graphql
+    base_url = base_url.rstrip("/")
+    return GRAPHQL_URL if base_url == VELOG_URL else base_url + "/graphql"
+
+
+def split_post_url(url: str) -> Tuple[str, str]:
+    # https://velog.io/@handle/slug -> (handle, slug)
+    parts = [p for p in urlsplit(url).path.split("/") if p]
+    if len(parts) < 2 or not parts[0].startswith("@"):
+        raise FetchError(f"not a post url: {url}")
+    return unquote(parts[0][1:]), unquote(parts[1])
+
+
+def markdown_to_text(md: str) -> str:
+    # 분석에는 평문만 필요. 코드 내용은 남기고 마크업만 걷어냄
+    s = MD_IMAGE_RE.sub(" ", md or "")
+    s = MD_LINK_RE.sub(r"\1", s)
+    s = MD_FENCE_RE.sub("", s)
+    s = MD_PREFIX_RE.sub("", s)
+    s = MD_EMPH_RE.sub("", s)
+    s = HTML_TAG_RE.sub(" ", s)
+    return s.strip()
+
+
+def markdown_code_langs(md: str) -> List[str]:
+    return sorted({m.lower() for m in FENCE_LANG_RE.findall(md or "")})
+
+
+class HttpBackend:
+    name = "http"
+
+    def __init__(
+        self,
+        base_url: str = VELOG_URL,
+        graphql_url: Optional[str] = GRAPHQL_URL,
+        limiter: Optional[HostRateLimiter] = None,
+        workers: int = 4,
+        timeout: float = 15.0,
+        page_size: int = 20,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.graphql_url = graphql_url
+        self.limiter = limiter
+        self.timeout = timeout
+        self.page_size = page_size
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": UA})
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(4, workers))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="http-fetch")
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+    def post_url(self, handle: str, slug: str) -> str:
+        return f"{self.base_url}/@{handle}/{quote(slug)}"
+
+    def _timeout(self, deadline: Optional[float]) -> float:
+        # deadline(time.monotonic 기준)이 있으면 남은 시간만큼만 기다림
+        if deadline is None:
+            return self.timeout
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise FetchError("deadline exceeded")
+        return min(self.timeout, left)
+
+    def _request(self, method: str, url: str, deadline: Optional[float] = None, **kwargs) -> requests.Response:
+        if self.limiter is not None:
+            self.limiter.acquire(url)
+        with stage("http_request"):
+            try:
+                resp = self.session.request(method, url, timeout=self._timeout(deadline), **kwargs)
+            except requests.Timeout:
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise FetchError("deadline exceeded")  # 남은 시간을 다 쓴 경우는 _timeout 과 같은 예외로
+                raise
+        resp.raise_for_status()
+        return resp
+
+    def _graphql(self, query: str, variables: dict, deadline: Optional[float] = None) -> dict:
+        if not self.graphql_url:
+            raise FetchError("graphql disabled")
+        resp = self._request("POST", self.graphql_url, deadline, json={"query": query, "variables": variables})
+        body = resp.json()
+        if body.get("errors"):
+            raise FetchError(str(body["errors"])[:200])
+        return body.get("data") or {}
+
+    # 목록: GraphQL 커서 페이지네이션 (id 기준)
+    def fetch_post_page(
+        self, handle: str, cursor: Optional[str] = None, deadline: Optional[float] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        # -> (글 목록, 다음 커서). 다음 커서가 None 이면 마지막 페이지
+        data = self._graphql(POSTS_QUERY, {"username": handle, "cursor": cursor, "limit": self.page_size}, deadline)
+        items = data.get("posts") or []
+        next_cursor = items[-1]["id"] if len(items) >= self.page_size else None
+        return items, next_cursor
+
+    def iter_post_pages(
+        self, handle: str, cursor: Optional[str] = None, deadline: Optional[float] = None
+    ) -> Iterator[List[dict]]:
+        while True:
+            items, cursor = self.fetch_post_page(handle, cursor, deadline)
+            if items:
+                yield items
+            if cursor is None:
+                return
+
+    def list_links(
+        self,
+        handle: str,
+        known: Optional[Set[str]] = None,
+        stop_after_known: int = 0,
+        deadline: Optional[float] = None,
+        **_,
+    ) -> List[str]:
+        # 최신 글부터 내려오므로, 이미 아는 글이 stop_after_known 개 연속이면 옛 글 구간 -> 중단
+        # deadline 을 넘기면 다음 페이지 요청에서 FetchError
+        links = []
+        run = 0
+        for items in self.iter_post_pages(handle, deadline=deadline):
+            for it in items:
+                url = self.post_url(handle, it["url_slug"])
+                links.append(url)
+                run = run + 1 if known and url in known else 0
+                if stop_after_known and run >= stop_after_known:
+                    return sorted(set(links))
+        return sorted(set(links))
+
+    # 상세: GraphQL -> HTML 순서로 시도
+    def fetch_post(self, url: str, deadline: Optional[float] = None) -> PostTuple:
+        return self.fetch_post_validated(url, deadline)[0]
+
+    def fetch_post_validated(
+        self, url: str, deadline: Optional[float] = None
+    ) -> Tuple[PostTuple, Optional[str], Optional[str]]:
+        # -> (PostTuple, etag, last_modified). GraphQL 로 읽었으면 etag 자리에 "gql:<updated_at>", HTML 이면 응답 헤더
+        handle, slug = split_post_url(url)
+        if self.graphql_url:
+            try:
+                post = self._graphql(READ_POST_QUERY, {"username": handle, "url_slug": slug}, deadline).get("post")
+                if post:
+                    body = post.get("body") or ""
+                    with stage("markdown_parse"):
+                        text, langs = markdown_to_text(body), markdown_code_langs(body)
+                    return (
+                        post.get("title") or "",
+                        text,
+                        langs,
+                        [t for t in (post.get("tags") or []) if t],
+                        post.get("released_at"),
+                    ), _post_stamp(post), None
+            except (requests.RequestException, ValueError, FetchError) as ex:
+                if classify_error(ex) == "throttle":
+                    raise  # 속도 제한 중이면 HTML 로 또 요청하지 않음
+        resp = self._request("GET", url, deadline)
+        with stage("html_parse"):
+            parsed = parse_post_html(resp.text)
+        return parsed, resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+
+    def submit_post(self, url: str, deadline: Optional[float] = None) -> Future:
+        return self._submit(self.fetch_post, url, deadline)
+
+    def _submit(self, fn, *args) -> Future:
+        # 워커 스레드가 실제로 시작한 시각을 started_at 에 (BrowserPool 과 같은 규칙)
+        out: Future = Future()
+
+        def run() -> None:
+            if not out.set_running_or_notify_cancel():
+                return
+            out.started_at = time.monotonic()
+            try:
+                result = fn(*args)
+            except BaseException as ex:
+                out.set_exception(ex)
+            else:
+                out.set_result(result)
+
+        # close() 로 대기 중인 작업이 버려지면 out 도 취소
+        self._executor.submit(run).add_done_callback(lambda f: f.cancelled() and out.cancel())
+        return out
+
+    # 조건부 재확인: 저장된 검증자로 변경 여부부터 확인
+    # -> (None, etag, last_modified) 이면 변경 없음, 아니면 (PostTuple, etag, last_modified) -> 저장소에 검증자까지 기록
+    # - GraphQL 경로: "gql:<updated_at>" 을 본문 없는 질의로 비교 (같으면 요청 1번, 바뀌었으면 본문까지 2번)
+    #   검증자가 없으면(처음 받는 글) 바로 본문 -> 요청 1번으로 검증자도 얻음
+    # - HTML 경로/HTTP 검증자: If-None-Match / If-Modified-Since GET (304 면 요청 1번)
+    def fetch_post_conditional(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ) -> Tuple[Optional[PostTuple], Optional[str], Optional[str]]:
+        if self.graphql_url and (etag or "").startswith(GQL_VALIDATOR):
+            handle, slug = split_post_url(url)
+            post = self._graphql(POST_STAMP_QUERY, {"username": handle, "url_slug": slug}, deadline).get("post")
+            if post and _post_stamp(post) == etag:
+                return None, etag, last_modified
+            return self.fetch_post_validated(url, deadline)
+        if self.graphql_url and not (etag or last_modified):
+            return self.fetch_post_validated(url, deadline)
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        resp = self._request("GET", url, deadline, headers=headers)
+        new_etag = resp.headers.get("ETag") or etag
+        new_lm = resp.headers.get("Last-Modified") or last_modified
+        if resp.status_code == 304:
+            return None, new_etag, new_lm
+        # 바뀐 경우엔 처음 수집과 같은 경로(GraphQL 우선)로 다시 읽어야 본문 해시가 비교 가능
+        if self.graphql_url:
+            return self.fetch_post(url, deadline), new_etag, new_lm
+        with stage("html_parse"):
+            return parse_post_html(resp.text), new_etag, new_lm
+
+    def submit_refresh(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ) -> Future:
+        return self._submit(self.fetch_post_conditional, url, etag, last_modified, deadline)
+
+
+def _post_stamp(post: dict) -> Optional[str]:
+    # GraphQL 글의 검증자 (수정한 적 없으면 발행 시각)
+    stamp = post.get("updated_at") or post.get("released_at")
+    return GQL_VALIDATOR + stamp if stamp else None
+
+
+def parse_post_html(html: str) -> PostTuple:
+    # 서버 렌더 HTML 에서 Playwright 경로와 같은 필드를 뽑는다
+    soup = BeautifulSoup(html, "html.parser")
+
+    h1 = soup.find("h1")
+    title = h1.get_text(" ", strip=True) if h1 else ""
+
+    tags = []
+    for a in soup.select("a[href*='/tag/']"):
+        t = a.get_text(strip=True)
+        if t:
+            tags.append(t)
+
+    langs = set()
+    for code in soup.select("pre code"):
+        dl = code.get("data-language")
+        if dl:
+            langs.add(dl.lower())
+            continue
+        for cls in code.get("class") or []:
+            if cls.startswith("language-"):
+                langs.add(cls[len("language-"):].lower())
+
+    text = ""
+    for sel in ["article", "main", "div#root", "body"]:
+        node = soup.select_one(sel)
+        if node is not None:
+            text = node.get_text("\n", strip=True)
+            if text:
+                break
+
+    published = None
+    t = soup.find("time")
+    if t is not None:
+        published = t.get("datetime") or t.get_text(strip=True) or None
+    if not published:
+        for node in soup.find_all(["span", "div"]):
+            s = node.get_text(" ", strip=True)
+            if len(s) < 40 and DATE_TEXT_RE.search(s):
+                published = s
+                break
+
+    if not (title or text):
+        raise ParseError("empty post html")
+    return title, text, sorted(langs), tags, published
+
+
+class PostListHarvest:
+    # 작성자 글 목록을 필요한 만큼만 이어서 가져오는 상태 (API 페이지네이션용)
+    # items: 최신 글부터 {"url", "title", "released_at", "tags"}
+
+    def __init__(self, backend: HttpBackend, handle: str):
+        self.backend = backend
+        self.handle = handle
+        self.items: List[dict] = []
+        self.cursor: Optional[str] = None
+        self.ended = False
+        self._lock = threading.Lock()
+
+    def ensure(self, n: int, deadline: Optional[float] = None) -> List[dict]:
+        # 앞에서부터 n 개가 확보될 때까지만 다음 페이지를 가져옴
+        # deadline(time.monotonic 기준)을 넘기면 다음 페이지를 요청하지 않고 FetchError (요청마다 남은 시간만 기다림)
+        # 잠금은 페이지 하나 받는 동안만 (같은 페이지는 한 번만 요청, 기다리던 요청은 자기 deadline 까지만 대기)
+        while len(self.items) < n and not self.ended:
+            left = None if deadline is None else deadline - time.monotonic()
+            if left is not None and left <= 0:
+                raise FetchError("deadline exceeded")
+            if not self._lock.acquire(timeout=-1 if left is None else left):
+                raise FetchError("deadline exceeded")
+            try:
+                if len(self.items) < n and not self.ended:  # 기다리는 동안 다른 요청이 받아 왔을 수 있음
+                    self._next_page(deadline)
+            finally:
+                self._lock.release()
+        return self.items[:n]
+
+    def _next_page(self, deadline: Optional[float]) -> None:
+        page, cursor = self.backend.fetch_post_page(self.handle, self.cursor, deadline)
+        self.items.extend([
+            {
+                "url": self.backend.post_url(self.handle, it["url_slug"]),
+                "title": it.get("title") or "",
+                "released_at": it.get("released_at"),
+                "tags": [t for t in (it.get("tags") or []) if t],
+            }
+            for it in page if it.get("url_slug")
+        ])
+        self.cursor = cursor
+        self.ended = cursor is None
+
+
+def _final_error(ex: BaseException) -> bool:
+    # 속도 제한(429/503)/없는 글(404/410)은 브라우저로 다시 해도 같음 -> 폴백 없이 올려서 재시도 정책/브레이커가 보게
+    return classify_error(ex) in ("throttle", "gone")
+
+
+class FallbackBackend:
+    # primary(fast path) 가 실패하거나 빈 결과면 fallback(Playwright) 로 재시도 (속도 제한/없는 글은 제외)
+
+    def __init__(self, primary, fallback):
+        self.primary = primary
+        self.fallback = fallback
+        self.name = f"{primary.name}+{fallback.name}"
+
+    def close(self) -> None:
+        self.primary.close()
+        self.fallback.close()
+
+    def list_links(self, handle: str, **kwargs) -> List[str]:
+        try:
+            links = self.primary.list_links(handle, **kwargs)
+            if links:
+                return links
+        except Exception as ex:
+            if _final_error(ex):
+                raise
+            print(f"[WARN] {self.primary.name} 목록 실패 -> {self.fallback.name}: {ex}")
+        return self.fallback.list_links(handle, **kwargs)
+
+    def fetch_post(self, url: str, deadline: Optional[float] = None) -> PostTuple:
+        return self.submit_post(url, deadline).result()
+
+    def submit_post(self, url: str, deadline: Optional[float] = None) -> Future:
+        out: Future = Future()
+
+        def use_fallback() -> None:
+            if deadline is not None and deadline <= time.monotonic():
+                _copy_future(f_primary, out)  # 폴백할 시간이 없으면 primary 결과(실패) 그대로
+                return
+            fb = self.fallback.submit_post(url, deadline)
+            inner.append(fb)
+            fb.add_done_callback(lambda f: _copy_future(f, out))
+
+        def on_primary(f: Future) -> None:
+            if out.cancelled():
+                return
+            if f.cancelled():
+                out.cancel()
+                return
+            ex = f.exception()
+            if ex is None and (f.result()[0] or f.result()[1]):
+                out.set_result(f.result())
+            elif ex is not None and _final_error(ex):
+                out.set_exception(ex)
+            else:
+                use_fallback()
+
+        def cancel_inner(o: Future) -> None:
+            # 호출측이 취소(요청 deadline 등)하면 아직 대기 중인 내부 작업도 취소
+            if o.cancelled():
+                for f in inner:
+                    f.cancel()
+
+        f_primary = self.primary.submit_post(url, deadline)
+        out.source = f_primary  # 시작 시각은 primary 기준 (task_started_at)
+        inner = [f_primary]
+        out.add_done_callback(cancel_inner)
+        f_primary.add_done_callback(on_primary)
+        return out
+
+    def submit_refresh(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ) -> Future:
+        # 조건부 재확인은 primary 만 지원. 실패하면 일반 수집(폴백 포함)으로
+        if not hasattr(self.primary, "submit_refresh"):
+            return map_future(self.submit_post(url, deadline), lambda r: (r, None, None))
+        out: Future = Future()
+
+        def on_primary(f: Future) -> None:
+            if out.cancelled():
+                return
+            if f.cancelled():
+                out.cancel()
+            elif f.exception() is None:
+                out.set_result(f.result())
+            elif _final_error(f.exception()):
+                out.set_exception(f.exception())
+            else:
+                map_future(self.submit_post(url, deadline), lambda r: (r, None, None)).add_done_callback(
+                    lambda g: _copy_future(g, out)
+                )
+
+        out.source = self.primary.submit_refresh(url, etag, last_modified, deadline)
+        out.source.add_done_callback(on_primary)
+        return out
+
+
+def task_started_at(fut: Future) -> Optional[float]:
+    # 백엔드 워커가 실제로 작업을 시작한 시각 (time.monotonic). 감싼 Future 는 source 를 따라감, 아직 대기 중이면 None
+    while fut is not None:
+        started = getattr(fut, "started_at", None)
+        if started is not None:
+            return started
+        fut = getattr(fut, "source", None)
+    return None
+
+
+def map_future(src: Future, fn) -> Future:
+    # src 결과에 fn 을 적용한 Future (취소/예외는 그대로 전달, task_started_at 은 src 를 따라감)
+    out: Future = Future()
+    out.source = src
+
+    def done(f: Future) -> None:
+        if out.done():
+            return
+        if f.cancelled():
+            out.cancel()
+        elif f.exception() is not None:
+            out.set_exception(f.exception())
+        else:
+            try:
+                out.set_result(fn(f.result()))
+            except Exception as ex:
+                out.set_exception(ex)
+
+    src.add_done_callback(done)
+    return out
+
+
+def _copy_future(src: Future, dst: Future) -> None:
+    if dst.done():
+        return
+    if src.cancelled():
+        dst.cancel()
+    elif src.exception() is not None:
+        dst.set_exception(src.exception())
+    else:
+        dst.set_result(src.result())
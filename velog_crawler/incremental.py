@@ -0,0 +1,459 @@
+# 증분 분석: 작성자별 집계를 SQLite(analytics.db)에 유지하고 새로 수집/변경된 글만 반영
+# - 글 행: url -> 입력 서명(sig), 타임스탬프, 분류 결과. sig 가 같으면 건너뜀
+# - 분류 캐시: (제목, 본문 해시, 태그, 언어) 키 -> 분류 결과. 날짜만 바뀐 글은 다시 분류하지 않음
+# - 집계(범위 scope = all | study): 일별/월별/주제×월/대표 주제 카운터, 연속 일수 구간(runs),
+#   인접 글 간격의 다중집합(gaps) + 합/제곱합 -> 글 하나 추가/삭제는 앞뒤 이웃만 보고 갱신
+# - summary 는 집계 테이블만 읽어서 만듦 (analyze.summarize 와 같은 값)
+import hashlib, itertools, json, sqlite3, threading, time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from analyze import cadence_score, classify_post, load_posts
+from dates import reference_now, to_utc
+from store import content_hash, handle_of
+
+US_PER_DAY = 86_400_000_000
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+EPOCH_DAY = EPOCH.date()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS post_rows (
+    url      TEXT PRIMARY KEY,
+    handle   TEXT NOT NULL,
+    sig      TEXT NOT NULL,
+    cls_key  TEXT NOT NULL,
+    ts_us    INTEGER,               -- epoch 마이크로초, 날짜를 못 구하면 NULL (집계 제외)
+    is_study INTEGER NOT NULL DEFAULT 0,
+    major    TEXT,
+    topics   TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS post_rows_ts ON post_rows(handle, ts_us, url);
+CREATE INDEX IF NOT EXISTS post_rows_study_ts ON post_rows(handle, is_study, ts_us, url);
+CREATE TABLE IF NOT EXISTS classified (
+    cls_key  TEXT PRIMARY KEY,
+    is_study INTEGER NOT NULL,
+    major    TEXT,
+    topics   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS agg_stats (
+    handle TEXT NOT NULL, scope TEXT NOT NULL,
+    posts INTEGER NOT NULL DEFAULT 0, gap_sum INTEGER NOT NULL DEFAULT 0, gap_sq INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (handle, scope)
+);
+CREATE TABLE IF NOT EXISTS agg_days (
+    handle TEXT NOT NULL, scope TEXT NOT NULL, day INTEGER NOT NULL, n INTEGER NOT NULL,
+    PRIMARY KEY (handle, scope, day)
+);
+CREATE TABLE IF NOT EXISTS agg_runs (
+    handle TEXT NOT NULL, scope TEXT NOT NULL, start_day INTEGER NOT NULL, end_day INTEGER NOT NULL,
+    PRIMARY KEY (handle, scope, start_day)
+);
+CREATE INDEX IF NOT EXISTS agg_runs_end ON agg_runs(handle, scope, end_day);
+CREATE TABLE IF NOT EXISTS agg_gaps (
+    handle TEXT NOT NULL, scope TEXT NOT NULL, gap INTEGER NOT NULL, n INTEGER NOT NULL,
+    PRIMARY KEY (handle, scope, gap)
+);
+CREATE TABLE IF NOT EXISTS agg_months (
+    handle TEXT NOT NULL, scope TEXT NOT NULL, ym TEXT NOT NULL, n INTEGER NOT NULL,
+    PRIMARY KEY (handle, scope, ym)
+);
+CREATE TABLE IF NOT EXISTS agg_topic_months (
+    handle TEXT NOT NULL, scope TEXT NOT NULL, topic TEXT NOT NULL, ym TEXT NOT NULL, n INTEGER NOT NULL,
+    PRIMARY KEY (handle, scope, topic, ym)
+);
+CREATE TABLE IF NOT EXISTS agg_majors (
+    handle TEXT NOT NULL, scope TEXT NOT NULL, topic TEXT NOT NULL, n INTEGER NOT NULL, first_us INTEGER NOT NULL,
+    PRIMARY KEY (handle, scope, topic)
+);
+CREATE TABLE IF NOT EXISTS sync_marks (
+    handle TEXT NOT NULL, source TEXT NOT NULL, mark REAL NOT NULL,
+    PRIMARY KEY (handle, source)
+);
+"""
+
+# 집계 테이블의 키 열 (n 을 더하고 0 이 되면 행 삭제)
+_COUNTERS = {
+    "agg_days": ("day",),
+    "agg_gaps": ("gap",),
+    "agg_months": ("ym",),
+    "agg_topic_months": ("topic", "ym"),
+}
+
+
+def _sha1(parts: list) -> str:
+    return hashlib.sha1(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def post_keys(post: dict) -> Tuple[str, str]:
+    # (sig, cls_key): sig 는 분석 입력 전체, cls_key 는 분류 입력만
+    h = post.get("content_hash") or content_hash(post.get("text", ""))
+    cls = [post.get("title") or "", h, list(post.get("tags") or []), list(post.get("code_langs") or [])]
+    return _sha1(cls + [post.get("published_at") or ""]), _sha1(cls)
+
+
+def _ym(day: int) -> str:
+    return (EPOCH_DAY + timedelta(days=day)).strftime("%Y-%m")
+
+
+class IncrementalAnalytics:
+    def __init__(self, path: str = "analytics.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> "IncrementalAnalytics":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # --- 반영 ---
+
+    def apply(self, handle: str, posts: Iterable[dict]) -> Dict[str, int]:
+        # 새 글/바뀐 글만 집계에 반영 (한 트랜잭션). {"added", "changed", "unchanged", "classified"}
+        counts = {"added": 0, "changed": 0, "unchanged": 0, "classified": 0}
+        now = reference_now()
+        with self._lock, self._db:
+            for p in posts:
+                url = p.get("url")
+                if not url:
+                    continue
+                sig, cls_key = post_keys(p)
+                old = self._db.execute("SELECT * FROM post_rows WHERE url = ?", (url,)).fetchone()
+                if old is not None and old["sig"] == sig and old["handle"] == handle:
+                    counts["unchanged"] += 1
+                    continue
+                new = self._make_row(handle, url, sig, cls_key, p, old, counts, now)
+                if old is not None:
+                    self._remove_row(old)
+                    counts["changed"] += 1
+                else:
+                    counts["added"] += 1
+                self._add_row(new)
+        return counts
+
+    def _make_row(self, handle: str, url: str, sig: str, cls_key: str, p: dict, old, counts, now: datetime) -> dict:
+        if old is not None and old["cls_key"] == cls_key:
+            cls = (old["is_study"], old["major"], old["topics"])
+        else:
+            hit = self._db.execute("SELECT * FROM classified WHERE cls_key = ?", (cls_key,)).fetchone()
+            if hit is not None:
+                cls = (hit["is_study"], hit["major"], hit["topics"])
+            else:
+                is_study, major, topics = classify_post(
+                    p.get("title", ""), p.get("text", ""), p.get("tags", []), p.get("code_langs", [])
+                )
+                cls = (int(is_study), major, json.dumps(topics, ensure_ascii=False))
+                self._db.execute("INSERT OR REPLACE INTO classified VALUES (?, ?, ?, ?)", (cls_key, *cls))
+                counts["classified"] += 1
+        dt = to_utc(p.get("published_at"), now)
+        ts_us = (dt - EPOCH) // timedelta(microseconds=1) if dt else None
+        return {"url": url, "handle": handle, "sig": sig, "cls_key": cls_key, "ts_us": ts_us,
+                "is_study": int(cls[0]), "major": cls[1], "topics": cls[2]}
+
+    def _add_row(self, row: dict) -> None:
+        if row["ts_us"] is not None:
+            for scope in self._scopes(row):
+                self._link(row, scope, +1)
+        self._db.execute(
+            "INSERT OR REPLACE INTO post_rows (url, handle, sig, cls_key, ts_us, is_study, major, topics)"
+            " VALUES (:url, :handle, :sig, :cls_key, :ts_us, :is_study, :major, :topics)",
+            row,
+        )
+
+    def _remove_row(self, old: sqlite3.Row) -> None:
+        row = dict(old)
+        if row["ts_us"] is not None:
+            for scope in self._scopes(row):
+                self._link(row, scope, -1)
+        self._db.execute("DELETE FROM post_rows WHERE url = ?", (row["url"],))
+
+    @staticmethod
+    def _scopes(row: dict) -> List[str]:
+        return ["all", "study"] if row["is_study"] else ["all"]
+
+    def _link(self, row: dict, scope: str, sign: int) -> None:
+        # 글 하나를 scope 집계에 넣거나(+1) 빼기(-1). 간격은 시간순 앞/뒤 이웃과의 것만 바뀜
+        h, ts, url = row["handle"], row["ts_us"], row["url"]
+        prev, nxt = self._neighbors(h, scope, ts, url)
+        day = ts // US_PER_DAY
+        if prev is not None and nxt is not None:
+            self._gap(h, scope, nxt - prev, -sign)
+        if prev is not None:
+            self._gap(h, scope, ts - prev, sign)
+        if nxt is not None:
+            self._gap(h, scope, nxt - ts, sign)
+        self._db.execute(
+            "INSERT INTO agg_stats (handle, scope, posts) VALUES (?, ?, ?)"
+            " ON CONFLICT(handle, scope) DO UPDATE SET posts = posts + excluded.posts",
+            (h, scope, sign),
+        )
+        if self._bump("agg_days", h, scope, (day,), sign) == (1 if sign > 0 else 0):
+            (self._join_day if sign > 0 else self._split_day)(h, scope, day)
+        ym = _ym(day)
+        self._bump("agg_months", h, scope, (ym,), sign)
+        for topic in json.loads(row["topics"]) or ([row["major"]] if row["major"] else []):
+            self._bump("agg_topic_months", h, scope, (topic, ym), sign)
+        if row["major"]:
+            self._major(row, scope, sign)
+
+    def _neighbors(self, h: str, scope: str, ts: int, url: str) -> Tuple[Optional[int], Optional[int]]:
+        # (ts, url) 순서에서 바로 앞/뒤 글의 타임스탬프 (자기 자신 제외)
+        cond = "AND is_study = 1" if scope == "study" else ""
+        prev = self._db.execute(
+            f"SELECT ts_us FROM post_rows WHERE handle = ? {cond} AND ts_us IS NOT NULL AND (ts_us, url) < (?, ?)"
+            " ORDER BY ts_us DESC, url DESC LIMIT 1", (h, ts, url),
+        ).fetchone()
+        nxt = self._db.execute(
+            f"SELECT ts_us FROM post_rows WHERE handle = ? {cond} AND ts_us IS NOT NULL AND (ts_us, url) > (?, ?)"
+            " ORDER BY ts_us, url LIMIT 1", (h, ts, url),
+        ).fetchone()
+        return (prev[0] if prev else None), (nxt[0] if nxt else None)
+
+    def _gap(self, h: str, scope: str, delta_us: int, sign: int) -> None:
+        g = delta_us // US_PER_DAY
+        self._db.execute(
+            "UPDATE agg_stats SET gap_sum = gap_sum + ?, gap_sq = gap_sq + ? WHERE handle = ? AND scope = ?",
+            (sign * g, sign * g * g, h, scope),
+        )
+        self._bump("agg_gaps", h, scope, (g,), sign)
+
+    def _bump(self, table: str, h: str, scope: str, key: tuple, sign: int) -> int:
+        # 카운터 +-1, 바뀐 값 반환 (0 이 되면 행 삭제)
+        cols = _COUNTERS[table]
+        where = " AND ".join(f"{c} = ?" for c in ("handle", "scope") + cols)
+        args = (h, scope) + tuple(key)
+        self._db.execute(
+            f"INSERT INTO {table} (handle, scope, {', '.join(cols)}, n) VALUES ({', '.join('?' for _ in args)}, ?)"
+            f" ON CONFLICT ({', '.join(('handle', 'scope') + cols)}) DO UPDATE SET n = n + excluded.n",
+            args + (sign,),
+        )
+        n = self._db.execute(f"SELECT n FROM {table} WHERE {where}", args).fetchone()[0]
+        if n <= 0:
+            self._db.execute(f"DELETE FROM {table} WHERE {where}", args)
+        return n
+
+    def _join_day(self, h: str, scope: str, day: int) -> None:
+        # 새 날짜: 어제로 끝나는 구간/내일 시작하는 구간과 합침
+        left = self._db.execute(
+            "SELECT start_day FROM agg_runs WHERE handle = ? AND scope = ? AND end_day = ?", (h, scope, day - 1)
+        ).fetchone()
+        right = self._db.execute(
+            "SELECT end_day FROM agg_runs WHERE handle = ? AND scope = ? AND start_day = ?", (h, scope, day + 1)
+        ).fetchone()
+        start = left[0] if left else day
+        end = right[0] if right else day
+        self._db.execute(
+            "DELETE FROM agg_runs WHERE handle = ? AND scope = ? AND start_day IN (?, ?)", (h, scope, start, day + 1)
+        )
+        self._db.execute("INSERT INTO agg_runs VALUES (?, ?, ?, ?)", (h, scope, start, end))
+
+    def _split_day(self, h: str, scope: str, day: int) -> None:
+        # 글이 없어진 날짜: 그 날짜를 포함한 구간을 둘로 나눔
+        run = self._db.execute(
+            "SELECT start_day, end_day FROM agg_runs WHERE handle = ? AND scope = ? AND start_day <= ?"
+            " ORDER BY start_day DESC LIMIT 1", (h, scope, day),
+        ).fetchone()
+        if run is None or run[1] < day:
+            return
+        self._db.execute("DELETE FROM agg_runs WHERE handle = ? AND scope = ? AND start_day = ?", (h, scope, run[0]))
+        if run[0] < day:
+            self._db.execute("INSERT INTO agg_runs VALUES (?, ?, ?, ?)", (h, scope, run[0], day - 1))
+        if day < run[1]:
+            self._db.execute("INSERT INTO agg_runs VALUES (?, ?, ?, ?)", (h, scope, day + 1, run[1]))
+
+    def _major(self, row: dict, scope: str, sign: int) -> None:
+        # 대표 주제 횟수 + 처음 나온 시각 (횟수가 같으면 먼저 나온 주제가 앞)
+        h, topic, ts = row["handle"], row["major"], row["ts_us"]
+        if sign > 0:
+            self._db.execute(
+                "INSERT INTO agg_majors VALUES (?, ?, ?, 1, ?) ON CONFLICT (handle, scope, topic) DO UPDATE"
+                " SET n = n + 1, first_us = MIN(first_us, excluded.first_us)", (h, scope, topic, ts),
+            )
+            return
+        cur = self._db.execute(
+            "SELECT n, first_us FROM agg_majors WHERE handle = ? AND scope = ? AND topic = ?", (h, scope, topic)
+        ).fetchone()
+        if cur is None:
+            return
+        if cur[0] <= 1:
+            self._db.execute("DELETE FROM agg_majors WHERE handle = ? AND scope = ? AND topic = ?", (h, scope, topic))
+            return
+        first = cur[1]
+        if first == ts:
+            cond = "AND is_study = 1" if scope == "study" else ""
+            first = self._db.execute(
+                f"SELECT MIN(ts_us) FROM post_rows WHERE handle = ? {cond} AND major = ? AND url != ?",
+                (h, topic, row["url"]),
+            ).fetchone()[0]
+        self._db.execute(
+            "UPDATE agg_majors SET n = n - 1, first_us = ? WHERE handle = ? AND scope = ? AND topic = ?",
+            (first, h, scope, topic),
+        )
+
+    # --- 동기화 ---
+
+    def sync_store(self, store, handle: str) -> Dict[str, int]:
+        # 크롤 저장소에서 지난 동기화 이후 새로 받은/바뀐 글만 반영
+        source = f"store:{store.path}"
+        with self._lock:
+            row = self._db.execute(
+                "SELECT mark FROM sync_marks WHERE handle = ? AND source = ?", (handle, source)
+            ).fetchone()
+        posts, mark = store.changed_since(handle, row[0] if row else 0.0)
+        counts = self.apply(handle, posts)
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO sync_marks VALUES (?, ?, ?) ON CONFLICT (handle, source) DO UPDATE SET mark = excluded.mark",
+                (handle, source, mark),
+            )
+        return counts
+
+    # --- 조회 ---
+
+    def handles(self) -> List[str]:
+        with self._lock:
+            rows = self._db.execute("SELECT DISTINCT handle FROM agg_stats WHERE posts > 0 ORDER BY handle").fetchall()
+        return [r[0] for r in rows]
+
+    def summary(self, handle: str, author: Optional[dict] = None) -> Optional[Tuple[dict, dict]]:
+        # 집계만 읽어 (summary, topic_trend). 날짜 있는 글이 없으면 None
+        with self._lock:
+            return self._summary(handle, author if author is not None else {"handle": handle})
+
+    def _summary(self, h: str, author: dict) -> Optional[Tuple[dict, dict]]:
+        q = self._db.execute
+        stats = {r["scope"]: r for r in q("SELECT * FROM agg_stats WHERE handle = ?", (h,))}
+        if "all" not in stats or stats["all"]["posts"] <= 0:
+            return None
+        scope = "study" if "study" in stats and stats["study"]["posts"] > 0 else "all"
+        st = stats[scope]
+
+        n_gaps = st["posts"] - 1
+        max_gap, cv = 0, 0.0
+        if n_gaps > 0:
+            max_gap = q("SELECT MAX(gap) FROM agg_gaps WHERE handle = ? AND scope = ?", (h, scope)).fetchone()[0] or 0
+            mean = st["gap_sum"] / n_gaps
+            if mean > 0:
+                var = max(0.0, st["gap_sq"] / n_gaps - mean * mean)
+                cv = var ** 0.5 / mean
+
+        start, end = q("SELECT MIN(day), MAX(day) FROM agg_days WHERE handle = ? AND scope = ?", (h, scope)).fetchone()
+        longest = q(
+            "SELECT MAX(end_day - start_day + 1) FROM agg_runs WHERE handle = ? AND scope = ?", (h, scope)
+        ).fetchone()[0] or 0
+        last_90_posts, weeks = q(
+            "SELECT SUM(n), COUNT(DISTINCT (day + 3) / 7) FROM agg_days WHERE handle = ? AND scope = ? AND day >= ?",
+            (h, scope, end - 89),
+        ).fetchone()
+        per_month = {r[0]: r[1] for r in q(
+            "SELECT ym, n FROM agg_months WHERE handle = ? AND scope = ? ORDER BY ym", (h, scope))}
+        topic_trend: Dict[str, Dict[str, int]] = {}
+        for r in q("SELECT topic, ym, n FROM agg_topic_months WHERE handle = ? AND scope = ? ORDER BY topic, ym",
+                   (h, scope)):
+            topic_trend.setdefault(r[0], {})[r[1]] = r[2]
+        top_topics = [(r[0], r[1]) for r in q(
+            "SELECT topic, n FROM agg_majors WHERE handle = ? AND scope = ? ORDER BY n DESC, first_us LIMIT 5",
+            (h, scope))]
+
+        start_d, end_d = EPOCH_DAY + timedelta(days=start), EPOCH_DAY + timedelta(days=end)
+        summary = {
+            "author": author,
+            "active_start": str(start_d),
+            "active_end": str(end_d),
+            "active_days": (end_d - start_d).days + 1,
+            "total_posts": stats["all"]["posts"],
+            "total_study_posts": st["posts"],
+            "posts_per_month": per_month,
+            "longest_streak_days": int(longest),
+            "max_gap_days": int(max_gap),
+            "interval_cv": round(cv, 3),
+            "last_90d_posts": int(last_90_posts or 0),
+            "last_90d_weeks_active": int(weeks or 0),
+            "cadence_score": round(cadence_score(cv, max_gap, last_90_posts or 0), 1),
+            "top_topics": top_topics,
+        }
+        return summary, topic_trend
+
+
+def main():
+    import argparse
+
+    from analyze import SUMMARY_OUT, TOPIC_TREND_OUT
+
+    parser = argparse.ArgumentParser(description="Incremental Velog analytics (persisted per-author aggregates)")
+    parser.add_argument("inputs", nargs="*", help="out.json / JSONL files to apply (only new/changed posts are processed)")
+    parser.add_argument("--db", default="analytics.db", help="SQLite aggregate state path")
+    parser.add_argument("--store", default="", help="sync new/changed posts from this crawl store")
+    parser.add_argument("--handles", default="", help="comma separated handles (with --store; default: all)")
+    parser.add_argument("--out", default="", help="combined table for all synced authors (.json or .csv)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    touched: List[Tuple[str, dict]] = []
+    with IncrementalAnalytics(args.db) as state:
+        for path in args.inputs:
+            # 글 단위로 읽음. out.json 은 author 가 posts 앞에 있고, JSONL 은 첫 글 URL 에서 handle 을 얻음
+            meta: dict = {}
+            posts = load_posts(path, meta)
+            first = next(posts, None)
+            if first is None:
+                continue
+            author = meta.get("author") or {"handle": handle_of(first.get("url", ""))}
+            handle = author.get("handle") or path
+            counts = state.apply(handle, itertools.chain([first], posts))
+            print(f"[INFO] {handle}: {json.dumps(counts, ensure_ascii=False)}")
+            touched.append((handle, author))
+        if args.store:
+            from store import CrawlStore
+            with CrawlStore(args.store) as store:
+                handles = [h.strip().lstrip("@") for h in args.handles.split(",") if h.strip()] or store.handles()
+                for h in handles:
+                    counts = state.sync_store(store, h)
+                    print(f"[INFO] {h}: {json.dumps(counts, ensure_ascii=False)}")
+                    touched.append((h, {"handle": h}))
+        if not touched:
+            parser.error("입력 파일 또는 --store 가 필요합니다")
+
+        rows = []
+        for h, author in dict(touched).items():
+            out = state.summary(h, author)
+            if out is None:
+                rows.append({"handle": h, "error": "no dated posts"})
+                continue
+            summary, topic_trend = out
+            rows.append({"handle": h, **summary, "topic_trend": topic_trend})
+    print(f"[INFO] 반영 {time.perf_counter() - t0:.2f}s")
+
+    if args.out:
+        from batch_analyze import write_table
+        for r in rows:
+            r.pop("author", None)
+        rows.sort(key=lambda r: (-r.get("cadence_score", -1), r.get("handle", "")))
+        write_table(rows, args.out)
+        print(f"[DONE] 작성자 {len(rows)}명 → {args.out}")
+        return
+    # --out 이 없으면 마지막 작성자를 analyze.py 와 같은 파일로
+    last = rows[-1]
+    if last.get("error"):
+        summary, topic_trend = {"note": "no data (check published_at format)"}, {}
+    else:
+        topic_trend = last.pop("topic_trend")
+        summary = {k: v for k, v in last.items() if k != "handle"}
+    with open(SUMMARY_OUT, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    with open(TOPIC_TREND_OUT, "w", encoding="utf-8") as f:
+        json.dump(topic_trend, f, ensure_ascii=False, indent=2)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
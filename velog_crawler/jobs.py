@@ -0,0 +1,199 @@
+# 백그라운드 크롤 작업 (crawl_all_posts 위의 Job API)
+# - 작업/결과는 로컬 SQLite(jobs.db)에 저장 -> 앱 재시작 후에도 조회/이어서 수집
+# - 진행 상황: links_found / posts_done / errors
+# - 결과는 seq 순서로 쌓이므로 after=seq 로 이어서 스트리밍 가능
+import json, sqlite3, threading, time, uuid
+from typing import List, Optional
+
+from crawl_velog import crawl_all_posts
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          TEXT PRIMARY KEY,
+    handle      TEXT NOT NULL,
+    status      TEXT NOT NULL,           -- queued | running | done | failed
+    options     TEXT NOT NULL DEFAULT '{}',
+    links_found INTEGER NOT NULL DEFAULT 0,
+    posts_done  INTEGER NOT NULL DEFAULT 0,
+    errors      INTEGER NOT NULL DEFAULT 0,
+    error       TEXT,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_posts (
+    job_id  TEXT NOT NULL,
+    seq     INTEGER NOT NULL,
+    url     TEXT NOT NULL,
+    post    TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+CREATE INDEX IF NOT EXISTS job_posts_url ON job_posts(job_id, url);
+"""
+
+FINISHED = {"done", "failed"}
+
+
+class JobStore:
+    def __init__(self, path: str = "jobs.db"):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def create(self, handle: str, options: Optional[dict] = None) -> dict:
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO jobs (id, handle, status, options, created_at, updated_at) VALUES (?, ?, 'queued', ?, ?, ?)",
+                (job_id, handle, json.dumps(options or {}), now, now),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["options"] = json.loads(job["options"])
+        return job
+
+    def update(self, job_id: str, **fields) -> None:
+        fields["updated_at"] = time.time()
+        cols = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock, self._db:
+            self._db.execute(f"UPDATE jobs SET {cols} WHERE id = ?", (*fields.values(), job_id))
+
+    def bump(self, job_id: str, column: str) -> None:
+        assert column in ("posts_done", "errors")
+        with self._lock, self._db:
+            self._db.execute(
+                f"UPDATE jobs SET {column} = {column} + 1, updated_at = ? WHERE id = ?", (time.time(), job_id)
+            )
+
+    def claim_next(self) -> Optional[dict]:
+        # 가장 오래된 queued 작업을 running 으로 바꿔 가져감
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ?", (time.time(), row["id"])
+            )
+        return self.get(row["id"])
+
+    def requeue_running(self) -> int:
+        # 재시작 시: 중단된 running 작업을 다시 대기열로
+        with self._lock, self._db:
+            return self._db.execute(
+                "UPDATE jobs SET status = 'queued', updated_at = ? WHERE status = 'running'", (time.time(),)
+            ).rowcount
+
+    def add_post(self, job_id: str, post: dict) -> int:
+        with self._lock, self._db:
+            seq = self._db.execute(
+                "SELECT COALESCE(MAX(seq), 0) + 1 FROM job_posts WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+            self._db.execute(
+                "INSERT INTO job_posts (job_id, seq, url, post) VALUES (?, ?, ?, ?)",
+                (job_id, seq, post["url"], json.dumps(post, ensure_ascii=False)),
+            )
+            self._db.execute(
+                "UPDATE jobs SET posts_done = posts_done + 1, updated_at = ? WHERE id = ?", (time.time(), job_id)
+            )
+        return seq
+
+    def done_urls(self, job_id: str) -> List[str]:
+        with self._lock:
+            rows = self._db.execute("SELECT url FROM job_posts WHERE job_id = ?", (job_id,)).fetchall()
+        return [r["url"] for r in rows]
+
+    def posts_after(self, job_id: str, after: int = 0, limit: int = 100) -> List[tuple]:
+        # -> [(seq, post_json_text)]
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, post FROM job_posts WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (job_id, after, limit),
+            ).fetchall()
+        return [(r["seq"], r["post"]) for r in rows]
+
+
+class JobManager:
+    # 작업 스레드 workers 개가 대기열의 작업을 하나씩 crawl_all_posts 로 실행
+
+    def __init__(self, store: JobStore, make_backend, workers: int = 1, poll_sec: float = 1.0):
+        # make_backend() -> 작업 하나가 쓸 백엔드 (매너 딜레이 limiter 포함해서 만들어 줄 것)
+        self.store = store
+        self.make_backend = make_backend
+        self.workers = workers
+        self.poll_sec = poll_sec
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        n = self.store.requeue_running()
+        if n:
+            print(f"[INFO] 중단됐던 작업 {n}개 이어서 수집")
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, name=f"crawl-job-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: float = 30) -> None:
+        # 진행 중 작업은 현재 글까지 정리하고 running 상태로 남김 -> 다음 시작 때 이어서
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join(timeout=timeout)
+
+    def submit(self, handle: str, options: Optional[dict] = None) -> dict:
+        job = self.store.create(handle, options)
+        self._wake.set()
+        return job
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            job = self.store.claim_next()
+            if job is None:
+                self._wake.wait(self.poll_sec)
+                self._wake.clear()
+                continue
+            self._execute(job)
+
+    def _execute(self, job: dict) -> None:
+        job_id = job["id"]
+        opts = job["options"]
+        known = set(self.store.done_urls(job_id))  # 재시작 시 이미 받은 글은 건너뜀
+        backend = self.make_backend()
+        try:
+            crawl_all_posts(
+                job["handle"],
+                max_scrolls=int(opts.get("max_scrolls", 220)),
+                pause_sec=float(opts.get("pause_sec", 1.0)),
+                backend=backend,
+                concurrency=int(opts.get("concurrency", 1)),
+                known=known,
+                stop_after_known=0,
+                keep_posts=False,
+                on_links=lambda links: self.store.update(job_id, links_found=len(known) + len(links)),
+                on_post=lambda post: self.store.add_post(job_id, post),
+                on_error=lambda url, ex: self.store.bump(job_id, "errors"),
+                should_stop=self._stop.is_set,
+            )
+        except Exception as ex:
+            self.store.update(job_id, status="failed", error=str(ex)[:500])
+            return
+        finally:
+            backend.close()
+        if not self._stop.is_set():
+            self.store.update(job_id, status="done")
+
@@ -0,0 +1,341 @@
+# 스트리밍 JSONL 출력 (글 하나 끝날 때마다 한 줄 추가)
+# - 확장자로 압축 선택: .jsonl / .jsonl.gz / .jsonl.zst (zstandard 설치 시)
+# - fsync 는 N개(또는 N초)마다 묶어서 -> 크래시 나도 마지막 체크포인트까지는 남음
+# - 읽을 때는 잘린 마지막 줄/압축 꼬리는 무시
+# - 이어쓰기 전에 크래시 흔적 정리: 평문은 쓰다 만 줄을 잘라내고, 압축 파일은 읽히는 줄까지 새로 압축해 교체
+#   (끝나지 않은 gzip 멤버/zstd 프레임 뒤에 새 스트림을 붙이면 읽을 때 그 지점부터 깨짐)
+import gzip, io, json, os, time, zlib
+from typing import IO, Iterator, Optional, Set
+
+from metrics import stage
+
+
+def _open(path: str, mode: str) -> IO[bytes]:
+    if path.endswith(".gz"):
+        if "r" in mode:
+            return io.BufferedReader(_TailTolerantReader(open(path, "rb"), lambda: zlib.decompressobj(wbits=31)), 1 << 16)
+        return gzip.open(path, mode)
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("zstd 출력에는 zstandard 패키지가 필요합니다: pip install zstandard")
+        raw = open(path, mode)
+        if "a" in mode or "w" in mode:
+            return zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        return io.BufferedReader(_TailTolerantReader(raw, zstandard.ZstdDecompressor().decompressobj), 1 << 16)
+    return open(path, mode)
+
+
+class _TailTolerantReader(io.RawIOBase):
+    # 이어 붙은 gzip 멤버/zstd 프레임을 차례로 풀되, 잘리거나 깨진 곳에서는 예외 대신 그 직전까지만 돌려줌
+    # (gzip.open 은 깨진 지점을 만나면 같은 읽기 버퍼에 있던 앞쪽 줄까지 잃음)
+    # clean: 끝까지 읽었을 때 마지막 멤버/프레임까지 정상 종료였는지
+    def __init__(self, raw: IO[bytes], new_decoder):
+        self._raw = raw
+        self._new = new_decoder
+        self._dec = new_decoder()
+        self._pending = False    # 현재 멤버/프레임에 넣은 입력이 아직 끝나지 않음
+        self._member_start = 0   # 현재 멤버/프레임의 파일 위치
+        self._member_out = 0     # 현재 멤버/프레임에서 이미 내보낸 바이트 수
+        self._out = b""
+        self._pos = 0
+        self._eof = False
+        self.clean = True
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while self._pos >= len(self._out) and not self._eof:
+            chunk = self._raw.read(1 << 16)
+            if not chunk:
+                self._eof = True
+                self.clean = self.clean and not self._pending
+                break
+            self._out, self._pos = self._feed(chunk, self._raw.tell()), 0
+        n = min(len(b), len(self._out) - self._pos)
+        b[:n] = self._out[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def _feed(self, data: bytes, end: int) -> bytes:
+        # end: data 바로 뒤의 파일 위치
+        out = []
+        errors = _read_errors()
+        while data:
+            try:
+                piece = self._dec.decompress(data)
+            except errors:
+                out.append(self._salvage(end))
+                self._eof, self.clean = True, False
+                break
+            out.append(piece)
+            self._member_out += len(piece)
+            self._pending = True
+            if not self._dec.eof:
+                break
+            data = self._dec.unused_data
+            self._member_start = end - len(data)
+            self._dec, self._pending, self._member_out = self._new(), False, 0
+        return b"".join(out)
+
+    def _salvage(self, end: int) -> bytes:
+        # 깨진 멤버/프레임을 처음부터 다시 풀면서 깨진 위치를 4KB -> 1바이트 단위로 좁혀 그 직전까지 복구
+        # (예외가 난 호출의 출력은 통째로 버려지므로). 아직 내보내지 않은 부분만 돌려줌
+        errors = _read_errors()
+        self._raw.seek(self._member_start)
+        data = self._raw.read(end - self._member_start)
+        dec, good = self._new(), 0
+        for i in range(0, len(data), 4096):
+            try:
+                dec.decompress(data[i:i + 4096])
+            except errors:
+                break
+            good = i + 4096
+        dec = self._new()
+        out = [dec.decompress(data[:good])] if good else []
+        for k in range(good, min(good + 4096, len(data))):
+            try:
+                out.append(dec.decompress(data[k:k + 1]))
+            except errors:
+                break
+        return b"".join(out)[self._member_out:]
+
+    def close(self) -> None:
+        if not self.closed:
+            self._raw.close()
+        super().close()
+
+
+def _read_errors() -> tuple:
+    # 잘리거나 깨진 압축 스트림에서 날 수 있는 예외
+    errors = (EOFError, OSError, zlib.error)
+    try:
+        import zstandard
+    except ImportError:
+        return errors
+    return errors + (zstandard.ZstdError,)
+
+
+def repair_tail(path: str) -> None:
+    # 이어쓰기 전 정리 (정상 종료된 파일에는 변화 없음)
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    if not path.endswith((".gz", ".zst")):
+        with open(path, "rb+") as f:
+            end = f.seek(0, os.SEEK_END)
+            pos = end
+            while pos > 0:
+                step = min(pos, 1 << 16)
+                f.seek(pos - step)
+                i = f.read(step).rfind(b"\n")
+                if i >= 0:
+                    pos = pos - step + i + 1
+                    break
+                pos -= step
+            if pos != end:
+                f.truncate(pos)
+        return
+    # 압축 파일: 끝까지 정상인지 먼저 확인하고, 아니면 읽히는 줄까지 새 파일로 다시 압축해 교체
+    src = _open(path, "rb")
+    try:
+        tail = b"\n"
+        for tail in src:
+            pass
+        if src.raw.clean and tail.endswith(b"\n"):
+            return
+    finally:
+        src.close()
+    root, ext = os.path.splitext(path)
+    tmp = f"{root}.repair{ext}"  # 확장자로 압축 방식을 고르므로 유지
+    with _open(path, "rb") as src, _open(tmp, "wb") as dst:
+        for line in src:
+            if line.endswith(b"\n"):
+                dst.write(line)
+    os.replace(tmp, path)
+
+
+class JsonlWriter:
+    def __init__(self, path: str, fsync_every: int = 20, fsync_interval: float = 5.0):
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        repair_tail(path)
+        self._f = _open(path, "ab")
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self.written = 0
+
+    def write(self, post: dict) -> None:
+        with stage("json_write"):
+            line = json.dumps(post, ensure_ascii=False, separators=(",", ":")) + "\n"
+            self._f.write(line.encode("utf-8"))
+        self._pending += 1
+        self.written += 1
+        if self._pending >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        with stage("json_fsync"):
+            self._checkpoint()
+
+    def _checkpoint(self) -> None:
+        # 압축 스트림은 블록을 마무리(flush)한 뒤 원본 파일까지 fsync
+        if self.path.endswith(".zst"):
+            import zstandard
+            self._f.flush(zstandard.FLUSH_FRAME)
+        else:
+            self._f.flush()
+        raw = getattr(self._f, "fileobj", None) or getattr(self._f, "_fp", None) or self._f
+        try:
+            raw.flush()
+            os.fsync(raw.fileno())
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            pass
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        if self._f is None:
+            return
+        self.checkpoint()
+        self._f.close()
+        self._f = None
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_jsonl(path: str) -> Iterator[dict]:
+    if not os.path.exists(path):
+        return
+    f = _open(path, "rb")
+    try:
+        while True:
+            try:
+                line = f.readline()
+            except (EOFError, OSError, zlib.error):
+                return  # 압축 꼬리가 잘렸거나 깨진 경우: 여기까지 (압축 리더는 보통 예외 없이 끝냄)
+            if not line:
+                return
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue  # 쓰다 만 줄
+    finally:
+        f.close()
+
+
+def jsonl_urls(path: str, handle: Optional[str] = None) -> Set[str]:
+    want = f"/@{handle}/" if handle else ""
+    return {p["url"] for p in read_jsonl(path) if p.get("url") and want in p["url"]}
+
+
+def compact_to_json(jsonl_path: str, out_path: str, handle: str) -> int:
+    # JSONL -> 기존 out.json(pretty) 형태. URL 중복은 마지막 줄이 이김.
+    # 본문을 메모리에 다 올리지 않도록 2-pass(1: URL별 마지막 줄 번호, 2: 해당 줄만 기록)
+    want = f"/@{handle}/"
+    last = {}
+    for i, p in enumerate(read_jsonl(jsonl_path)):
+        if want in p.get("url", ""):
+            last[p["url"]] = i
+    keep = set(last.values())
+
+    tmp = out_path + ".tmp"
+    n = 0
+    with open(tmp, "w", encoding="utf-8") as f:
+        head = json.dumps({"source": "velog", "author": {"handle": handle}}, ensure_ascii=False, indent=2)
+        f.write(head[:-2] + ',\n  "posts": [')
+        for i, p in enumerate(read_jsonl(jsonl_path)):
+            if i not in keep:
+                continue
+            body = json.dumps(p, ensure_ascii=False, indent=2).replace("\n", "\n    ")
+            f.write(("," if n else "") + "\n    " + body)
+            n += 1
+        f.write(("\n  " if n else "") + '],\n  "schema_version": 1\n}')
+    os.replace(tmp, out_path)
+    return n
+
+
+def iter_json_posts(path: str, meta: Optional[dict] = None, chunk_size: int = 1 << 20) -> Iterator[dict]:
+    # out.json 을 통째로 json.load 하지 않고 최상위 "posts" 배열을 원소 하나씩 (메모리 = 글 1개 + 읽기 버퍼)
+    # 나머지 최상위 키(author, schema_version ...)는 읽는 대로 meta 에 채움
+    f = io.TextIOWrapper(_open(path, "rb"), encoding="utf-8")
+    dec = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def more() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf, pos = buf[pos:] + chunk, 0
+        return True
+
+    def peek() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf) or not more():
+                return buf[pos] if pos < len(buf) else ""
+
+    def expect(ch: str) -> None:
+        nonlocal pos
+        if peek() != ch:
+            raise ValueError(f"{path}: '{ch}' expected at offset {pos}")
+        pos += 1
+
+    def value():
+        nonlocal pos
+        peek()
+        while True:
+            try:
+                obj, end = dec.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if more():
+                    continue
+                raise
+            # 숫자 등은 버퍼 끝에서 잘렸을 수 있으므로 더 읽어 보고 다시
+            if end == len(buf) and more():
+                continue
+            pos = end
+            return obj
+
+    try:
+        expect("{")
+        if peek() == "}":
+            return
+        while True:
+            key = value()
+            expect(":")
+            if key == "posts" and peek() == "[":
+                pos += 1
+                if peek() == "]":
+                    pos += 1
+                else:
+                    while True:
+                        yield value()
+                        if peek() == ",":
+                            pos += 1
+                            continue
+                        expect("]")
+                        break
+            else:
+                v = value()
+                if meta is not None:
+                    meta[key] = v
+            if peek() == ",":
+                pos += 1
+                continue
+            expect("}")
+            return
+    finally:
+        f.close()
@@ -0,0 +1,174 @@
+# 단계별 소요 시간 계측
+# - stage("goto") 로 감싸거나 observe("goto", 초) 로 기록 -> 히스토그램(velog_stage_seconds{stage=...})에 누적
+# - 구조화 로그: logger "velog.stages" 로 단계마다 JSON 한 줄 (핸들러를 붙인 경우에만 출력)
+# - Prometheus 텍스트 포맷 출력(render_prometheus), 실행별 프로파일 표(profile_report)
+# - 외부 의존성 없음 (prometheus_client 를 쓰지 않고 포맷만 맞춤)
+import bisect, json, logging, threading, time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+log = logging.getLogger("velog.stages")
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막 칸 = +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        # 버킷 경계 사이 선형 보간 근사 (Prometheus histogram_quantile 과 같은 방식)
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if seen + c >= rank and c:
+                lo = self.buckets[i - 1] if i > 0 else 0.0
+                hi = min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+                return min(self.max, lo + (hi - lo) * (rank - seen) / c)
+            seen += c
+        return self.max
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._gauges: Dict[str, Tuple[str, Callable[[], Dict[str, float]]]] = {}
+
+    def observe(self, stage_name: str, seconds: float) -> None:
+        with self._lock:
+            h = self._stages.get(stage_name)
+            if h is None:
+                h = self._stages[stage_name] = Histogram()
+            h.observe(seconds)
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def register_gauges(self, prefix: str, help_text: str, fn: Callable[[], Dict[str, float]]) -> None:
+        # fn() -> {"이름": 숫자} 를 /metrics 수집 시점에 읽어 {prefix}_{이름} 게이지로 노출
+        with self._lock:
+            self._gauges[prefix] = (help_text, fn)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict[str, Histogram]:
+        with self._lock:
+            return {k: _copy_hist(v) for k, v in self._stages.items()}
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        stages = self.snapshot()
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+        if stages:
+            lines += ["# HELP velog_stage_seconds Time spent per crawl stage", "# TYPE velog_stage_seconds histogram"]
+            for name, h in sorted(stages.items()):
+                acc = 0
+                for le, c in zip(list(h.buckets) + ["+Inf"], h.counts):
+                    acc += c
+                    lines.append(f'velog_stage_seconds_bucket{{stage="{name}",le="{le}"}} {acc}')
+                lines.append(f'velog_stage_seconds_sum{{stage="{name}"}} {h.sum:.6f}')
+                lines.append(f'velog_stage_seconds_count{{stage="{name}"}} {h.count}')
+        seen = set()
+        for (name, labels), v in sorted(counters.items()):
+            if name not in seen:
+                lines.append(f"# TYPE {name} counter")
+                seen.add(name)
+            lab = ",".join(f'{k}="{val}"' for k, val in labels)
+            lines.append(f"{name}{{{lab}}} {v:g}" if lab else f"{name} {v:g}")
+        for prefix, (help_text, fn) in sorted(gauges.items()):
+            try:
+                values = fn() or {}
+            except Exception:
+                continue
+            for k, v in sorted(values.items()):
+                if isinstance(v, bool) or not isinstance(v, (int, float)):
+                    continue
+                lines.append(f"# HELP {prefix}_{k} {help_text}")
+                lines.append(f"# TYPE {prefix}_{k} gauge")
+                lines.append(f"{prefix}_{k} {v:g}")
+        return "\n".join(lines) + "\n"
+
+
+def _copy_hist(h: Histogram) -> Histogram:
+    c = Histogram(h.buckets)
+    c.counts, c.count, c.sum, c.max = list(h.counts), h.count, h.sum, h.max
+    return c
+
+
+REGISTRY = Registry()
+
+
+def observe(stage_name: str, seconds: float, **fields) -> None:
+    REGISTRY.observe(stage_name, seconds)
+    if log.isEnabledFor(logging.INFO):
+        log.info(json.dumps({"stage": stage_name, "ms": round(seconds * 1000, 3), "ts": round(time.time(), 3), **fields},
+                            ensure_ascii=False, default=str))
+
+
+@contextmanager
+def stage(stage_name: str, **fields) -> Iterator[None]:
+    # 예외가 나도 걸린 시간은 기록 (실패한 goto 도 시간은 썼으므로)
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage_name, time.perf_counter() - t0, **fields)
+
+
+def enable_stage_log(path: Optional[str] = None) -> None:
+    # 단계별 JSON 로그를 파일(없으면 stderr)로
+    handler = logging.FileHandler(path, encoding="utf-8") if path else logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(handler)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+
+
+def profile_report(registry: Registry = REGISTRY, wall_seconds: Optional[float] = None) -> str:
+    # 실행 전체에서 시간이 어디에 쓰였는지: 단계별 횟수/합계/평균/p50/p95/최대, 합계 순
+    # 단계는 겹침(post_render 안에 goto/networkidle/extract). wall 은 실행 시간 대비 비율(동시 실행이면 100% 초과 가능)
+    stages = registry.snapshot()
+    if not stages:
+        return "(계측된 단계 없음)"
+    rows = [f"{'stage':<20}{'count':>8}{'total(s)':>10}{'wall':>8}{'mean(ms)':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'max(ms)':>10}"]
+    for name, h in sorted(stages.items(), key=lambda kv: -kv[1].sum):
+        share = f"{h.sum / wall_seconds:.0%}" if wall_seconds else "-"
+        rows.append(
+            f"{name:<20}{h.count:>8}{h.sum:>10.2f}{share:>8}{h.sum / h.count * 1000:>10.1f}"
+            f"{h.quantile(0.5) * 1000:>10.1f}{h.quantile(0.95) * 1000:>10.1f}{h.max * 1000:>10.1f}"
+        )
+    return "\n".join(rows)
+
+
+def profile_dict(registry: Registry = REGISTRY) -> Dict[str, Dict[str, float]]:
+    return {
+        name: {
+            "count": h.count,
+            "total_s": round(h.sum, 4),
+            "p50_ms": round(h.quantile(0.5) * 1000, 2),
+            "p95_ms": round(h.quantile(0.95) * 1000, 2),
+            "max_ms": round(h.max * 1000, 2),
+        }
+        for name, h in sorted(registry.snapshot().items())
+    }
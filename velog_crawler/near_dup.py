@@ -0,0 +1,292 @@
+# 유사 중복 글 탐지 (MinHash + LSH 밴딩, SQLite 에 색인 유지)
+# - 본문: store.normalize_text 로 정규화 + 소문자 -> 글자 k-gram(기본 5) 해시 집합
+# - MinHash: 해시 집합마다 num_perm 개의 (a*x + b) >> 32 (multiply-shift, 나눗셈 없음) 최솟값 = 서명. 두 서명이 같은 칸의 비율 ≈ 자카드 유사도
+# - LSH: 서명을 bands 개 구간으로 잘라 구간별 키로 버킷에 넣음. 같은 버킷을 하나라도 공유하는 글만 후보
+#   -> 글 하나 추가는 버킷 조회 bands 번 + 후보 몇 개 비교 (전체 쌍 비교 없이 글 수에 거의 선형)
+# - 후보는 서명 유사도가 threshold 이상일 때만 같은 묶음(cluster). 묶음 id = 묶음에서 가장 먼저 색인된 글 URL
+# - 색인은 파일(near_dup.db)에 남으므로 새 크롤은 새 글/바뀐 글만 서명을 만들어 기존 글과 비교
+import hashlib, json, sqlite3, threading, time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from store import content_hash, handle_of, normalize_text
+
+try:
+    import numpy as np
+except ImportError:  # 선택 의존성
+    np = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS params (
+    name  TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS signatures (
+    url          TEXT PRIMARY KEY,
+    handle       TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    sig          BLOB,                 -- uint64 x num_perm, 본문이 너무 짧으면 NULL (비교 제외)
+    cluster      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS signatures_cluster ON signatures(cluster);
+CREATE INDEX IF NOT EXISTS signatures_handle ON signatures(handle);
+CREATE TABLE IF NOT EXISTS bands (
+    band INTEGER NOT NULL,
+    key  INTEGER NOT NULL,
+    url  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bands_key ON bands(band, key);
+CREATE INDEX IF NOT EXISTS bands_url ON bands(url);
+"""
+
+# 색인을 처음 만들 때의 기본값. 이후에는 파일에 저장된 값을 씀 (서명/버킷이 이 값에 묶여 있음)
+# bands=16, rows=8 -> 유사도 약 0.7 부터 후보가 되고, 0.8 이상이면 거의 놓치지 않음
+DEFAULT_PARAMS = {"num_perm": 128, "bands": 16, "shingle": 5, "threshold": 0.8, "seed": 1}
+
+_BASE = 1_000_003
+_CHUNK = 2048  # MinHash 계산 시 한 번에 올리는 shingle 수 (긴 본문도 메모리 일정)
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("유사 중복 탐지에는 numpy 패키지가 필요합니다: pip install numpy")
+
+
+def shingle_hashes(text: str, k: int):
+    # 정규화 본문의 글자 k-gram -> 32비트 해시(중복 제거). 프로세스와 무관하게 같은 값 (색인 저장용)
+    s = normalize_text(text).lower()
+    if len(s) < k:
+        return np.empty(0, dtype=np.uint64)
+    cp = np.frombuffer(s.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    n = cp.size - k + 1
+    h = np.zeros(n, dtype=np.uint64)
+    for j in range(k):
+        h = h * np.uint64(_BASE) + cp[j:j + n]  # 64비트에서 넘치는 건 그대로 버림
+    # splitmix64 마무리로 비트를 섞고 상위 32비트만
+    h ^= h >> np.uint64(30)
+    h *= np.uint64(0xBF58476D1CE4E5B9)
+    h ^= h >> np.uint64(27)
+    h *= np.uint64(0x94D049BB133111EB)
+    h ^= h >> np.uint64(31)
+    return np.unique(h >> np.uint64(32))
+
+
+class MinHasher:
+    def __init__(self, num_perm: int, seed: int):
+        rng = np.random.default_rng(seed)
+        # 홀수 a, 64비트 곱셈은 넘치는 대로 두고 상위 32비트를 씀 (mod p 보다 훨씬 빠름)
+        self.a = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+
+    def signature(self, hashes):
+        sig = np.full(self.a.size, 1 << 32, dtype=np.uint64)
+        for i in range(0, hashes.size, _CHUNK):
+            x = hashes[i:i + _CHUNK, None]
+            np.minimum(sig, ((x * self.a + self.b) >> np.uint64(32)).min(axis=0), out=sig)
+        return sig
+
+
+def band_keys(sig, bands: int) -> List[int]:
+    # 서명 구간마다 8바이트 키 (SQLite INTEGER 에 들어가도록 부호 있는 정수)
+    rows = sig.size // bands
+    raw = sig.tobytes()
+    width = rows * sig.itemsize
+    return [
+        int.from_bytes(hashlib.blake2b(raw[i * width:(i + 1) * width], digest_size=8).digest(), "little", signed=True)
+        for i in range(bands)
+    ]
+
+
+def similarity(a, b) -> float:
+    return float(np.count_nonzero(a == b)) / a.size
+
+
+class NearDupIndex:
+    def __init__(self, path: str = "near_dup.db", **params):
+        _require_numpy()
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        with self._db:
+            stored = {r["name"]: r["value"] for r in self._db.execute("SELECT name, value FROM params")}
+            if not stored:
+                stored = {**DEFAULT_PARAMS, **{k: v for k, v in params.items() if v is not None}}
+                self._db.executemany("INSERT INTO params (name, value) VALUES (?, ?)", stored.items())
+        self.num_perm = int(stored["num_perm"])
+        self.bands = int(stored["bands"])
+        self.shingle = int(stored["shingle"])
+        self.threshold = float(stored["threshold"])
+        if self.num_perm % self.bands:
+            raise ValueError(f"num_perm({self.num_perm}) 는 bands({self.bands}) 의 배수여야 합니다")
+        self._hasher = MinHasher(self.num_perm, int(stored["seed"]))
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> "NearDupIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def signature(self, text: str):
+        hashes = shingle_hashes(text, self.shingle)
+        return self._hasher.signature(hashes) if hashes.size else None
+
+    def add(self, post: dict) -> Optional[str]:
+        # 글 하나 색인 -> 속한 묶음 id (자기 URL 이면 중복 아님). 본문 해시가 같으면 다시 계산하지 않음
+        url = post.get("url")
+        if not url:
+            return None
+        text = post.get("text") or ""
+        h = post.get("content_hash") or content_hash(text)
+        row = self._indexed(url)
+        if row and row["content_hash"] == h:
+            return row["cluster"]
+
+        sig = self.signature(text)  # 잠금 밖에서 (CPU 작업)
+        keys = band_keys(sig, self.bands) if sig is not None else []
+        with self._lock, self._db:
+            # 확인과 쓰기를 한 트랜잭션으로: 서명을 만드는 사이 같은 글을 다른 스레드/프로세스가 넣었을 수 있음
+            self._db.execute("BEGIN IMMEDIATE")
+            row = self._db.execute("SELECT content_hash, cluster FROM signatures WHERE url = ?", (url,)).fetchone()
+            if row and row["content_hash"] == h:
+                return row["cluster"]
+            if row:
+                self._detach(url)
+            matched = set()
+            for band, key in enumerate(keys):
+                for r in self._db.execute(
+                    "SELECT s.url, s.sig, s.cluster FROM bands b JOIN signatures s ON s.url = b.url"
+                    " WHERE b.band = ? AND b.key = ? AND b.url != ?", (band, key, url)
+                ):
+                    if r["cluster"] not in matched and similarity(sig, np.frombuffer(r["sig"], dtype=np.uint64)) >= self.threshold:
+                        matched.add(r["cluster"])
+            cluster = url
+            if matched:
+                # 가장 먼저 색인된 대표 글의 묶음으로 합침 (새 글이 두 묶음을 잇는 경우 포함)
+                marks = ",".join("?" for _ in matched)
+                ordered = [r["url"] for r in self._db.execute(
+                    f"SELECT url FROM signatures WHERE url IN ({marks}) ORDER BY rowid", list(matched)
+                )]
+                cluster = ordered[0] if ordered else sorted(matched)[0]
+                others = [c for c in matched if c != cluster]
+                if others:
+                    self._db.execute(
+                        f"UPDATE signatures SET cluster = ? WHERE cluster IN ({','.join('?' for _ in others)})",
+                        [cluster] + others,
+                    )
+            self._db.execute(
+                "INSERT INTO signatures (url, handle, content_hash, sig, cluster) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT(url) DO UPDATE SET handle = excluded.handle, content_hash = excluded.content_hash,"
+                " sig = excluded.sig, cluster = excluded.cluster",
+                (url, handle_of(url), h, sig.tobytes() if sig is not None else None, cluster),
+            )
+            self._db.executemany(
+                "INSERT INTO bands (band, key, url) VALUES (?, ?, ?)",
+                [(band, key, url) for band, key in enumerate(keys)],
+            )
+        return cluster
+
+    def _indexed(self, url: str) -> Optional[sqlite3.Row]:
+        with self._lock:
+            return self._db.execute("SELECT content_hash, cluster FROM signatures WHERE url = ?", (url,)).fetchone()
+
+    def _detach(self, url: str) -> None:
+        # 본문이 바뀐 글을 색인에서 빼고 다시 넣기 전 정리 (잠금 안에서 호출)
+        # 대표 글이었다면 남은 글 중 가장 먼저 색인된 글이 대표를 이어받음. 남은 글끼리는 묶음 유지
+        self._db.execute("DELETE FROM bands WHERE url = ?", (url,))
+        nxt = self._db.execute(
+            "SELECT url FROM signatures WHERE cluster = ? AND url != ? ORDER BY rowid LIMIT 1", (url, url)
+        ).fetchone()
+        if nxt:
+            self._db.execute("UPDATE signatures SET cluster = ? WHERE cluster = ? AND url != ?", (nxt["url"], url, url))
+
+    def tap(self, posts: Iterable[dict]) -> Iterator[dict]:
+        # 글 스트림을 그대로 흘려보내면서 색인 (analyze 의 build_rows 앞에 끼워 씀)
+        for p in posts:
+            self.add(p)
+            yield p
+
+    def clusters(self, urls: Iterable[str]) -> Dict[str, str]:
+        # url -> 묶음 id (색인에 없는 URL 은 빠짐)
+        urls = list(urls)
+        out: Dict[str, str] = {}
+        with self._lock:
+            for i in range(0, len(urls), 500):
+                part = urls[i:i + 500]
+                for r in self._db.execute(
+                    f"SELECT url, cluster FROM signatures WHERE url IN ({','.join('?' for _ in part)})", part
+                ):
+                    out[r["url"]] = r["cluster"]
+        return out
+
+    def duplicate_groups(self, handle: Optional[str] = None) -> List[List[str]]:
+        # 글이 2개 이상인 묶음들 (대표 글이 맨 앞, 나머지는 색인 순서)
+        # handle 을 주면 그 작성자의 글이 하나라도 든 묶음 (다른 작성자 글과 겹친 것 포함)
+        having, args = (" AND SUM(handle = ?) > 0", [handle]) if handle else ("", [])
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, cluster FROM signatures WHERE cluster IN"
+                f" (SELECT cluster FROM signatures GROUP BY cluster HAVING COUNT(*) > 1{having})"
+                " ORDER BY cluster, url != cluster, rowid", args
+            ).fetchall()
+        groups: Dict[str, List[str]] = {}
+        for r in rows:
+            groups.setdefault(r["cluster"], []).append(r["url"])
+        return list(groups.values())
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+
+def main():
+    import argparse
+
+    from analyze import load_posts
+
+    parser = argparse.ArgumentParser(description="Near-duplicate Velog post detection (MinHash/LSH)")
+    parser.add_argument("inputs", nargs="*", help="out.json / JSONL files to index")
+    parser.add_argument("--db", default="near_dup.db", help="persisted MinHash/LSH index")
+    parser.add_argument("--store", default="", help="index posts from this SQLite crawl store")
+    parser.add_argument("--handles", default="", help="comma separated handles (with --store; default: all)")
+    parser.add_argument("--threshold", type=float, default=None, help="similarity to count as duplicate (new index only)")
+    parser.add_argument("--num-perm", type=int, default=None, help="MinHash size (new index only)")
+    parser.add_argument("--bands", type=int, default=None, help="LSH bands (new index only)")
+    parser.add_argument("--shingle", type=int, default=None, help="character shingle length (new index only)")
+    parser.add_argument("--report", default="", help="write duplicate groups here (JSON)")
+    args = parser.parse_args()
+
+    handles = [h.strip().lstrip("@") for h in args.handles.split(",") if h.strip()]
+    t0 = time.perf_counter()
+    n = 0
+    with NearDupIndex(args.db, threshold=args.threshold, num_perm=args.num_perm,
+                      bands=args.bands, shingle=args.shingle) as index:
+        for path in args.inputs:
+            for _ in index.tap(load_posts(path, {})):
+                n += 1
+        if args.store:
+            from store import CrawlStore
+            with CrawlStore(args.store) as store:
+                for h in handles or store.handles():
+                    for _ in index.tap(store.iter_posts(h)):
+                        n += 1
+        groups = index.duplicate_groups(handles[0] if len(handles) == 1 else None)
+        total = index.count()
+    print(f"[DONE] 글 {n}개 확인, 색인 {total}개 ({time.perf_counter() - t0:.2f}s)"
+          f" / 중복 묶음 {len(groups)}개, 중복 글 {sum(len(g) - 1 for g in groups)}개")
+    for g in groups[:10]:
+        print(f"  {g[0]} <- {', '.join(g[1:])}")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"groups": groups}, f, ensure_ascii=False, indent=2)
+        print(f"[INFO] 묶음 목록 → {args.report}")
+
+
+if __name__ == "__main__":
+    main()
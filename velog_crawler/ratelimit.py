@@ -0,0 +1,120 @@
+# 호스트별 토큰 버킷 (고정 sleep 대신 매너 딜레이)
+import threading, time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    # rate: 초당 보충 토큰 수, burst: 버킷 최대 용량
+    # 여러 스레드가 동시에 acquire() 해도 전체 속도는 rate 를 넘지 않는다.
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        # 토큰을 얻으면 0, 아니면 기다려야 할 초를 돌려준다
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    # host 마다 버킷 1개. 같은 limiter 를 공유하는 모든 워커가 같은 한도를 나눠 쓴다.
+
+    def __init__(self, rate: float = 1.0, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc or url
+        with self._lock:
+            b = self._buckets.get(host)
+            if b is None:
+                b = self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return b
+
+    def acquire(self, url: str) -> None:
+        self.bucket(url).acquire()
+
+
+_default_limiter: Optional[HostRateLimiter] = None
+_default_lock = threading.Lock()
+
+
+def get_host_limiter() -> HostRateLimiter:
+    global _default_limiter
+    with _default_lock:
+        if _default_limiter is None:
+            _default_limiter = HostRateLimiter()
+        return _default_limiter
+
+
+class SharedHostLimiter:
+    # 여러 프로세스가 같은 SQLite 파일로 host 별 한도를 나눠 쓰는 버전 (HostRateLimiter 와 같은 acquire(url))
+    # GCRA: host 마다 다음 허용 시각(tat)만 저장 -> 자리를 먼저 예약하고 그 시각까지 sleep
+    # 프로세스 간 공유라 monotonic 대신 벽시계(time.time) 기준
+
+    def __init__(self, path: str, rate: float = 1.0, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        import sqlite3
+        self.path = path
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS host_limits (host TEXT PRIMARY KEY, tat REAL NOT NULL)")
+
+    def reserve(self, url: str) -> float:
+        # 예약한 자리까지 기다려야 할 초
+        host = urlsplit(url).netloc or url
+        interval = 1.0 / self.rate
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._db.execute("SELECT tat FROM host_limits WHERE host = ?", (host,)).fetchone()
+                tat = max(row[0] if row else now, now) + interval
+                self._db.execute(
+                    "INSERT INTO host_limits (host, tat) VALUES (?, ?)"
+                    " ON CONFLICT(host) DO UPDATE SET tat = excluded.tat",
+                    (host, tat),
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return max(0.0, tat - self.burst * interval - now)
+
+    def acquire(self, url: str) -> None:
+        wait = self.reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,82 @@
+# API 용 렌더 대기열: 동시 렌더 수 제한 + 대기열 상한(가득 차면 바로 거절) + 요청별 deadline
+import asyncio, time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Union
+
+
+class QueueFull(Exception):
+    pass
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class RenderQueue:
+    # max_active: 동시에 실행되는 렌더 수, max_waiting: 자리 기다리는 요청 수 상한
+
+    def __init__(self, max_active: int = 4, max_waiting: int = 16):
+        self.max_active = max_active
+        self.max_waiting = max_waiting
+        self._sem = asyncio.Semaphore(max_active)
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.completed = 0
+
+    async def run(
+        self,
+        start: Callable[[float], Union[Future, Awaitable[Any]]],
+        timeout: float,
+    ) -> Any:
+        # start(deadline) 는 concurrent Future 나 awaitable 을 돌려줌.
+        # deadline 은 time.monotonic 기준 -> 백엔드가 남은 시간만큼만 기다리게 전달
+        if self.waiting >= self.max_waiting and self._sem.locked():
+            self.rejected += 1
+            raise QueueFull()
+
+        deadline = time.monotonic() + timeout
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._sem.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise DeadlineExceeded()
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        try:
+            job = start(deadline)
+            if isinstance(job, Future):
+                job = asyncio.wrap_future(job)
+            left = deadline - time.monotonic()
+            try:
+                # 시간 초과 시 wait_for 가 job 을 취소 -> 아직 시작 안 한 렌더는 풀에서 버려짐
+                result = await asyncio.wait_for(job, max(0.001, left))
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise DeadlineExceeded()
+            except Exception:
+                # 백엔드가 deadline 때문에 먼저 포기한 경우(FetchError/PostTimeout 등)도 시간 초과로
+                if time.monotonic() >= deadline:
+                    self.timeouts += 1
+                    raise DeadlineExceeded()
+                raise
+            self.completed += 1
+            return result
+        finally:
+            self.active -= 1
+            self._sem.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_active": self.max_active,
+            "max_waiting": self.max_waiting,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "completed": self.completed,
+        }
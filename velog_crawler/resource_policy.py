@@ -0,0 +1,137 @@
+# Playwright 요청 차단 정책 (브라우저 풀의 모든 context 가 같은 route 핸들러 1개를 씀)
+# - 리소스 타입(image/font/media ...), URL 패턴(분석/광고 스크립트), 도메인 허용 목록으로 판단
+# - 허용/차단 요청 수와 받은 바이트(Content-Length 기준)를 규칙/타입별로 집계
+#   -> 규칙을 바꿔 가며 대역폭/렌더 시간이 얼마나 줄었는지, 추출이 깨지지 않는지 비교
+import re, threading
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_BLOCK_TYPES = ("image", "font", "media")
+# 분석/광고/추적 (본문 추출과 무관)
+DEFAULT_BLOCK_PATTERNS = (
+    r"google-analytics\.com",
+    r"googletagmanager\.com",
+    r"googlesyndication\.com",
+    r"doubleclick\.net",
+    r"adservice\.google\.",
+    r"facebook\.(?:com|net)/(?:tr|signals)",
+    r"hotjar\.com",
+    r"clarity\.ms",
+    r"sentry\.io",
+)
+# velog 페이지/API/정적 파일 도메인 (하위 도메인 포함)
+DEFAULT_ALLOW_DOMAINS = ("velog.io", "velcdn.com")
+
+
+class ResourcePolicy:
+    # 판단 순서: document 는 항상 허용 -> 허용 도메인 밖(domain) -> 타입(type) -> URL 패턴(pattern)
+
+    def __init__(
+        self,
+        block_types: Iterable[str] = DEFAULT_BLOCK_TYPES,
+        block_patterns: Iterable[str] = DEFAULT_BLOCK_PATTERNS,
+        allow_domains: Optional[Iterable[str]] = DEFAULT_ALLOW_DOMAINS,
+    ):
+        self.block_types = frozenset(block_types)
+        self.block_patterns = tuple(block_patterns)
+        self._pattern_re = re.compile("|".join(f"(?:{p})" for p in self.block_patterns)) if self.block_patterns else None
+        self.allow_domains = tuple(d.lower().lstrip(".") for d in allow_domains) if allow_domains else ()
+        self.stats = RouteStats()
+
+    def decide(self, url: str, resource_type: str) -> Optional[str]:
+        # 차단 규칙 이름, 허용이면 None
+        if resource_type == "document":
+            return None
+        if self.allow_domains:
+            host = (urlsplit(url).hostname or "").lower()
+            if host and not any(host == d or host.endswith("." + d) for d in self.allow_domains):
+                return "domain"
+        if resource_type in self.block_types:
+            return "type"
+        if self._pattern_re is not None and self._pattern_re.search(url):
+            return "pattern"
+        return None
+
+    # context.route("**/*", policy.handle_route)
+    def handle_route(self, route) -> None:
+        req = route.request
+        rtype = req.resource_type
+        rule = self.decide(req.url, rtype)
+        if rule is None:
+            self.stats.allowed(rtype)
+            route.continue_()
+        else:
+            self.stats.blocked(rule, rtype)
+            route.abort()
+
+    # context.on("response", policy.on_response): 허용된 요청이 받은 바이트
+    def on_response(self, response) -> None:
+        try:
+            size = int(response.headers.get("content-length") or 0)
+            rtype = response.request.resource_type
+        except Exception:
+            return
+        self.stats.received(rtype, size)
+
+    def describe(self) -> Dict[str, object]:
+        return {
+            "block_types": sorted(self.block_types),
+            "block_patterns": list(self.block_patterns),
+            "allow_domains": list(self.allow_domains),
+        }
+
+
+class RouteStats:
+    # 브라우저 풀 전체 누적. 크롤 한 번의 값은 snapshot() 두 개의 차이(diff)로
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.allowed_by_type: Counter = Counter()
+        self.blocked_by_rule: Counter = Counter()
+        self.blocked_by_type: Counter = Counter()
+        self.bytes_by_type: Counter = Counter()
+
+    def allowed(self, rtype: str) -> None:
+        with self._lock:
+            self.allowed_by_type[rtype] += 1
+
+    def blocked(self, rule: str, rtype: str) -> None:
+        with self._lock:
+            self.blocked_by_rule[rule] += 1
+            self.blocked_by_type[rtype] += 1
+
+    def received(self, rtype: str, size: int) -> None:
+        with self._lock:
+            self.bytes_by_type[rtype] += size
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "requests_allowed": sum(self.allowed_by_type.values()),
+                "requests_blocked": sum(self.blocked_by_rule.values()),
+                "bytes_allowed": sum(self.bytes_by_type.values()),
+                "allowed_by_type": dict(self.allowed_by_type),
+                "blocked_by_rule": dict(self.blocked_by_rule),
+                "blocked_by_type": dict(self.blocked_by_type),
+                "bytes_by_type": dict(self.bytes_by_type),
+            }
+
+
+def diff_stats(after: Dict[str, object], before: Dict[str, object]) -> Dict[str, object]:
+    out: Dict[str, object] = {}
+    for k, v in after.items():
+        if isinstance(v, dict):
+            b = before.get(k) or {}
+            out[k] = {kk: vv - b.get(kk, 0) for kk, vv in v.items() if vv - b.get(kk, 0)}
+        else:
+            out[k] = v - before.get(k, 0)
+    return out
+
+
+def parse_policy_args(block_types: str, block_urls: Tuple[str, ...], allow_domains: str) -> ResourcePolicy:
+    # CLI 값 -> 정책. block_urls 는 기본 패턴에 더해짐, 빈 문자열은 해당 규칙 끔
+    return ResourcePolicy(
+        block_types=[t.strip() for t in block_types.split(",") if t.strip()],
+        block_patterns=DEFAULT_BLOCK_PATTERNS + tuple(block_urls),
+        allow_domains=[d.strip() for d in allow_domains.split(",") if d.strip()],
+    )
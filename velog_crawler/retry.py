@@ -0,0 +1,157 @@
+# 글 렌더 실패 처리: 오류 분류 -> 재시도 정책(지터 백오프) -> 서킷 브레이커
+# - timeout: 글별 deadline 초과 (워치독/Playwright/requests 타임아웃)
+# - throttle: 429/503 등 velog 가 속도 제한 중
+# - parse: 페이지는 받았는데 제목/본문을 못 뽑음 (구조 변경 등, 재시도해도 대개 같음)
+# - gone: 404/410 (삭제/비공개 글). 재시도/브라우저 폴백 해도 같음
+# - error: 그 밖의 네트워크/브라우저 오류
+import random, threading, time
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Callable, Dict, Optional
+
+
+class PostTimeout(Exception):
+    pass
+
+
+class ParseError(Exception):
+    pass
+
+
+class HttpStatusError(Exception):
+    # 브라우저 경로에서 받은 오류 응답 (requests HTTPError 와 같은 기준으로 분류되도록 status_code 보관)
+    def __init__(self, status_code: int, url: str):
+        super().__init__(f"HTTP {status_code}: {url}")
+        self.status_code = status_code
+
+
+THROTTLE_STATUS = {429, 503}
+GONE_STATUS = {404, 410}
+
+
+def classify_error(ex: BaseException) -> str:
+    if isinstance(ex, ParseError):
+        return "parse"
+    if isinstance(ex, (PostTimeout, FutureTimeout, TimeoutError)):
+        return "timeout"
+    name = type(ex).__name__
+    # playwright/requests 는 선택 의존성이라 이름으로 판별
+    if name in ("TimeoutError", "Timeout", "ReadTimeout", "ConnectTimeout"):
+        return "timeout"
+    status = getattr(ex, "status_code", None) or getattr(getattr(ex, "response", None), "status_code", None)
+    if status in THROTTLE_STATUS:
+        return "throttle"
+    if status in GONE_STATUS:
+        return "gone"
+    if "deadline exceeded" in str(ex):
+        return "timeout"
+    return "error"
+
+
+class RetryPolicy:
+    # 종류별 최대 재시도 횟수 + full-jitter 지수 백오프 (delay = U(0, min(cap, base * 2^n)))
+    # throttle 은 더 길게 쉬도록 base 를 배로
+
+    DEFAULT_RETRIES = {"timeout": 2, "throttle": 3, "error": 2, "parse": 1, "gone": 0}
+
+    def __init__(
+        self,
+        retries: Optional[Dict[str, int]] = None,
+        base: float = 1.0,
+        cap: float = 30.0,
+    ):
+        self.retries = dict(self.DEFAULT_RETRIES)
+        self.retries.update(retries or {})
+        self.base = base
+        self.cap = cap
+
+    def should_retry(self, kind: str, attempt: int) -> bool:
+        # attempt: 지금까지 실패한 횟수 (1부터)
+        return attempt <= self.retries.get(kind, 0)
+
+    def delay(self, kind: str, attempt: int) -> float:
+        base = self.base * (2 if kind == "throttle" else 1)
+        return random.uniform(0, min(self.cap, base * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    # 최근 window 개 결과 중 실패(timeout/throttle/error)가 threshold 비율을 넘거나
+    # throttle 이 연속 throttle_run 번이면 open -> cooldown 동안 새 요청 중단.
+    # cooldown 뒤 half-open: 한 번에 1건만 보내 보고 성공하면 closed, 실패하면 cooldown 을 2배로 다시 open.
+    # parse/gone 실패는 사이트 상태와 무관하므로 세지 않음
+
+    def __init__(
+        self,
+        window: int = 20,
+        threshold: float = 0.5,
+        min_calls: int = 5,
+        throttle_run: int = 3,
+        cooldown: float = 30.0,
+        max_cooldown: float = 600.0,
+    ):
+        self.window = window
+        self.threshold = threshold
+        self.min_calls = min_calls
+        self.throttle_run = throttle_run
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.opened_until = 0.0
+        self.opens = 0
+        self._results = []  # True = 실패
+        self._throttles = 0
+        self._lock = threading.Lock()
+
+    def record(self, kind: Optional[str]) -> None:
+        # kind None = 성공
+        if kind in ("parse", "gone"):
+            return
+        failed = kind is not None
+        with self._lock:
+            if self.state == "half-open":
+                if failed:
+                    self._open(min(self.max_cooldown, self.cooldown * 2))
+                else:
+                    self.state = "closed"
+                    self.cooldown = self.base_cooldown
+                    self._results.clear()
+                return
+            self._results.append(failed)
+            del self._results[:-self.window]
+            self._throttles = self._throttles + 1 if kind == "throttle" else 0
+            n = len(self._results)
+            if self._throttles >= self.throttle_run or (
+                n >= self.min_calls and sum(self._results) / n >= self.threshold
+            ):
+                self._open(self.cooldown)
+
+    def _open(self, cooldown: float) -> None:
+        self.state = "open"
+        self.cooldown = cooldown
+        self.opened_until = time.monotonic() + cooldown
+        self.opens += 1
+        self._results.clear()
+        self._throttles = 0
+        print(f"[WARN] 실패/속도 제한이 많아 {cooldown:g}초 쉬었다가 1건씩 다시 시도합니다")
+
+    def allowed_in_flight(self, default: int) -> int:
+        # 지금 동시에 보내도 되는 요청 수 (open 이 끝났으면 half-open 으로)
+        with self._lock:
+            if self.state == "open" and time.monotonic() >= self.opened_until:
+                self.state = "half-open"
+            if self.state == "open":
+                return 0
+            return 1 if self.state == "half-open" else default
+
+    def wait(self, should_stop: Optional[Callable[[], bool]] = None) -> None:
+        # open 이면 cooldown 이 끝날 때까지 대기 (should_stop 은 1초마다 확인)
+        while True:
+            with self._lock:
+                left = self.opened_until - time.monotonic() if self.state == "open" else 0
+            if left <= 0 or (should_stop is not None and should_stop()):
+                return
+            time.sleep(min(1.0, left))
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {"state": self.state, "opens": self.opens, "cooldown": self.cooldown}
@@ -0,0 +1,410 @@
+# 여러 작성자 일괄 수집 스케줄러
+# - 작업 큐는 로컬 SQLite(queue.db): 작성자 목록 수집(list) / 글 렌더(post) 작업
+# - 워커 프로세스 N개가 lease 로 작업을 가져감 (프로세스마다 자기 브라우저)
+#   lease 가 만료된 작업(워커가 죽은 경우)은 다른 워커가 다시 가져감. 진행 중인 작업은 워커가 lease 를 연장
+# - 워커 하나가 작업을 concurrency 개까지 동시에 진행 (브라우저 풀도 같은 수)
+# - 실패는 지수 백오프로 재시도, max_attempts 넘으면 dead(dead-letter). 글 작업은 crawl_velog 와 같은
+#   워치독/RetryPolicy(종류별 재시도 횟수)/CircuitBreaker 를 거침 -> 404 는 바로 dead, 속도 제한이 몰리면 잠시 멈춤
+# - 매너 딜레이는 프로세스가 몇 개든 host 단위로 전체 공유(SharedHostLimiter)
+# - 결과는 CrawlStore(crawl.db)에 바로 저장 -> 작성자별 out 파일은 끝에 export
+import json, multiprocessing, os, random, sqlite3, threading, time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind         TEXT NOT NULL,             -- list | post
+    handle       TEXT NOT NULL,
+    url          TEXT NOT NULL DEFAULT '',  -- post 작업의 글 URL
+    status       TEXT NOT NULL,             -- ready | leased | done | dead
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,             -- 이 시각 이후에 가져갈 수 있음 (백오프)
+    lease_owner  TEXT,
+    lease_until  REAL,
+    last_error   TEXT,
+    created_at   REAL NOT NULL,
+    updated_at   REAL NOT NULL,
+    UNIQUE (kind, handle, url)
+);
+CREATE INDEX IF NOT EXISTS tasks_ready ON tasks(status, available_at);
+"""
+
+class WorkQueue:
+    def __init__(
+        self,
+        path: str = "queue.db",
+        max_attempts: int = 4,
+        backoff_base: float = 5.0,
+        backoff_max: float = 300.0,
+    ):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        # isolation_level=None: 트랜잭션은 BEGIN IMMEDIATE 로 직접 (lease 는 프로세스 간 원자적이어야 함)
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _tx(self, fn):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                out = fn(self._db)
+                self._db.execute("COMMIT")
+                return out
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def _add(self, db, kind: str, handle: str, url: str, revive: Tuple[str, ...]) -> bool:
+        now = time.time()
+        cur = db.execute(
+            "INSERT INTO tasks (kind, handle, url, status, available_at, created_at, updated_at)"
+            " VALUES (?, ?, ?, 'ready', ?, ?, ?) ON CONFLICT(kind, handle, url) DO NOTHING",
+            (kind, handle, url, now, now, now),
+        )
+        if cur.rowcount:
+            return True
+        if revive:
+            # 이미 있는 작업 중 revive 상태(done/dead)인 것을 새로 대기열에
+            marks = ",".join("?" for _ in revive)
+            cur = db.execute(
+                "UPDATE tasks SET status = 'ready', attempts = 0, available_at = ?, last_error = NULL,"
+                f" updated_at = ? WHERE kind = ? AND handle = ? AND url = ? AND status IN ({marks})",
+                (now, now, kind, handle, url, *revive),
+            )
+            return cur.rowcount > 0
+        return False
+
+    def add_authors(self, handles: Iterable[str]) -> int:
+        handles = list(handles)
+        # 배치에 다시 넣은 작성자는 목록부터 다시 (끝났거나 dead 인 목록 작업도)
+        return self._tx(lambda db: sum(self._add(db, "list", h, "", ("done", "dead")) for h in handles))
+
+    def add_posts(self, handle: str, urls: Iterable[str], retry_done: bool = False) -> int:
+        # retry_done: 끝난(done) 글 작업을 다시 대기열에 (조건부 재확인 -> 바뀐 글만 본문을 다시 받음)
+        # dead 인 글은 목록에서 다시 만나도 살리지 않음 (retry_dead 로 명시적으로만)
+        urls = list(urls)
+        revive = ("done",) if retry_done else ()
+        return self._tx(lambda db: sum(self._add(db, "post", handle, u, revive) for u in urls))
+
+    def retry_dead(self) -> int:
+        # dead 작업 전부를 다시 대기열에 (--retry-dead)
+        now = time.time()
+        return self._tx(lambda db: db.execute(
+            "UPDATE tasks SET status = 'ready', attempts = 0, available_at = ?, last_error = NULL, updated_at = ?"
+            " WHERE status = 'dead'",
+            (now, now),
+        ).rowcount)
+
+    def lease(self, owner: str, lease_sec: float = 300.0) -> Optional[dict]:
+        # 가져갈 수 있는 작업 하나를 owner 에게 lease. 목록(list) 작업을 먼저 -> 글 작업이 빨리 채워짐
+        def pick(db):
+            now = time.time()
+            # lease 가 만료된 채 max_attempts 를 다 쓴 작업(매번 워커를 죽이는 글 등)은 다시 주지 않고 dead
+            db.execute(
+                "UPDATE tasks SET status = 'dead', lease_owner = NULL, lease_until = NULL,"
+                " last_error = COALESCE(last_error, 'lease expired'), updated_at = ?"
+                " WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            row = db.execute(
+                "SELECT * FROM tasks WHERE (status = 'ready' AND available_at <= ?)"
+                " OR (status = 'leased' AND lease_until < ?)"
+                " ORDER BY kind = 'post', available_at, id LIMIT 1",
+                (now, now),
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE tasks SET status = 'leased', lease_owner = ?, lease_until = ?, attempts = attempts + 1,"
+                " updated_at = ? WHERE id = ?",
+                (owner, now + lease_sec, now, row["id"]),
+            )
+            task = dict(row)
+            task["attempts"] += 1
+            return task
+        return self._tx(pick)
+
+    def renew(self, task_ids: List[int], owner: str, lease_sec: float = 300.0) -> None:
+        # 진행 중인 작업(목록 스크롤 등 오래 걸리는 것 포함)의 lease 연장 -> 살아 있는 동안 다른 워커가 다시 가져가지 않음
+        if not task_ids:
+            return
+        marks = ",".join("?" for _ in task_ids)
+        self._tx(lambda db: db.execute(
+            f"UPDATE tasks SET lease_until = ? WHERE id IN ({marks}) AND lease_owner = ? AND status = 'leased'",
+            [time.time() + lease_sec, *task_ids, owner],
+        ))
+
+    def complete(self, task_id: int, owner: str) -> None:
+        self._tx(lambda db: db.execute(
+            "UPDATE tasks SET status = 'done', lease_owner = NULL, lease_until = NULL, updated_at = ?"
+            " WHERE id = ? AND lease_owner = ?",
+            (time.time(), task_id, owner),
+        ))
+
+    def fail(self, task_id: int, owner: str, error: str, final: bool = False) -> str:
+        # 재시도(ready + 백오프) 또는 dead. final=True 면 횟수와 상관없이 dead. 바뀐 상태를 돌려줌
+        def update(db):
+            row = db.execute("SELECT attempts FROM tasks WHERE id = ?", (task_id,)).fetchone()
+            now = time.time()
+            if final or row["attempts"] >= self.max_attempts:
+                status, available = "dead", now
+            else:
+                delay = min(self.backoff_max, self.backoff_base * 2 ** (row["attempts"] - 1))
+                status, available = "ready", now + delay * random.uniform(0.5, 1.0)
+            db.execute(
+                "UPDATE tasks SET status = ?, available_at = ?, last_error = ?, lease_owner = NULL,"
+                " lease_until = NULL, updated_at = ? WHERE id = ? AND lease_owner = ?",
+                (status, available, error[:500], now, task_id, owner),
+            )
+            return status
+        return self._tx(update)
+
+    def pending(self) -> int:
+        # 아직 끝나지 않은(대기/진행 중) 작업 수. 0 이면 배치 종료
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM tasks WHERE status IN ('ready', 'leased')"
+            ).fetchone()[0]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            rows = self._db.execute("SELECT kind, status, COUNT(*) AS n FROM tasks GROUP BY kind, status").fetchall()
+        out: Dict[str, Dict[str, int]] = {}
+        for r in rows:
+            out.setdefault(r["kind"], {})[r["status"]] = r["n"]
+        return out
+
+    def dead(self) -> List[dict]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT kind, handle, url, attempts, last_error FROM tasks WHERE status = 'dead' ORDER BY id"
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+
+def run_worker(
+    worker_id: int,
+    queue_path: str,
+    store_path: str,
+    backend_kind: str = "auto",
+    concurrency: int = 1,
+    rate: float = 1.0,
+    burst: int = 1,
+    max_scrolls: int = 220,
+    pause_sec: float = 1.0,
+    stop_after_known: int = 5,
+    refresh_known: bool = False,
+    lease_sec: float = 300.0,
+    max_attempts: int = 4,
+    idle_sec: float = 1.0,
+    post_timeout: float = 20.0,
+    retry=None,
+    breaker_cooldown: float = 30.0,
+    base_url: Optional[str] = None,
+) -> None:
+    # 워커 프로세스 본체: 큐가 빌 때까지 lease -> 실행 -> complete/fail (동시에 concurrency 개까지)
+    # 브라우저/백엔드/DB 연결은 모두 프로세스 안에서 새로 만듦 (fork 로 넘기지 않음)
+    # retry(RetryPolicy): 실패 종류별 재시도 횟수 (재시도 간격은 큐의 백오프). 브레이커는 워커마다 하나
+    # base_url: 로컬 대역 서버(fixture_server)로 돌릴 때
+    from browser_pool import BrowserPool
+    from crawl_velog import (
+        build_post_record, check_rendered, make_backend, submit_validated, wait_post_result, _normalize_post_href,
+    )
+    from ratelimit import SharedHostLimiter
+    from retry import CircuitBreaker, RetryPolicy, classify_error
+    from store import CrawlStore
+
+    owner = f"{os.getpid()}-{worker_id}"
+    queue = WorkQueue(queue_path, max_attempts=max_attempts)
+    store = CrawlStore(store_path)
+    limiter = SharedHostLimiter(queue_path, rate=rate, burst=burst)
+    pool = BrowserPool(workers=concurrency)
+    backend = make_backend(
+        backend_kind, pool, limiter, workers=concurrency, timeout_ms=int(post_timeout * 1000),
+        **({"base_url": base_url} if base_url else {}),
+    )
+    retry = retry or RetryPolicy()
+    breaker = CircuitBreaker(cooldown=breaker_cooldown)
+
+    def run_task(task: dict) -> None:
+        if task["kind"] == "list":
+            known = {_normalize_post_href(u) for u in store.known_urls(task["handle"])}
+            links = backend.list_links(
+                task["handle"], max_scrolls=max_scrolls, pause_sec=pause_sec,
+                known=known, stop_after_known=stop_after_known if known else 0,
+            )
+            targets = links if refresh_known else [u for u in links if u not in known]
+            n = queue.add_posts(task["handle"], targets, retry_done=True)
+            print(f"[INFO] w{worker_id} @{task['handle']}: 링크 {len(links)}개, 글 작업 {n}개 추가")
+            return
+        url = task["url"]
+        rendered, etag, lm = wait_post_result(submit_validated(backend, url, store.validators(url)), post_timeout)
+        if rendered is None:
+            store.touch(url)  # 304: 변경 없음
+        else:
+            store.upsert(build_post_record(url, check_rendered(rendered)), etag, lm)
+
+    # 작업 concurrency 개를 동시에: 스레드마다 작업 하나 (렌더는 브라우저 풀/HTTP 백엔드가 병렬로 처리)
+    in_flight: Dict[Future, dict] = {}
+    renew_every = lease_sec / 3
+    last_renew = time.monotonic()
+    runner = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"crawl-w{worker_id}")
+    try:
+        while True:
+            # 브레이커가 open 이면 새 작업을 가져오지 않고, half-open 이면 1건씩
+            while len(in_flight) < breaker.allowed_in_flight(concurrency):
+                task = queue.lease(owner, lease_sec)
+                if task is None:
+                    break
+                in_flight[runner.submit(run_task, task)] = task
+            if not in_flight:
+                if queue.pending() == 0:
+                    return
+                time.sleep(idle_sec)  # 다른 워커의 목록 작업이 글 작업을 채울 수 있음
+                continue
+            # 자리가 비어 있으면 idle_sec 마다 새 작업을 확인, 다 찼으면 lease 연장 주기까지 대기
+            timeout = idle_sec if len(in_flight) < concurrency else renew_every
+            done, _ = wait(in_flight, timeout=min(timeout, renew_every), return_when=FIRST_COMPLETED)
+            for fut in done:
+                task = in_flight.pop(fut)
+                try:
+                    fut.result()
+                    breaker.record(None)
+                    queue.complete(task["id"], owner)
+                except Exception as ex:
+                    kind = classify_error(ex)
+                    breaker.record(kind)
+                    final = not retry.should_retry(kind, task["attempts"])
+                    status = queue.fail(task["id"], owner, f"{kind}: {type(ex).__name__}: {ex}", final=final)
+                    print(f"[WARN] w{worker_id} {task['kind']} {task['url'] or task['handle']} 실패 ({kind}, {status}): {ex}")
+            if in_flight and time.monotonic() - last_renew >= renew_every:
+                queue.renew([t["id"] for t in in_flight.values()], owner, lease_sec)
+                last_renew = time.monotonic()
+    finally:
+        runner.shutdown(wait=True)
+        backend.close()
+        pool.close()
+        limiter.close()
+        store.close()
+        queue.close()
+
+
+def run_batch(
+    handles: List[str],
+    workers: int = 2,
+    queue_path: str = "queue.db",
+    store_path: str = "crawl.db",
+    retry_dead: bool = False,
+    **worker_kwargs,
+) -> Dict[str, Dict[str, int]]:
+    # 작성자 목록을 큐에 넣고 워커 프로세스 N개로 끝까지 처리. 이전 배치에서 남은 작업도 이어서 처리
+    # retry_dead: 이전 배치에서 dead 가 된 작업도 다시 시도
+    queue = WorkQueue(queue_path, max_attempts=worker_kwargs.get("max_attempts", 4))
+    if retry_dead:
+        print(f"[INFO] dead 작업 {queue.retry_dead()}개를 다시 대기열에")
+    added = queue.add_authors(handles)
+    print(f"[INFO] 작성자 {len(handles)}명 (새로 대기열에 {added}명), 워커 {workers}개")
+    _init_store(store_path)
+
+    # fork 된 자식이 부모의 스레드/연결 상태를 물려받지 않도록 spawn
+    ctx = multiprocessing.get_context("spawn")
+    procs = [
+        ctx.Process(
+            target=run_worker, args=(i, queue_path, store_path), kwargs=worker_kwargs, name=f"crawl-worker-{i}"
+        )
+        for i in range(max(1, workers))
+    ]
+    for p in procs:
+        p.start()
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        # lease 는 만료되면 다음 실행에서 다시 가져감
+        print("\n[WARN] 사용자 중단 감지. 진행 중 작업은 다음 실행에서 이어서 처리합니다.")
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            p.join()
+
+    stats = queue.stats()
+    dead = queue.dead()
+    queue.close()
+    print(f"[INFO] 작업 현황: {json.dumps(stats, ensure_ascii=False)}")
+    for d in dead:
+        print(f"[WARN] dead: {d['kind']} {d['url'] or d['handle']} ({d['attempts']}회) {d['last_error']}")
+    return stats
+
+
+def _init_store(path: str) -> None:
+    # 워커들이 동시에 스키마를 만들지 않도록 부모에서 한 번 생성
+    from store import CrawlStore
+    CrawlStore(path).close()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Velog multi-author batch crawler")
+    parser.add_argument("--handles", default="", help="comma separated Velog handles")
+    parser.add_argument("--handles-file", default="", help="file with one handle per line ('#' comments allowed)")
+    parser.add_argument("--workers", type=int, default=2, help="worker processes (one browser each)")
+    parser.add_argument("--concurrency", type=int, default=1, help="tasks (post renders / list harvests) in flight per worker")
+    parser.add_argument("--queue", default="queue.db", help="SQLite work queue path")
+    parser.add_argument("--store", default="crawl.db", help="SQLite crawl store path")
+    parser.add_argument("--out-dir", default="", help="export <handle>.json per author here when done")
+    parser.add_argument("--backend", choices=["auto", "http", "playwright"], default="auto")
+    parser.add_argument("--rate", type=float, default=1.0, help="requests/sec per host across all workers")
+    parser.add_argument("--burst", type=int, default=1)
+    parser.add_argument("--max-scrolls", type=int, default=220)
+    parser.add_argument("--pause", type=float, default=1.0)
+    parser.add_argument("--stop-after-known", type=int, default=5)
+    parser.add_argument("--refresh-known", action="store_true")
+    parser.add_argument("--lease", type=float, default=300.0, help="lease length; renewed while a task is running, so only a dead worker's tasks are retaken")
+    parser.add_argument("--max-attempts", type=int, default=4, help="attempts before a task is dead-lettered")
+    parser.add_argument("--retry-dead", action="store_true", help="requeue tasks dead-lettered by earlier batches")
+    parser.add_argument("--post-timeout", type=float, default=20.0, help="hard deadline per post render (sec)")
+    parser.add_argument("--breaker-cooldown", type=float, default=30.0,
+                        help="pause (sec) per worker when failures/throttling pile up")
+    args = parser.parse_args()
+
+    handles = [h.strip().lstrip("@") for h in args.handles.split(",") if h.strip()]
+    if args.handles_file:
+        with open(args.handles_file, encoding="utf-8") as f:
+            handles += [ln.strip().lstrip("@") for ln in f if ln.strip() and not ln.startswith("#")]
+    handles = list(dict.fromkeys(handles))
+    if not handles:
+        parser.error("--handles 또는 --handles-file 이 필요합니다")
+
+    run_batch(
+        handles, workers=args.workers, queue_path=args.queue, store_path=args.store, retry_dead=args.retry_dead,
+        backend_kind=args.backend, concurrency=args.concurrency, rate=args.rate, burst=args.burst,
+        max_scrolls=args.max_scrolls, pause_sec=args.pause, stop_after_known=args.stop_after_known,
+        refresh_known=args.refresh_known, lease_sec=args.lease, max_attempts=args.max_attempts,
+        post_timeout=args.post_timeout, breaker_cooldown=args.breaker_cooldown,
+    )
+
+    if args.out_dir:
+        from store import CrawlStore
+        os.makedirs(args.out_dir, exist_ok=True)
+        with CrawlStore(args.store) as store:
+            for h in handles:
+                path = os.path.join(args.out_dir, f"{h}.json")
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(store.export(h), f, ensure_ascii=False, indent=2)
+        print(f"[DONE] 작성자 {len(handles)}명 저장 → {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,358 @@
-# NLP 서버 전송
\ No newline at end of file
+# NLP 서버 전송
+# - 크롤 결과(out.json / JSONL / crawl.db)를 글 단위로 읽어 묶음(글 수 + 바이트 상한)으로 나눠 전송
+# - 묶음은 gzip JSON, 하나의 requests.Session(커넥션 풀)로 concurrency 개까지 동시에
+# - 재시도: 5xx/429/연결 오류만 (지터 백오프, Retry-After 존중). 같은 묶음은 같은 Idempotency-Key -> 서버가 중복 무시 가능
+# - 체크포인트: 서버가 받았다고 응답한 글의 (url, 본문 해시)를 SQLite(nlp_acks.db)에 기록
+#   -> 다시 실행하면 새 글/바뀐 글만 보냄
+# - 로컬 테스트용 스텁 서버: python send_to_nlp.py --serve-stub 9000 [--fail-rate 0.2]
+import gzip, hashlib, json, os, random, sqlite3, threading, time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from archive import is_archive, iter_archive_posts
+from jsonl_out import iter_json_posts, read_jsonl
+from retry import RetryPolicy, classify_error
+from store import content_hash, handle_of
+
+NLP_URL = os.environ.get("NLP_URL", "http://127.0.0.1:9000/ingest")
+SEND_FIELDS = ("url", "title", "tags", "published_at", "updated_at", "text", "code_langs", "content_hash")
+# 재시도해도 결과가 같은 응답 (요청 자체가 잘못됨)
+PERMANENT_STATUS = {400, 401, 403, 404, 409, 413, 422}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS acks (
+    endpoint     TEXT NOT NULL,
+    url          TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    batch_id     TEXT NOT NULL,
+    acked_at     REAL NOT NULL,
+    PRIMARY KEY (endpoint, url)
+);
+"""
+
+
+class SendError(Exception):
+    pass
+
+
+class AckLog:
+    # 서버가 받은 글 기록 (endpoint 별). 본문 해시가 바뀐 글은 다시 보냄
+    def __init__(self, path: str = "nlp_acks.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def acked(self, endpoint: str, url: str, h: str) -> bool:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content_hash FROM acks WHERE endpoint = ? AND url = ?", (endpoint, url)
+            ).fetchone()
+        return row is not None and row[0] == h
+
+    def record(self, endpoint: str, batch_id: str, keys: List[Tuple[str, str]]) -> None:
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO acks VALUES (?, ?, ?, ?, ?) ON CONFLICT (endpoint, url) DO UPDATE"
+                " SET content_hash = excluded.content_hash, batch_id = excluded.batch_id, acked_at = excluded.acked_at",
+                [(endpoint, url, h, batch_id, now) for url, h in keys],
+            )
+
+
+def iter_source_posts(path: str) -> Iterator[dict]:
+    # out.json 은 posts 배열을 점진 파싱, JSONL(.gz/.zst)은 줄 단위 -> 본문을 한꺼번에 올리지 않음
+    if ".jsonl" in os.path.basename(path):
+        return read_jsonl(path)
+    if is_archive(path):
+        return iter_archive_posts(path)
+    return iter_json_posts(path)
+
+
+def to_payload(post: dict) -> dict:
+    p = {k: post.get(k) for k in SEND_FIELDS}
+    p["content_hash"] = p["content_hash"] or content_hash(p.get("text") or "")
+    p["handle"] = handle_of(p["url"])
+    return p
+
+
+def iter_batches(
+    posts: Iterable[dict], max_posts: int = 100, max_bytes: int = 4 << 20
+) -> Iterator[List[Tuple[Tuple[str, str], bytes]]]:
+    # ((url, 본문 해시), 직렬화한 글) 묶음. 글 하나가 max_bytes 보다 크면 혼자 한 묶음
+    batch: List[Tuple[Tuple[str, str], bytes]] = []
+    size = 0
+    for post in posts:
+        raw = json.dumps(post, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if batch and (len(batch) >= max_posts or size + len(raw) > max_bytes):
+            yield batch
+            batch, size = [], 0
+        batch.append(((post["url"], post["content_hash"]), raw))
+        size += len(raw) + 1
+    if batch:
+        yield batch
+
+
+class NlpExporter:
+    def __init__(
+        self,
+        url: str = NLP_URL,
+        concurrency: int = 4,
+        max_posts: int = 100,
+        max_bytes: int = 4 << 20,
+        retry: Optional[RetryPolicy] = None,
+        timeout: float = 30.0,
+        token: Optional[str] = None,
+        acks: Optional[AckLog] = None,
+        compresslevel: int = 6,
+    ):
+        self.url = url
+        self.concurrency = max(1, concurrency)
+        self.max_posts = max_posts
+        self.max_bytes = max_bytes
+        self.retry = retry or RetryPolicy({"timeout": 4, "throttle": 6, "error": 4}, base=0.5, cap=30.0)
+        self.timeout = timeout
+        self.acks = acks
+        self.compresslevel = compresslevel
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Content-Type": "application/json", "Content-Encoding": "gzip"})
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+        self._lock = threading.Lock()
+        self.stats = {"posts": 0, "skipped": 0, "batches": 0, "failed_batches": 0, "failed_posts": 0,
+                      "retries": 0, "bytes_raw": 0, "bytes_sent": 0}
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _count(self, **inc: int) -> None:
+        with self._lock:
+            for k, v in inc.items():
+                self.stats[k] += v
+
+    def pending(self, posts: Iterable[dict]) -> Iterator[dict]:
+        # 체크포인트에 같은 본문 해시로 남아 있는 글은 건너뜀
+        for post in posts:
+            if not post.get("url"):
+                continue
+            p = to_payload(post)
+            if self.acks is not None and self.acks.acked(self.url, p["url"], p["content_hash"]):
+                self._count(skipped=1)
+                continue
+            yield p
+
+    def send_batch(self, batch: List[bytes]) -> str:
+        # 묶음 하나 전송 (재시도 포함). 성공하면 batch_id, 끝내 실패하면 SendError
+        batch_id = hashlib.sha1(b"\n".join(batch)).hexdigest()
+        raw = b'{"batch_id":"' + batch_id.encode() + b'","posts":[' + b",".join(batch) + b"]}"
+        body = gzip.compress(raw, compresslevel=self.compresslevel)
+        self._count(bytes_raw=len(raw), bytes_sent=len(body))
+        attempt = 0
+        while True:
+            try:
+                resp = self.session.post(self.url, data=body, timeout=self.timeout,
+                                         headers={"Idempotency-Key": batch_id})
+                if resp.status_code in PERMANENT_STATUS:
+                    raise SendError(f"HTTP {resp.status_code}: {resp.text[:200]}")
+                resp.raise_for_status()
+                return batch_id
+            except SendError:
+                raise
+            except Exception as ex:
+                kind = classify_error(ex)
+                attempt += 1
+                if not self.retry.should_retry(kind, attempt):
+                    raise SendError(f"{kind} after {attempt} attempts: {ex}") from ex
+                delay = self.retry.delay(kind, attempt)
+                retry_after = getattr(getattr(ex, "response", None), "headers", {}).get("Retry-After")
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, min(float(retry_after), self.retry.cap))
+                self._count(retries=1)
+                time.sleep(delay)
+
+    def export(self, posts: Iterable[dict]) -> Dict[str, int]:
+        # 묶음을 만들면서 바로 보냄. 동시에 concurrency 개까지 (메모리 = 묶음 크기 x concurrency)
+        in_flight: Dict[Future, List[Tuple[str, str]]] = {}
+
+        def settle(done: Set[Future]) -> None:
+            for fut in done:
+                keys = in_flight.pop(fut)
+                try:
+                    batch_id = fut.result()
+                except SendError as ex:
+                    self._count(failed_batches=1, failed_posts=len(keys))
+                    print(f"[WARN] 묶음 전송 실패 ({len(keys)}개, 첫 글 {keys[0][0]}): {ex}")
+                    continue
+                if self.acks is not None:
+                    self.acks.record(self.url, batch_id, keys)
+                self._count(batches=1, posts=len(keys))
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="nlp-send") as pool:
+            for batch in iter_batches(self.pending(posts), self.max_posts, self.max_bytes):
+                if len(in_flight) >= self.concurrency:
+                    done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                    settle(done)
+                keys = [k for k, _ in batch]
+                in_flight[pool.submit(self.send_batch, [raw for _, raw in batch])] = keys
+            while in_flight:
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                settle(done)
+        return dict(self.stats)
+
+
+# --- 로컬 스텁 NLP 서버 ---
+
+def start_stub_server(
+    port: int = 0,
+    fail_rate: float = 0.0,
+    latency_ms: float = 0.0,
+    seed: Optional[int] = None,
+) -> Tuple[ThreadingHTTPServer, str]:
+    # POST /ingest 를 받아 글 수를 셈. fail_rate 확률로 503(Retry-After: 0). 같은 Idempotency-Key 는 한 번만 셈
+    # server.received = {"requests", "batches", "posts", "duplicates", "failed", "bytes"}, server.urls = 받은 URL 집합
+    rnd = random.Random(seed)
+    lock = threading.Lock()
+    seen: Set[str] = set()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args) -> None:
+            pass
+
+        def _reply(self, status: int, doc: dict, headers: Optional[dict] = None) -> None:
+            body = json.dumps(doc).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self) -> None:
+            data = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if self.path.split("?")[0] != "/ingest":
+                return self._reply(404, {"error": "not found"})
+            stats = self.server.received
+            with lock:
+                stats["requests"] += 1
+                stats["bytes"] += len(data)
+                fail = rnd.random() < fail_rate
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            if fail:
+                with lock:
+                    stats["failed"] += 1
+                return self._reply(503, {"error": "unavailable"}, {"Retry-After": "0"})
+            try:
+                if self.headers.get("Content-Encoding") == "gzip":
+                    data = gzip.decompress(data)
+                doc = json.loads(data)
+                posts = doc["posts"]
+            except (OSError, ValueError, KeyError):
+                return self._reply(400, {"error": "bad payload"})
+            key = self.headers.get("Idempotency-Key") or doc.get("batch_id") or ""
+            with lock:
+                dup = key in seen
+                seen.add(key)
+                if dup:
+                    stats["duplicates"] += 1
+                else:
+                    stats["batches"] += 1
+                    stats["posts"] += len(posts)
+                    self.server.urls.update(p.get("url") for p in posts)
+            self._reply(200, {"accepted": 0 if dup else len(posts), "duplicate": dup})
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    server.received = {"requests": 0, "batches": 0, "posts": 0, "duplicates": 0, "failed": 0, "bytes": 0}
+    server.urls = set()
+    threading.Thread(target=server.serve_forever, name="nlp-stub", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/ingest"
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Send crawled Velog posts to the NLP service")
+    parser.add_argument("inputs", nargs="*", help="out.json, .vca archive or JSONL (.jsonl/.gz/.zst) files")
+    parser.add_argument("--store", default="", help="read posts from this SQLite crawl store")
+    parser.add_argument("--handles", default="", help="comma separated handles (with --store; default: all)")
+    parser.add_argument("--url", default=NLP_URL, help="NLP ingest endpoint (env NLP_URL)")
+    parser.add_argument("--token", default=os.environ.get("NLP_TOKEN", ""), help="bearer token (env NLP_TOKEN)")
+    parser.add_argument("--concurrency", type=int, default=4, help="batches in flight")
+    parser.add_argument("--batch-posts", type=int, default=100, help="max posts per batch")
+    parser.add_argument("--batch-kb", type=int, default=4096, help="max uncompressed KB per batch")
+    parser.add_argument("--max-retries", type=int, default=4, help="retries per batch for 5xx/429/connection errors")
+    parser.add_argument("--acks", default="nlp_acks.db", help="checkpoint of acknowledged posts ('' to disable)")
+    parser.add_argument("--serve-stub", type=int, default=0, metavar="PORT", help="only run a local stub NLP server")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="with --serve-stub, fraction of 503 replies")
+    args = parser.parse_args()
+
+    if args.serve_stub:
+        server, url = start_stub_server(args.serve_stub, fail_rate=args.fail_rate)
+        print(f"[INFO] stub NLP server: {url}")
+        try:
+            while True:
+                time.sleep(5)
+                print(f"[INFO] {json.dumps(server.received)}")
+        except KeyboardInterrupt:
+            server.shutdown()
+        return
+
+    sources: List[Iterable[dict]] = [iter_source_posts(p) for p in args.inputs]
+    store = None
+    if args.store:
+        from store import CrawlStore
+        store = CrawlStore(args.store)
+        handles = [h.strip().lstrip("@") for h in args.handles.split(",") if h.strip()] or store.handles()
+        sources += [store.iter_posts(h) for h in handles]
+    if not sources:
+        parser.error("입력 파일 또는 --store 가 필요합니다")
+
+    retries = args.max_retries
+    acks = AckLog(args.acks) if args.acks else None
+    exporter = NlpExporter(
+        args.url, concurrency=args.concurrency, max_posts=args.batch_posts, max_bytes=args.batch_kb * 1024,
+        retry=RetryPolicy({"timeout": retries, "throttle": retries + 2, "error": retries}, base=0.5),
+        token=args.token or None, acks=acks,
+    )
+    t0 = time.perf_counter()
+    try:
+        stats = exporter.export(p for src in sources for p in src)
+    except KeyboardInterrupt:
+        # 이미 응답받은 묶음은 체크포인트에 있으므로 다음 실행에서 나머지만 보냄
+        print("\n[WARN] 사용자 중단 감지. 다음 실행에서 남은 글부터 보냅니다.")
+        stats = dict(exporter.stats)
+    finally:
+        exporter.close()
+        if acks is not None:
+            acks.close()
+        if store is not None:
+            store.close()
+    elapsed = time.perf_counter() - t0
+    ratio = stats["bytes_sent"] / stats["bytes_raw"] if stats["bytes_raw"] else 0
+    print(f"[DONE] 전송 {stats['posts']}개 / 묶음 {stats['batches']}개 ({elapsed:.2f}s), 건너뜀 {stats['skipped']},"
+          f" 재시도 {stats['retries']}, 실패 묶음 {stats['failed_batches']} (글 {stats['failed_posts']}),"
+          f" 압축 {ratio:.0%}")
+    if stats["failed_batches"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# 로컬 SQLite 크롤 저장소 (URL 키)
+# - 추출 필드 + 수집 시각 + 정규화 본문 해시 + HTTP 검증자(ETag/Last-Modified)
+# - out.json 은 여기서 뽑아내는 export 뷰
+import hashlib, json, re, sqlite3, threading, time, unicodedata
+from typing import Iterator, List, Optional, Set, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    url           TEXT PRIMARY KEY,
+    handle        TEXT NOT NULL,
+    title         TEXT NOT NULL DEFAULT '',
+    tags          TEXT NOT NULL DEFAULT '[]',
+    published_at  TEXT NOT NULL DEFAULT '',
+    updated_at    TEXT NOT NULL DEFAULT '',
+    text          TEXT NOT NULL DEFAULT '',
+    code_langs    TEXT NOT NULL DEFAULT '[]',
+    likes         INTEGER NOT NULL DEFAULT 0,
+    comments      INTEGER NOT NULL DEFAULT 0,
+    series        TEXT,
+    content_hash  TEXT NOT NULL DEFAULT '',
+    etag          TEXT,
+    last_modified TEXT,
+    first_seen    REAL NOT NULL,
+    fetched_at    REAL NOT NULL,
+    checked_at    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS posts_handle ON posts(handle);
+"""
+
+# 저장/내보내기 필드 (out.json 의 post 레코드와 같은 키)
+POST_FIELDS = [
+    "url", "title", "tags", "published_at", "updated_at", "text",
+    "code_langs", "likes", "comments", "series", "content_hash",
+]
+JSON_FIELDS = {"tags", "code_langs"}
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    # 공백/유니코드 표기 차이로 해시가 바뀌지 않도록 정규화
+    return _WS_RE.sub(" ", unicodedata.normalize("NFC", text or "")).strip()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def handle_of(url: str) -> str:
+    m = re.search(r"/@([^/]+)/", url)
+    return m.group(1) if m else ""
+
+
+class CrawlStore:
+    def __init__(self, path: str = "crawl.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> "CrawlStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def known_urls(self, handle: str) -> Set[str]:
+        with self._lock:
+            rows = self._db.execute("SELECT url FROM posts WHERE handle = ?", (handle,)).fetchall()
+        return {r["url"] for r in rows}
+
+    def handles(self) -> List[str]:
+        with self._lock:
+            rows = self._db.execute("SELECT DISTINCT handle FROM posts WHERE handle != '' ORDER BY handle").fetchall()
+        return [r["handle"] for r in rows]
+
+    def count(self, handle: str) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM posts WHERE handle = ?", (handle,)).fetchone()[0]
+
+    def get(self, url: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM posts WHERE url = ?", (url,)).fetchone()
+        return _row_to_post(row) if row else None
+
+    def validators(self, url: str) -> Tuple[Optional[str], Optional[str]]:
+        with self._lock:
+            row = self._db.execute("SELECT etag, last_modified FROM posts WHERE url = ?", (url,)).fetchone()
+        return (row["etag"], row["last_modified"]) if row else (None, None)
+
+    def upsert(self, post: dict, etag: Optional[str] = None, last_modified: Optional[str] = None) -> bool:
+        # 본문 해시가 같으면 검증자/확인 시각만 갱신하고 False, 새 글이거나 바뀌었으면 True
+        now = time.time()
+        h = post.get("content_hash") or content_hash(post.get("text", ""))
+        values = {k: post.get(k) for k in POST_FIELDS}
+        values["content_hash"] = h
+        for k in JSON_FIELDS:
+            values[k] = json.dumps(values[k] or [], ensure_ascii=False)
+        for k in ("title", "published_at", "updated_at", "text"):
+            values[k] = values[k] or ""
+        values["likes"] = values["likes"] or 0
+        values["comments"] = values["comments"] or 0
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT content_hash, title, tags FROM posts WHERE url = ?", (post["url"],)
+            ).fetchone()
+            if row and row["content_hash"] == h and row["title"] == values["title"] and row["tags"] == values["tags"]:
+                self._db.execute(
+                    "UPDATE posts SET checked_at = ?, etag = COALESCE(?, etag),"
+                    " last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                    (now, etag, last_modified, post["url"]),
+                )
+                return False
+            cols = POST_FIELDS + ["handle", "etag", "last_modified", "first_seen", "fetched_at", "checked_at"]
+            values.update(handle=handle_of(post["url"]), etag=etag, last_modified=last_modified,
+                          first_seen=now, fetched_at=now, checked_at=now)
+            self._db.execute(
+                f"INSERT INTO posts ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)})"
+                " ON CONFLICT(url) DO UPDATE SET "
+                + ", ".join(f"{c} = excluded.{c}" for c in cols if c not in ("url", "first_seen")),
+                [values[c] for c in cols],
+            )
+            return True
+
+    def touch(self, url: str) -> None:
+        # 304 Not Modified 등으로 변경 없음이 확인된 경우
+        with self._lock, self._db:
+            self._db.execute("UPDATE posts SET checked_at = ? WHERE url = ?", (time.time(), url))
+
+    def iter_posts(self, handle: str) -> Iterator[dict]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM posts WHERE handle = ? ORDER BY first_seen, rowid", (handle,)
+            ).fetchall()
+        for row in rows:
+            yield _row_to_post(row)
+
+    def changed_since(self, handle: str, since: float) -> Tuple[List[dict], float]:
+        # since 이후 새로 받았거나 내용이 바뀐 글 (upsert 가 True 였던 것), 다음 기준 시각
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM posts WHERE handle = ? AND fetched_at > ? ORDER BY fetched_at", (handle, since)
+            ).fetchall()
+        return [_row_to_post(r) for r in rows], (rows[-1]["fetched_at"] if rows else since)
+
+    # out.json 형태로 내보내기 / 가져오기
+    def export(self, handle: str) -> dict:
+        return {
+            "source": "velog",
+            "author": {"handle": handle},
+            "posts": list(self.iter_posts(handle)),
+            "schema_version": 1,
+        }
+
+    def import_doc(self, doc: dict) -> int:
+        n = 0
+        for p in doc.get("posts", []):
+            if p.get("url"):
+                p = dict(p)
+                # 예전 out.json 은 url md5 였으므로 본문 기준으로 다시 계산
+                p["content_hash"] = content_hash(p.get("text", ""))
+                n += self.upsert(p)
+        return n
+
+
+def _row_to_post(row: sqlite3.Row) -> dict:
+    post = {k: row[k] for k in POST_FIELDS}
+    for k in JSON_FIELDS:
+        post[k] = json.loads(post[k] or "[]")
+    return post
@@ -0,0 +1,30 @@
+# analyze.py 주제 분류 (python -m pytest test_analyze.py)
+import random, re
+from collections import Counter
+
+from analyze import MATCHER, _trie_pattern, classify_post
+
+
+def test_keywords_match_on_word_boundaries():
+    text = "hello jsp 페이지에서 el 표현식, java에서 javascript 와 js. jsonb, dbms, tsconfig"
+    # el/jsp/java에서 -> Java, javascript/js -> Web. hello/jsonb/dbms/tsconfig 안의 el/js/db/ts 는 제외
+    assert MATCHER.count(text) == Counter({"Java/JSP/Servlet": 3, "Web/FE": 2})
+
+
+def test_trie_pattern_matches_like_plain_alternation():
+    words = ["java", "javascript", "js", "jsp", "jstl", "sql", "mysql", "ts", "tsx", "a", "ab", "abc"]
+    bound = r"(?<![0-9a-z])({})(?![0-9a-z])"
+    trie = re.compile(bound.format(_trie_pattern(words)))
+    plain = re.compile(bound.format("|".join(sorted(map(re.escape, words), key=len, reverse=True))))
+    rng = random.Random(7)
+    for _ in range(300):
+        text = "".join(rng.choice("javscriptlmyqb x.한") for _ in range(40))
+        assert trie.findall(text) == plain.findall(text), text
+
+
+def test_classify_post_scores():
+    is_study, major, topics = classify_post("JSP 와 Servlet", "", ["React"], ["java"])
+    # 제목 적중 2 + 코드 언어 2 = 4 (Java), 태그 1 (Web)
+    assert (is_study, major, topics) == (True, "Java/JSP/Servlet", ["Java/JSP/Servlet", "Web/FE"])
+    assert classify_post("여행 후기", "hello world", [], []) == (False, None, [])
+    assert classify_post("회고", "에러 해결 과정", [], [])[0] is True  # 주제 없이도 공부 글
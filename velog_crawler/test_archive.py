@@ -0,0 +1,78 @@
+# archive.py 쓰기/읽기 왕복 (python -m pytest test_archive.py)
+import json
+
+from archive import ArchiveReader, ArchiveWriter, pack, unpack
+
+
+def _post(i: int, text: str) -> dict:
+    return {
+        "url": f"https://velog.io/@a/p{i}", "title": f"제목 {i}", "tags": ["java"] if i % 2 else [],
+        "published_at": "2024-01-01T00:00:00+09:00", "updated_at": "", "text": text,
+        "code_langs": [], "likes": i, "comments": 0, "series": None if i % 3 else "시리즈",
+        "content_hash": f"{i:064x}",
+    }
+
+
+def _roundtrip(tmp_path, texts, block_size=64):
+    posts = [_post(i, t) for i, t in enumerate(texts)]
+    path = str(tmp_path / "a.vca")
+    with ArchiveWriter(path, {"source": "velog", "author": {"handle": "a"}}, block_size=block_size) as w:
+        for p in posts:
+            w.add(p)
+    with ArchiveReader(path) as r:
+        assert len(r) == len(posts)
+        assert [r.post(i) for i in range(len(r))] == posts
+        # 역순(블록을 오가며) 읽어도 같은 값
+        assert [r.text(i) for i in reversed(range(len(r)))] == list(reversed(texts))
+        assert list(r.iter_meta()) == [{k: v for k, v in p.items() if k != "text"} for p in posts]
+    return path
+
+
+def test_empty_texts(tmp_path):
+    _roundtrip(tmp_path, ["", "x"])
+    _roundtrip(tmp_path, ["", ""])
+    _roundtrip(tmp_path, [""])
+    _roundtrip(tmp_path, [])
+
+
+def test_multi_block_with_empty_texts(tmp_path):
+    texts = ["", "가나다" * 30, "", "", "abc" * 50, "x", "", "본문" * 100, ""]
+    path = _roundtrip(tmp_path, texts, block_size=64)
+    with ArchiveReader(path) as r:
+        assert r.stats()["text_blocks"] > 1
+
+
+def test_pack_unpack_json(tmp_path):
+    doc = {"source": "velog", "author": {"handle": "a"},
+           "posts": [_post(i, "" if i % 4 == 0 else "본문 %d " % i * 20) for i in range(50)],
+           "schema_version": 1}
+    src, vca, out = tmp_path / "out.json", str(tmp_path / "out.vca"), str(tmp_path / "back.json")
+    src.write_text(json.dumps(doc, ensure_ascii=False, indent=2), encoding="utf-8")
+    assert pack(str(src), vca, block_size=128) == 50
+    assert unpack(vca, out) == 50
+    with open(out, encoding="utf-8") as f:
+        assert json.load(f) == doc
+
+
+def test_app_archive_page_sorted_and_reopened(tmp_path, monkeypatch):
+    # API 목록: 아카이브도 라이브 목록처럼 최신순, 파일이 바뀌면 이전 reader 를 닫고 다시 엶
+    import os
+    import app
+
+    monkeypatch.setattr(app, "ARCHIVE_DIR", str(tmp_path))
+    monkeypatch.setattr(app, "archives", {})
+    path = str(tmp_path / "a.vca")
+    dates = ["2024-01-02T00:00:00+09:00", "2024-03-01T00:00:00+09:00", "", "2024-02-01T00:00:00+09:00"]
+    with ArchiveWriter(path, {"source": "velog"}) as w:
+        for i, d in enumerate(dates):
+            w.add(dict(_post(i, "본문"), published_at=d))
+    rows, total = app.archive_page("a", 0, 3)
+    assert total == 4 and [r["url"][-2:] for r in rows] == ["p1", "p3", "p0"]
+    assert app.archive_page("a", 3, 6)[0][0]["url"].endswith("p2")  # 날짜 없는 글은 맨 뒤
+    old = app.archives[path]["reader"]
+
+    with ArchiveWriter(path, {"source": "velog"}) as w:
+        w.add(_post(9, "새 본문"))
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+    assert app.archive_post("https://velog.io/@a/p9")["text"] == "새 본문"
+    assert old._mm is None  # 이전 mmap 은 닫힘
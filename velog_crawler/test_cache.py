@@ -0,0 +1,87 @@
+# cache.py 응답 캐시 (python -m pytest test_cache.py)
+import asyncio, threading, time
+
+import pytest
+
+from cache import MISS, MemoryBackend, ResponseCache
+
+
+def test_ttl_and_lru():
+    b = MemoryBackend(max_bytes=10_000, max_items=2)
+    b.set("a", 1, ttl=60)
+    b.set("b", 2, ttl=60)
+    b.get("a")  # a 를 최근으로
+    b.set("c", 3, ttl=60)
+    assert b.get("b") is MISS and b.get("a") == 1 and b.get("c") == 3
+    b.set("d", 4, ttl=0.01)
+    time.sleep(0.02)
+    assert b.get("d") is MISS
+
+
+def test_item_bound_without_byte_accounting():
+    class Live:
+        pass
+
+    b = MemoryBackend(max_bytes=None, max_items=3)
+    objs = [Live() for _ in range(5)]
+    for i, o in enumerate(objs):
+        b.set(str(i), o, ttl=60)
+    assert b.stats()["items"] == 3 and b.stats()["bytes"] == 0
+    assert b.get("4") is objs[4] and b.get("0") is MISS
+
+
+def test_sync_single_flight():
+    cache = ResponseCache(MemoryBackend(), ttl=60)
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.1)
+        return "v"
+
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(cache.get_or_load("k", load))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert out == ["v"] * 5 and len(calls) == 1
+    assert cache.get_or_load("k", load) == "v" and len(calls) == 1
+
+
+def test_async_leader_cancel_does_not_cancel_waiters():
+    async def main():
+        cache = ResponseCache(MemoryBackend(), ttl=60)
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return "v"
+
+        leader = asyncio.ensure_future(cache.aget_or_load("k", load))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(cache.aget_or_load("k", load))
+        await asyncio.sleep(0.01)
+        leader.cancel()  # 클라이언트가 끊긴 첫 요청
+        assert await waiter == "v"
+        assert leader.cancelled() and len(calls) == 1
+        assert cache.get("k") == "v"  # 결과는 캐시에 남음
+        assert cache.stats()["coalesced"] == 1
+
+    asyncio.run(main())
+
+
+def test_async_errors_are_shared_not_cached():
+    async def main():
+        cache = ResponseCache(MemoryBackend(), ttl=60)
+
+        async def boom():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream")
+
+        results = await asyncio.gather(*(cache.aget_or_load("k", boom) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        assert cache.get("k") is MISS and cache.stats()["in_flight"] == 0
+
+    asyncio.run(main())
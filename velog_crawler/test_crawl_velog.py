@@ -0,0 +1,102 @@
+# crawl_velog.py 글 렌더/수집 루프 (python -m pytest test_crawl_velog.py)
+import pytest
+
+from crawl_velog import _extract_post, crawl_all_posts
+from fixture_server import start_fixture_server
+from http_fetch import HttpBackend, graphql_url_for, split_post_url
+from retry import HttpStatusError, classify_error
+from store import CrawlStore
+
+
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+
+
+class FakeHandle:
+    def __init__(self, value):
+        self.value = value
+
+    def json_value(self):
+        return self.value
+
+    def dispose(self):
+        pass
+
+
+class FakePage:
+    # goto 응답 상태만 정해 주는 가짜 페이지 (추출 스크립트는 항상 같은 글)
+    def __init__(self, status):
+        self.status = status
+        self.eval_timeouts = []
+
+    def set_default_timeout(self, ms):
+        pass
+
+    def set_default_navigation_timeout(self, ms):
+        pass
+
+    def goto(self, url, **kwargs):
+        return FakeResponse(self.status)
+
+    def wait_for_load_state(self, *args, **kwargs):
+        pass
+
+    def wait_for_function(self, js, timeout=None, **kwargs):
+        self.eval_timeouts.append(timeout)
+        return FakeHandle({"title": "제목", "text": "본문", "code_langs": [], "tags": []})
+
+
+@pytest.mark.parametrize("status,kind", [(429, "throttle"), (503, "throttle"), (404, "gone"), (500, "error")])
+def test_error_page_is_not_extracted(status, kind):
+    with pytest.raises(HttpStatusError) as e:
+        _extract_post(FakePage(status), "https://velog.io/@a/p", 5000)
+    assert classify_error(e.value) == kind
+
+
+def test_ok_page_is_extracted():
+    page = FakePage(200)
+    assert _extract_post(page, "https://velog.io/@a/p", 5000)[:2] == ("제목", "본문")
+    assert len(page.eval_timeouts) == 1 and 0 < page.eval_timeouts[0] <= 5000  # 추출도 글별 deadline 안에서
+
+
+def test_refresh_uses_stored_validators(tmp_path):
+    # 처음 수집에서 검증자까지 저장 -> refresh_known 재수집은 바뀐 글만 다시 받음
+    server, base = start_fixture_server(posts=12, handle="bench", paragraphs=2)
+    http = HttpBackend(base_url=base, graphql_url=graphql_url_for(base))
+    store = CrawlStore(str(tmp_path / "crawl.db"))
+    try:
+        first = crawl_all_posts("bench", backend=http, store=store, concurrency=2)
+        assert len(first["posts"]) == 12
+        url = first["posts"][0]["url"]
+        assert store.validators(url)[0].startswith("gql:")
+
+        p = server.fixture.by_slug[split_post_url(url)[1]]
+        p["updated_at"], p["paragraphs"][0] = "2030-01-01T00:00:00.000Z", "수정된 문단"
+        again = crawl_all_posts("bench", backend=http, store=store, known=store.known_urls("bench"),
+                                refresh_known=True, stop_after_known=0, concurrency=2)
+        assert [q["url"] for q in again["posts"]] == [url]
+        assert "수정된 문단" in store.get(url)["text"]
+    finally:
+        store.close()
+        http.close()
+        server.shutdown()
+
+
+def test_resume_stops_at_known_frontier():
+    # 최신 글 3개만 새 글: 아는 글이 5개 연속이면 목록을 더 내려가지 않고 새 글만 렌더
+    server, base = start_fixture_server(posts=30, handle="bench", paragraphs=1)
+    http = HttpBackend(base_url=base, graphql_url=graphql_url_for(base), page_size=5)
+    try:
+        newest_first = [
+            http.post_url("bench", it["url_slug"]) for items in http.iter_post_pages("bench") for it in items
+        ]
+        pages = []
+        fetch_page = http.fetch_post_page
+        http.fetch_post_page = lambda *a, **kw: pages.append(1) or fetch_page(*a, **kw)
+        out = crawl_all_posts("bench", backend=http, known=set(newest_first[3:]), stop_after_known=5)
+    finally:
+        http.close()
+        server.shutdown()
+    assert len(pages) == 2  # 6페이지 중 2페이지에서 멈춤 (새 글 3 + 아는 글 5)
+    assert [p["url"] for p in out["posts"]] == sorted(newest_first[:3])
@@ -0,0 +1,37 @@
+# dates.py 날짜 규칙 (python -m pytest test_dates.py)
+from datetime import datetime, timezone
+
+import pytest
+
+from dates import KST, resolve_published, to_date_str, to_utc
+
+NOW = datetime(2025, 8, 10, 1, 0, tzinfo=KST)
+
+
+@pytest.mark.parametrize("s,expected", [
+    ("2025-08-09T20:00:00.000Z", "2025-08-09"),  # ISO: 적힌 날짜 그대로 (KST 로는 8/10 이지만 옮기지 않음)
+    ("2025-08-09T23:30:00+09:00", "2025-08-09"),
+    ("2025. 8. 9 오후 11:00", "2025-08-09"),  # 한국어 표기: 한국 시간
+    ("· 2025. 8. 9", "2025-08-09"),
+    ("2시간 전", "2025-08-09"),  # 상대 표기: 기준 시각(KST)에서
+    ("어제", "2025-08-09"),
+    ("", None),
+    ("알 수 없음", None),
+])
+def test_to_date_str(s, expected):
+    assert to_date_str(s, NOW) == expected
+
+
+def test_to_utc():
+    assert to_utc("2025-08-09T20:00:00Z") == datetime(2025, 8, 9, 20, tzinfo=timezone.utc)
+    assert to_utc("2025. 8. 9 오전 12:30") == datetime(2025, 8, 8, 15, 30, tzinfo=timezone.utc)
+    assert to_utc("Sat, 09 Aug 2025 20:00:00 GMT") == datetime(2025, 8, 9, 20, tzinfo=timezone.utc)
+    assert to_utc("3일 전", NOW) == datetime(2025, 8, 6, 16, tzinfo=timezone.utc)
+    # 오프셋 없는 ISO 는 이 기계의 현지 시각
+    assert to_utc("2025-08-09T20:00:00") == datetime(2025, 8, 9, 20).astimezone(timezone.utc)
+
+
+def test_resolve_published():
+    assert resolve_published("2025-08-09T20:00:00.000Z", NOW) == "2025-08-09T20:00:00.000Z"  # ISO 는 그대로
+    assert resolve_published("1시간 전", NOW) == "2025-08-10T00:00:00+09:00"
+    assert resolve_published("오래 전", NOW) == "오래 전"
@@ -0,0 +1,213 @@
+# http_fetch.py fast path 를 로컬 대역 서버(fixture_server)로 (python -m pytest test_http_fetch.py)
+import threading, time
+from concurrent.futures import Future
+
+import pytest
+import requests
+
+from fixture_server import start_fixture_server
+from http_fetch import FallbackBackend, FetchError, HttpBackend, PostListHarvest, graphql_url_for, task_started_at
+from retry import classify_error
+
+
+@pytest.fixture
+def server():
+    server, base = start_fixture_server(posts=30, handle="bench", paragraphs=2)
+    yield server, base
+    server.shutdown()
+
+
+@pytest.fixture
+def slow_server():
+    server, base = start_fixture_server(posts=100, handle="bench", paragraphs=2, latency_ms=200)
+    yield base
+    server.shutdown()
+
+
+def make_http(base: str, **kwargs) -> HttpBackend:
+    return HttpBackend(base_url=base, graphql_url=graphql_url_for(base), **kwargs)
+
+
+class RecordingFallback:
+    # 브라우저 폴백 대신: 불린 URL 만 기록
+    name = "fake-browser"
+
+    def __init__(self):
+        self.calls = []
+
+    def submit_post(self, url, deadline=None):
+        self.calls.append(url)
+        f = Future()
+        f.set_result(("browser", "본문", [], [], None))
+        return f
+
+    def list_links(self, handle, **kwargs):
+        self.calls.append(handle)
+        return []
+
+    def close(self):
+        pass
+
+
+def test_list_links_graphql_pages(server):
+    srv, base = server
+    http = make_http(base, page_size=7)  # 30개 -> 여러 페이지 + 마지막 짧은 페이지
+    links = http.list_links("bench")
+    assert links == sorted(http.post_url("bench", p["url_slug"]) for p in srv.fixture.posts)
+    assert http.list_links("nobody") == []
+    http.close()
+
+
+@pytest.mark.parametrize("graphql", [True, False])
+def test_fetch_post_graphql_and_html(server, graphql):
+    srv, base = server
+    p = srv.fixture.posts[3]
+    http = HttpBackend(base_url=base, graphql_url=graphql_url_for(base) if graphql else None)
+    title, text, langs, tags, published = http.fetch_post(http.post_url("bench", p["url_slug"]))
+    assert title == p["title"]
+    assert p["paragraphs"][0] in text and "![" not in text and "<p>" not in text
+    assert langs == sorted(lang for lang, _ in p["code"])
+    assert tags == p["tags"]
+    assert p["released_at"][:4] in published  # GraphQL: ISO, HTML: "2023. 12. 11" 표기
+    http.close()
+
+
+@pytest.mark.parametrize("status,kind", [(404, "gone"), (429, "throttle")])
+def test_fetch_post_error_status(server, status, kind):
+    srv, base = server
+    p = srv.fixture.posts[4]
+    srv.fixture.status[p["url_slug"]] = status
+    http = make_http(base)
+    with pytest.raises(requests.HTTPError) as e:
+        http.fetch_post(http.post_url("bench", p["url_slug"]))
+    assert e.value.response.status_code == status and classify_error(e.value) == kind
+    http.close()
+
+
+def test_fallback_uses_primary_when_ok(server):
+    srv, base = server
+    fb = RecordingFallback()
+    backend = FallbackBackend(make_http(base), fb)
+    p = srv.fixture.posts[0]
+    assert backend.fetch_post(backend.primary.post_url("bench", p["url_slug"]))[0] == p["title"]
+    assert len(backend.list_links("bench")) == 30
+    assert backend.list_links("nobody") == [] and fb.calls == ["nobody"]  # 빈 목록만 브라우저로 재확인
+    backend.close()
+
+
+def test_harvest_stops_at_deadline(slow_server):
+    http = make_http(slow_server, page_size=10)
+    h = PostListHarvest(http, "bench")
+    t0 = time.monotonic()
+    with pytest.raises(FetchError):
+        h.ensure(100, deadline=time.monotonic() + 0.5)  # 10 페이지 x 0.2초 -> 중간에 멈춰야 함
+    assert time.monotonic() - t0 < 1.0
+    assert 0 < len(h.items) < 100 and not h.ended
+    assert len(h.ensure(30)) == 30  # 멈춘 자리에서 이어서
+    http.close()
+
+
+def test_harvest_does_not_block_other_requests(slow_server):
+    # 한 요청이 긴 목록을 받는 동안에도 다른 요청은 자기 deadline 안에서 끝나야 함
+    http = make_http(slow_server, page_size=10)
+    h = PostListHarvest(http, "bench")
+    long = threading.Thread(target=h.ensure, args=(100,))
+    long.start()
+    time.sleep(0.05)
+    t0 = time.monotonic()
+    assert len(h.ensure(5, deadline=time.monotonic() + 1.0)) == 5  # 첫 페이지가 오면 바로
+    with pytest.raises(FetchError):
+        h.ensure(100, deadline=time.monotonic() + 0.3)
+    assert time.monotonic() - t0 < 1.0
+    long.join()
+    assert len(h.items) == 100
+    assert [it["url"] for it in h.items] == [it["url"] for it in PostListHarvest(http, "bench").ensure(100)]
+    http.close()
+
+
+def test_fallback_skips_throttle_and_missing(server):
+    srv, base = server
+    fx = srv.fixture
+    fb = RecordingFallback()
+    backend = FallbackBackend(make_http(base), fb)
+    url = lambda p: backend.primary.post_url("bench", p["url_slug"])
+
+    fx.status[fx.posts[1]["url_slug"]] = 429
+    with pytest.raises(requests.HTTPError) as e:
+        backend.fetch_post(url(fx.posts[1]))
+    assert classify_error(e.value) == "throttle"
+    with pytest.raises(requests.HTTPError) as e:
+        backend.fetch_post(base + "/@bench/no-such-post")
+    assert classify_error(e.value) == "gone"
+    fx.status["@bench"] = 503
+    with pytest.raises(requests.HTTPError):
+        backend.list_links("bench")
+    assert fb.calls == []  # 속도 제한/없는 글은 브라우저로 다시 요청하지 않음
+
+    fx.status[fx.posts[2]["url_slug"]] = 500  # 그 밖의 오류는 폴백
+    assert backend.fetch_post(url(fx.posts[2]))[0] == "browser"
+    assert fb.calls == [url(fx.posts[2])]
+    backend.close()
+
+
+def test_started_at_excludes_queue_wait(slow_server):
+    # 워치독 기준 시각: 워커가 잡은 순간부터 (대기열에 있는 동안은 None)
+    backend = FallbackBackend(make_http(slow_server, workers=1), RecordingFallback())
+    urls = [f"{slow_server}/@bench/post-{i}-slug" for i in (1, 2)]
+    t0 = time.monotonic()
+    first, second = (backend.submit_post(u) for u in urls)
+    time.sleep(0.05)
+    assert task_started_at(first) >= t0 and task_started_at(second) is None
+    first.result()
+    second.result()
+    assert task_started_at(second) >= task_started_at(first) + 0.2
+    backend.close()
+
+
+def count_requests(http: HttpBackend) -> list:
+    # 보낸 요청 (method, GraphQL 질의 이름 또는 URL) 기록
+    sent = []
+    request = http.session.request
+
+    def wrapped(method, url, **kwargs):
+        q = (kwargs.get("json") or {}).get("query", "")
+        sent.append((method, q.split("(")[0].split()[-1] if q else url))
+        return request(method, url, **kwargs)
+
+    http.session.request = wrapped
+    return sent
+
+
+def test_conditional_refresh_on_graphql_path(server):
+    srv, base = server
+    p = srv.fixture.posts[5]
+    http = make_http(base)
+    url = http.post_url("bench", p["url_slug"])
+    sent = count_requests(http)
+
+    post, etag, lm = http.fetch_post_conditional(url)  # 처음: 본문 + 검증자
+    assert post[0] == p["title"] and etag == "gql:" + p["released_at"] and lm is None
+    assert sent == [("POST", "ReadPost")]
+
+    sent.clear()
+    assert http.fetch_post_conditional(url, etag, lm) == (None, etag, None)  # 그대로: 가벼운 질의 1번
+    assert sent == [("POST", "PostStamp")]
+
+    sent.clear()
+    p["updated_at"] = "2030-01-01T00:00:00.000Z"
+    p["paragraphs"][0] = "수정된 첫 문단"
+    post, etag2, _ = http.fetch_post_conditional(url, etag, lm)
+    assert "수정된 첫 문단" in post[1] and etag2 == "gql:2030-01-01T00:00:00.000Z"
+    assert sent == [("POST", "PostStamp"), ("POST", "ReadPost")]
+    http.close()
+
+
+def test_conditional_refresh_on_html_path(server):
+    srv, base = server
+    p = srv.fixture.posts[6]
+    http = HttpBackend(base_url=base, graphql_url=None)
+    url = http.post_url("bench", p["url_slug"])
+    post, etag, _ = http.fetch_post_conditional(url)
+    assert post[0] == p["title"] and etag.startswith('"')
+    assert http.fetch_post_conditional(url, etag)[0] is None  # 304
+    http.close()
@@ -0,0 +1,39 @@
+# incremental.py 증분 집계가 전체 재계산과 같은지 (python -m pytest test_incremental.py)
+import random
+from datetime import datetime, timedelta, timezone
+
+from analyze import build_rows, summarize
+from incremental import IncrementalAnalytics
+
+BODIES = ["jsp 와 servlet 정리", "mysql 인덱스 설명", "react 훅 예제", "여행 사진", "java 에러 해결, sql 튜닝"]
+
+
+def make_posts(n: int, seed: int = 5) -> list:
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    posts = []
+    for i in range(n):
+        ts = start + timedelta(days=rng.randint(0, 200), hours=rng.randint(0, 23))
+        posts.append({
+            "url": f"https://velog.io/@a/p{i}", "title": f"글 {i}", "text": rng.choice(BODIES),
+            "tags": rng.sample(["java", "react", "db", "일상"], 2), "code_langs": [],
+            "published_at": ts.isoformat(),
+        })
+    return posts
+
+
+def test_incremental_matches_full_recompute(tmp_path):
+    posts = make_posts(40)
+    author = {"handle": "a"}
+    with IncrementalAnalytics(str(tmp_path / "analytics.db")) as inc:
+        assert inc.apply("a", posts[:25])["added"] == 25
+        assert inc.summary("a") == summarize(build_rows(posts[:25]), author)
+
+        # 새 글 15개 + 본문/날짜가 바뀐 글 3개, 나머지는 그대로
+        posts[2]["text"] = "tomcat 설정 정리"
+        posts[7]["published_at"] = "2024-09-30T12:00:00+00:00"
+        posts[11]["published_at"] = ""  # 날짜를 잃은 글은 집계에서 빠짐
+        counts = inc.apply("a", posts)
+        assert (counts["added"], counts["changed"], counts["unchanged"]) == (15, 3, 22)
+        assert inc.summary("a") == summarize(build_rows(posts), author)
+        assert inc.apply("a", posts)["unchanged"] == 40
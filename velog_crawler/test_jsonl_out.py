@@ -0,0 +1,33 @@
+# jsonl_out.py 크래시 후 이어쓰기 (python -m pytest test_jsonl_out.py)
+import os, subprocess, sys
+
+import pytest
+
+from jsonl_out import JsonlWriter, compact_to_json, read_jsonl
+
+# 체크포인트까지 쓰고, 쓰다 만 줄을 남긴 채 close 없이 프로세스 종료 (압축 스트림 꼬리 없음)
+CRASH = """
+import os, sys
+sys.path.insert(0, sys.argv[3])
+from jsonl_out import JsonlWriter
+w = JsonlWriter(sys.argv[1], fsync_every=1)
+for i in range(int(sys.argv[2]), int(sys.argv[2]) + 3):
+    w.write({"url": "https://velog.io/@a/p%d" % i, "text": "본문" * 50})
+w._f.write(b'{"url": "half')
+os._exit(0)
+"""
+
+
+@pytest.mark.parametrize("ext", [".jsonl", ".jsonl.gz", ".jsonl.zst"])
+def test_resume_after_crash(tmp_path, ext):
+    if ext.endswith(".zst"):
+        pytest.importorskip("zstandard")
+    path = str(tmp_path / ("out" + ext))
+    here = os.path.dirname(os.path.abspath(__file__))
+    for start in (0, 3):
+        subprocess.run([sys.executable, "-c", CRASH, path, str(start), here], check=True)
+    with JsonlWriter(path) as w:
+        w.write({"url": "https://velog.io/@a/p6", "text": "끝"})
+
+    assert [p["url"][-2:] for p in read_jsonl(path)] == [f"p{i}" for i in range(7)]
+    assert compact_to_json(path, str(tmp_path / "out.json"), "a") == 7
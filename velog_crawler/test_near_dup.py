@@ -0,0 +1,42 @@
+# near_dup.py MinHash/LSH 색인 (python -m pytest test_near_dup.py)
+import threading
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from near_dup import NearDupIndex
+
+BASE = "파이썬 비동기 프로그래밍을 정리한 글입니다. asyncio 이벤트 루프와 태스크, 퓨처의 관계를 예제로 살펴봅니다. " * 8
+
+
+def post(handle: str, slug: str, text: str) -> dict:
+    return {"url": f"https://velog.io/@{handle}/{slug}", "text": text}
+
+
+def test_groups_include_cross_author_clusters(tmp_path):
+    with NearDupIndex(str(tmp_path / "nd.db")) as index:
+        a = index.add(post("a", "orig", BASE))
+        assert index.add(post("b", "copy", BASE + " 출처: a")) == a  # 다른 작성자가 옮긴 글
+        index.add(post("b", "other", "전혀 다른 내용의 글. 자바 스프링 설정 정리 " * 10))
+        groups = [[a, "https://velog.io/@b/copy"]]
+        assert index.duplicate_groups() == groups
+        assert index.duplicate_groups("a") == groups and index.duplicate_groups("b") == groups
+        assert index.duplicate_groups("c") == []
+
+
+def test_concurrent_adds_keep_one_band_row_per_band(tmp_path):
+    with NearDupIndex(str(tmp_path / "nd.db")) as index:
+        barrier = threading.Barrier(8)
+
+        def add():
+            barrier.wait()
+            index.add(post("a", "p", BASE))  # 처음 보는 같은 글을 동시에
+
+        threads = [threading.Thread(target=add) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        n = index._db.execute("SELECT COUNT(*) FROM bands").fetchone()[0]
+        assert n == index.bands and index.count() == 1
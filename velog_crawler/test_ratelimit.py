@@ -0,0 +1,45 @@
+# ratelimit.py 토큰 버킷과 동시 렌더 (python -m pytest test_ratelimit.py)
+import threading, time
+
+from crawl_velog import crawl_all_posts
+from fixture_server import start_fixture_server
+from http_fetch import HttpBackend, graphql_url_for
+from ratelimit import HostRateLimiter, TokenBucket
+
+
+def test_bucket_caps_rate_across_threads():
+    bucket = TokenBucket(rate=50, burst=2)
+    t0 = time.monotonic()
+    threads = [threading.Thread(target=lambda: [bucket.acquire() for _ in range(3)]) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # 24개 중 burst 2개는 바로, 나머지 22개는 초당 50개
+    assert time.monotonic() - t0 >= 22 / 50 - 0.02
+
+
+def test_hosts_have_separate_buckets():
+    limiter = HostRateLimiter(rate=1, burst=1)
+    t0 = time.monotonic()
+    limiter.acquire("https://velog.io/@a/p1")
+    limiter.acquire("https://v2.velog.io/graphql")
+    assert time.monotonic() - t0 < 0.1
+    assert limiter.bucket("https://velog.io/@b/p2").try_acquire() > 0.5  # 같은 host 는 한도를 나눠 씀
+
+
+def test_concurrent_render_keeps_link_order():
+    # 요청마다 0.1초 걸리는 서버: 동시 렌더는 순서대로 결과를 내면서 직렬보다 빨라야 함
+    server, base = start_fixture_server(posts=12, handle="bench", paragraphs=1, latency_ms=100)
+    limiter = HostRateLimiter(rate=200, burst=4)
+    http = HttpBackend(base_url=base, graphql_url=graphql_url_for(base), limiter=limiter, workers=4)
+    try:
+        t0 = time.monotonic()
+        out = crawl_all_posts("bench", backend=http, concurrency=4)
+        elapsed = time.monotonic() - t0
+    finally:
+        http.close()
+        server.shutdown()
+    urls = [p["url"] for p in out["posts"]]
+    assert len(urls) == 12 and urls == sorted(urls)  # 링크 순서 (list_links 는 정렬해서 줌)
+    assert elapsed < 12 * 0.1
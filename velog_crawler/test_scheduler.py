@@ -0,0 +1,76 @@
+# scheduler.py 작업 큐 lease/연장 (python -m pytest test_scheduler.py)
+import time
+
+from fixture_server import start_fixture_server
+from scheduler import WorkQueue, run_worker
+from store import CrawlStore
+
+
+def test_renew_keeps_task_from_other_workers(tmp_path):
+    q = WorkQueue(str(tmp_path / "q.db"))
+    q.add_authors(["a"])
+    task = q.lease("w1", lease_sec=0.2)
+    assert task is not None and task["kind"] == "list"
+
+    time.sleep(0.1)
+    q.renew([task["id"]], "w1", lease_sec=5.0)
+    time.sleep(0.2)
+    assert q.lease("w2", lease_sec=5.0) is None  # 연장했으므로 만료되지 않음
+
+    q.renew([task["id"]], "w2", lease_sec=5.0)  # 남의 작업은 연장되지 않음
+    q.complete(task["id"], "w1")
+    assert q.pending() == 0
+
+
+def test_expired_lease_is_retaken(tmp_path):
+    q = WorkQueue(str(tmp_path / "q.db"))
+    q.add_authors(["a"])
+    task = q.lease("w1", lease_sec=0.05)
+    time.sleep(0.1)
+    again = q.lease("w2", lease_sec=5.0)
+    assert again is not None and again["id"] == task["id"]
+
+
+def test_expired_lease_past_max_attempts_is_dead(tmp_path):
+    # 워커를 매번 죽이는 작업: lease 만료로만 돌아오므로 pick 에서 dead 로
+    q = WorkQueue(str(tmp_path / "q.db"), max_attempts=2)
+    q.add_authors(["a"])
+    for owner in ("w1", "w2"):
+        assert q.lease(owner, lease_sec=0.01) is not None
+        time.sleep(0.02)
+    assert q.lease("w3", lease_sec=5.0) is None
+    assert q.pending() == 0 and [d["attempts"] for d in q.dead()] == [2]
+
+
+def test_list_rerun_does_not_revive_dead_posts(tmp_path):
+    q = WorkQueue(str(tmp_path / "q.db"), max_attempts=1)
+    q.add_posts("a", ["u1", "u2"])
+    for _ in range(2):
+        task = q.lease("w1")
+        if task["url"] == "u1":
+            q.complete(task["id"], "w1")
+        else:
+            assert q.fail(task["id"], "w1", "boom") == "dead"
+
+    assert q.add_posts("a", ["u1", "u2", "u3"], retry_done=True) == 2  # done 인 u1 재확인 + 새 u3
+    assert [d["url"] for d in q.dead()] == ["u2"]
+    assert q.retry_dead() == 1 and q.dead() == []
+
+
+def test_worker_uses_retry_policy(tmp_path):
+    # 글 작업도 RetryPolicy 를 거침: 404 는 재시도 없이 바로 dead, 나머지는 저장
+    server, base = start_fixture_server(posts=3, handle="bench", paragraphs=1)
+    qpath, spath = str(tmp_path / "q.db"), str(tmp_path / "s.db")
+    q = WorkQueue(qpath)
+    urls = [f"{base}/@bench/{p['url_slug']}" for p in server.fixture.posts]
+    q.add_posts("bench", urls + [f"{base}/@bench/no-such-post"])
+    try:
+        run_worker(0, qpath, spath, backend_kind="http", rate=100, idle_sec=0.01, base_url=base)
+    finally:
+        server.shutdown()
+    assert q.stats()["post"] == {"done": 3, "dead": 1}
+    dead = q.dead()
+    assert dead[0]["attempts"] == 1 and dead[0]["last_error"].startswith("gone:")
+    with CrawlStore(spath) as store:
+        assert all(store.validators(u)[0] for u in urls)
+    q.close()
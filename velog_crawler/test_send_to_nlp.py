@@ -0,0 +1,60 @@
+# send_to_nlp.py 를 로컬 스텁 NLP 서버로 (python -m pytest test_send_to_nlp.py)
+import pytest
+
+from retry import RetryPolicy
+from send_to_nlp import AckLog, NlpExporter, iter_batches, start_stub_server, to_payload
+
+
+def make_posts(n: int, changed=()):
+    return [
+        {"url": f"https://velog.io/@a/p{i}", "title": f"글 {i}", "tags": ["t"],
+         "text": f"본문 {i}" + (" 수정" if i in changed else "")}
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def flaky_stub():
+    # --serve-stub 0 --fail-rate 0.3 과 같은 서버 (임시 포트, seed 고정)
+    server, url = start_stub_server(0, fail_rate=0.3, seed=3)
+    yield server, url
+    server.shutdown()
+
+
+def make_exporter(url: str, acks=None) -> NlpExporter:
+    retry = RetryPolicy({"timeout": 8, "throttle": 8, "error": 8}, base=0.01, cap=0.05)
+    return NlpExporter(url, concurrency=3, max_posts=5, retry=retry, acks=acks)
+
+
+def test_retries_until_every_batch_is_accepted(flaky_stub):
+    server, url = flaky_stub
+    ex = make_exporter(url)
+    stats = ex.export(make_posts(50))
+    ex.close()
+    assert stats["failed_batches"] == 0 and stats["batches"] == 10 and stats["posts"] == 50
+    assert stats["retries"] == server.received["failed"] > 0
+    assert server.received["posts"] == 50 and len(server.urls) == 50
+
+
+def test_idempotency_key_dedupes_resent_batch(flaky_stub):
+    server, url = flaky_stub
+    ex = make_exporter(url)
+    batch = [raw for _, raw in next(iter_batches(to_payload(p) for p in make_posts(5)))]
+    assert ex.send_batch(batch) == ex.send_batch(batch)  # 같은 묶음 -> 같은 Idempotency-Key
+    ex.close()
+    assert server.received["posts"] == 5 and server.received["duplicates"] == 1
+
+
+def test_rerun_sends_only_new_or_changed_posts(flaky_stub, tmp_path):
+    server, url = flaky_stub
+    acks = AckLog(str(tmp_path / "acks.db"))
+    ex = make_exporter(url, acks)
+    assert ex.export(make_posts(20))["posts"] == 20
+    ex.close()
+
+    ex = make_exporter(url, acks)
+    stats = ex.export(make_posts(22, changed={3, 7}))  # 새 글 2개 + 본문 바뀐 글 2개
+    ex.close()
+    acks.close()
+    assert stats["posts"] == 4 and stats["skipped"] == 18
+    assert server.received["posts"] == 24